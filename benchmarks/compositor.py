@@ -0,0 +1,70 @@
+"""
+Per-frame cost of drawing N fireballs: the old per-fireball float blend vs. SpriteCompositor.
+
+Run from the repository root:
+    python -m benchmarks.compositor
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from game.compositor import SpriteCompositor, clip_rect
+from game.sprites import sprite_cache
+
+
+def legacy_draw(frame, sprite, x_offset, y_offset):
+    """The original Fireball.draw sprite path, kept here as the baseline."""
+    clipped = clip_rect(frame.shape, x_offset, y_offset, sprite.width, sprite.height)
+    if clipped is None:
+        return
+    (fy, fx), (sy, sx) = clipped
+    alpha_s = sprite.image[sy, sx, 3] / 255.0
+    alpha_l = 1.0 - alpha_s
+    for c in range(0, 3):
+        frame[fy, fx, c] = (alpha_s * sprite.image[sy, sx, c] + alpha_l * frame[fy, fx, c])
+
+
+def time_frames(draw, frame, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        draw(frame)
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--counts', type=int, nargs='+', default=[1, 10, 50, 100, 500, 1000])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    sprite_cache.preload()
+    owners = ['player1', 'player2', 'ai']
+    compositor = SpriteCompositor()
+    rng = random.Random(0)
+    frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+
+    print(f"{'fireballs':>10} {'legacy ms':>10} {'compositor ms':>14} {'speedup':>8}")
+    for count in args.counts:
+        sprites = [sprite_cache.get(rng.choice(owners)) for _ in range(count)]
+        centers = [(rng.uniform(0, args.width), rng.uniform(0, args.height)) for _ in range(count)]
+
+        def draw_legacy(target):
+            for sprite, (x, y) in zip(sprites, centers):
+                legacy_draw(target, sprite, int(x - sprite.width / 2), int(y - sprite.height / 2))
+
+        def draw_batched(target):
+            compositor.draw(target, sprites, centers)
+
+        legacy_ms = time_frames(draw_legacy, frame.copy(), args.repeats)
+        batched_ms = time_frames(draw_batched, frame.copy(), args.repeats)
+        print(f"{count:>10} {legacy_ms:>10.3f} {batched_ms:>14.3f} {legacy_ms / batched_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
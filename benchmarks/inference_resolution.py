@@ -0,0 +1,95 @@
+"""
+Latency vs. accuracy of pose inference at reduced resolutions, measured on a recorded clip.
+
+Every frame of the clip is run through the same zoom/flip as the game, then through MediaPipe
+Pose at full resolution (the reference) and at each requested inference width. For each width
+it reports the preprocessing + inference latency, how often a player was detected, and the error
+of the gameplay landmarks (shoulders, elbows, wrists) in display pixels against the reference.
+
+Run from the repository root:
+    python -m benchmarks.inference_resolution clip.mp4 --widths 320 480 640 960
+"""
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from game.constants import MODEL_COMPLEXITY, CAMERA_ZOOM
+from game.utils import zoom_frame, resize_for_inference
+
+GAMEPLAY_LANDMARKS = [
+    mp.solutions.pose.PoseLandmark.LEFT_SHOULDER, mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER,
+    mp.solutions.pose.PoseLandmark.LEFT_ELBOW, mp.solutions.pose.PoseLandmark.RIGHT_ELBOW,
+    mp.solutions.pose.PoseLandmark.LEFT_WRIST, mp.solutions.pose.PoseLandmark.RIGHT_WRIST,
+]
+
+
+def load_clip(path, limit):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(cv2.flip(zoom_frame(frame, CAMERA_ZOOM), 1))
+    cap.release()
+    return frames
+
+
+def run_pose(frames, width, model_complexity):
+    """Returns per-frame latencies (s) and landmark pixel arrays (or None when nobody was detected)."""
+    pose = mp.solutions.pose.Pose(model_complexity=model_complexity,
+                                  min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    latencies = []
+    landmarks = []
+    for frame in frames:
+        h, w = frame.shape[:2]
+        start = time.perf_counter()
+        rgb_frame = cv2.cvtColor(resize_for_inference(frame, width), cv2.COLOR_BGR2RGB)
+        results = pose.process(rgb_frame)
+        latencies.append(time.perf_counter() - start)
+        if results.pose_landmarks:
+            points = results.pose_landmarks.landmark
+            landmarks.append(np.array([(points[i].x * w, points[i].y * h) for i in GAMEPLAY_LANDMARKS]))
+        else:
+            landmarks.append(None)
+    pose.close()
+    return np.array(latencies), landmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('clip', help="recorded video of a player")
+    parser.add_argument('--widths', type=int, nargs='+', default=[320, 480, 640, 960])
+    parser.add_argument('--model-complexity', type=int, default=MODEL_COMPLEXITY)
+    parser.add_argument('--frames', type=int, default=600, help="maximum number of frames to use")
+    args = parser.parse_args()
+
+    frames = load_clip(args.clip, args.frames)
+    if not frames:
+        print(f"Error: Could not read frames from {args.clip}")
+        return
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {w}x{h}, model complexity {args.model_complexity}")
+
+    reference_latencies, reference = run_pose(frames, 0, args.model_complexity)
+    print(f"{'width':>6} {'mean ms':>8} {'p95 ms':>7} {'detected':>9} {'mean err px':>12} {'p95 err px':>11}")
+    print(f"{w:>6} {reference_latencies.mean() * 1000:>8.2f} {np.percentile(reference_latencies, 95) * 1000:>7.2f} "
+          f"{sum(r is not None for r in reference) / len(frames):>8.0%} {'(ref)':>12} {'(ref)':>11}")
+
+    for width in args.widths:
+        if width >= w:
+            continue
+        latencies, landmarks = run_pose(frames, width, args.model_complexity)
+        errors = [np.linalg.norm(points - ref, axis=1) for points, ref in zip(landmarks, reference)
+                  if points is not None and ref is not None]
+        errors = np.concatenate(errors) if errors else np.array([np.nan])
+        print(f"{width:>6} {latencies.mean() * 1000:>8.2f} {np.percentile(latencies, 95) * 1000:>7.2f} "
+              f"{sum(p is not None for p in landmarks) / len(frames):>8.0%} "
+              f"{np.nanmean(errors):>12.1f} {np.nanpercentile(errors, 95):>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Networked two-player over loopback with simulated latency, jitter and packet loss.
+
+A host and a client game (headless, no camera or pose model) play against each other through two
+LossyLinks on this machine, in real time. Both players are scripted poses: arms stretched towards
+the opponent, swaying, with a thrust every second, so both fire and get hit. After a game over the
+client presses 'r', so restarting travels over the network as well.
+
+It reports the packet sizes and bandwidth in each direction, how many packets were lost, how long
+the client's predicted shots waited for the host's confirmation, how far the client's fireballs
+are from the host's (its own predicted ones, which the host spawns as far along, and the host's
+extrapolated ones should both be close) and on how many frames both agreed on the health of both players.
+
+Run from the repository root:
+    python -m benchmarks.netplay --latency 50 --jitter 10 --loss 5
+"""
+import argparse
+import math
+import threading
+import time
+
+import numpy as np
+
+from game.display import NO_KEY
+from game.fireball import OWNERS
+from game.game import Game
+from game.gesture import LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST
+from game.netplay import LossyLink, NetClient, NetHost
+from game.recording import LANDMARK_COUNT
+
+
+def scripted_pose(t, fire_direction, phase):
+    """Landmarks of a player facing the opponent with straight arms, swaying and thrusting once a second."""
+    landmarks = np.zeros((LANDMARK_COUNT, 4))
+    landmarks[:, 3] = 1.0
+    center_x = 0.5 + 0.1 * math.sin(0.7 * t + phase)
+    center_y = 0.4 + 0.05 * math.sin(0.5 * t + phase)
+    # The wrists move forward (depth drops) during the first 0.15 s of every second
+    into_thrust = (t + phase) % 1.0
+    wrist_z = -0.3 * min(into_thrust, 0.15) / 0.15 if into_thrust < 0.15 else 0.0
+    for shoulder, elbow, wrist, side in ((LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST, -1),
+                                         (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST, 1)):
+        x = center_x + 0.05 * side
+        landmarks[shoulder, :3] = (x, center_y, 0.0)
+        landmarks[elbow, :3] = (x + 0.12 * fire_direction, center_y, wrist_z / 2)
+        landmarks[wrist, :3] = (x + 0.24 * fire_direction, center_y, wrist_z)
+    return landmarks
+
+
+def pose_player(game, player, t, phase):
+    landmarks = scripted_pose(t, player.fire_direction, phase)
+    player.landmarks = landmarks
+    player.fresh_landmarks = landmarks
+    player.fresh_timestamp = t
+
+
+def fireball_errors(host, client, owner):
+    """Distance from each of host's fireballs of owner to the nearest of client's."""
+    code = OWNERS.index(owner)
+    host_points = host.fireballs.positions[host.fireballs.alive & (host.fireballs.owners == code)]
+    client_points = client.fireballs.positions[client.fireballs.alive & (client.fireballs.owners == code)]
+    if len(host_points) == 0 or len(client_points) == 0:
+        return []
+    distances = np.hypot(*(host_points[:, None, :] - client_points[None, :, :]).transpose(2, 0, 1))
+    return distances.min(axis=1).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=50.0, help="one-way latency in ms")
+    parser.add_argument('--jitter', type=float, default=10.0, help="extra random latency of up to this many ms")
+    parser.add_argument('--loss', type=float, default=5.0, help="packet loss in percent, in each direction")
+    parser.add_argument('--seconds', type=float, default=20.0, help="how long to play")
+    parser.add_argument('--fps', type=float, default=30.0, help="frame rate of both games")
+    parser.add_argument('--size', default='1280x720', help="arena size")
+    parser.add_argument('--seed', type=int, default=1, help="seed of the simulated packet loss and jitter")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split('x'))
+    latency, jitter, loss = args.latency / 1000, args.jitter / 1000, args.loss / 100
+    host_net = NetHost(LossyLink(0, latency, jitter, loss, seed=args.seed))
+    client_net = NetClient(LossyLink(0, latency, jitter, loss, seed=args.seed + 1), '127.0.0.1', host_net.link.port)
+
+    arena = host_net.connect((width, height, args.seed))
+    host = Game.headless(width, height, 'two', arena[2], net=host_net)
+    # The client blocks until the host answers, so the host runs its frames meanwhile
+    joined = {}
+    joining = threading.Thread(target=lambda: joined.update(arena=client_net.connect()))
+    joining.start()
+    while joining.is_alive():
+        host.frame_timestamp = time.perf_counter()
+        host.step(NO_KEY)
+        time.sleep(0.005)
+    client_width, client_height, client_seed = joined['arena']
+    client = Game.headless(client_width, client_height, 'two', client_seed, net=client_net)
+
+    interval = 1.0 / args.fps
+    start = next_frame = time.perf_counter()
+    frames = agreed = restarts = 0
+    errors = {'player1': [], 'player2': []}
+    while time.perf_counter() - start < args.seconds:
+        now = time.perf_counter()
+        t = now - start
+        for game, player, phase in ((host, host.players[0], 0.0), (client, client.players[1], 0.5)):
+            game.frame_timestamp = now
+            game.frame_count += 1
+            pose_player(game, player, t, phase)
+        host.step(NO_KEY)
+        key = ord('r') if client.game_over_state else NO_KEY
+        restarts += key != NO_KEY
+        client.step(key)
+
+        frames += 1
+        agreed += (host.player1_health, host.player2_health) == (client.player1_health, client.player2_health)
+        for owner in errors:
+            errors[owner] += fireball_errors(host, client, owner)
+        next_frame += interval
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+
+    print(f"Loopback, {args.latency:.0f} ms +{args.jitter:.0f} ms jitter one way, {args.loss:.0f}% loss, "
+          f"{frames} frames in {elapsed:.1f} s")
+    for name, link in (("client -> host", client_net.link), ("host -> client", host_net.link)):
+        stats = link.stats
+        print(f"  {name}: {stats['sent']} packets, {stats['bytes_sent'] / max(1, stats['sent']):.0f} bytes on "
+              f"average, {stats['bytes_sent'] / elapsed / 1024:.1f} KiB/s, {stats['dropped']} dropped")
+    print(f"  Host:   {host_net.describe()}")
+    print(f"  Client: {client_net.describe()}")
+    for owner, label in (('player1', "host's fireballs (extrapolated)"), ('player2', "client's fireballs (predicted)")):
+        values = np.array(errors[owner])
+        if len(values):
+            print(f"  Position error of the {label}: median {np.median(values):.1f} px, "
+                  f"p95 {np.percentile(values, 95):.1f} px")
+    print(f"  Health agreed on {agreed / max(1, frames):.1%} of the frames; "
+          f"health P1/P2 {host.player1_health}/{host.player2_health}, 'r' pressed by the client on {restarts} frames")
+    host_net.close()
+    client_net.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Per-stage latency of the frame pipeline at several resolutions and fireball counts.
+
+Every frame runs the real stages in game order on a fixed input: preprocess (zoom + mirror into
+the display frame), inference_frame (resize + cvtColor per player), Pose.process,
+handle_player_input (gesture engine + fire logic on fixed landmarks), update_and_draw_fireballs,
+collision checks, draw_ui_* and draw_debug_info (cached panel, re-rendered a few times a second).
+For each stage it reports p50/p95/p99 latency and throughput; --json writes the same as a
+machine-readable file, and --compare checks the run against such a file from another branch.
+
+Fireballs are placed away from the hearts and put back before each frame, so the live count stays
+fixed and collisions are tested but never hit. Every player thrusts towards the opponent on every
+frame with an expired cooldown, so the fire logic runs all the way to spawning a fireball; the
+shots are removed again, untimed, right after the stage.
+
+Run from the repository root:
+    python -m benchmarks.pipeline --json results.json
+    python -m benchmarks.pipeline --compare results.json
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from game.constants import CAMERA_ZOOM, DEFAULT_HEALTH, HEART_RADIUS, FIREBALL_RADIUS, MODEL_COMPLEXITY, \
+    POSE_INFERENCE_WIDTH
+from game.fireball import OWNERS
+from game.game import Game
+from game.gesture import LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_ELBOW, RIGHT_ELBOW, LEFT_WRIST, RIGHT_WRIST
+from game.preprocess import FramePreprocessor
+from game.sources import SyntheticSource
+
+RESOLUTIONS = {'720p': (1280, 720), '1080p': (1920, 1080)}
+STAGES = ('preprocess', 'inference_frame', 'pose', 'handle_player_input', 'update_and_draw_fireballs',
+          'collisions', 'draw_ui', 'draw_debug_info')
+
+
+def player_landmarks(rng, fire_direction=1):
+    """A fixed pose with straight arms towards fire_direction, plus a little per-frame jitter."""
+    points = np.zeros((33, 4))
+    points[:, :2] = 0.5
+    points[:, 3] = 1.0
+    points[LEFT_SHOULDER, :2] = (0.42, 0.40)
+    points[RIGHT_SHOULDER, :2] = (0.58, 0.40)
+    points[LEFT_ELBOW, :2] = (0.62, 0.42)
+    points[RIGHT_ELBOW, :2] = (0.68, 0.42)
+    points[LEFT_WRIST, :2] = (0.80, 0.40)
+    points[RIGHT_WRIST, :2] = (0.84, 0.40)
+    points[:, :2] += rng.normal(0, 0.002, (33, 2))
+    points[:, 2] = rng.normal(0, 0.01, 33)
+    if fire_direction < 0:
+        points[:, 0] = 1.0 - points[:, 0]
+    return points
+
+
+def prime_thrust(player, timestamp):
+    """Fills the player's depth history so the wrists at depth 0 at timestamp complete a forward thrust."""
+    frames_ago = np.arange(len(player.z_history), 0, -1)
+    player.z_history[:] = 0.05 * frames_ago
+    player.t_history[:] = timestamp - frames_ago / 30
+    player.history_count = len(player.z_history) - 1
+
+
+def place_fireballs(game, count, rng):
+    """Spawns count fireballs at random positions that cannot reach a heart within a step."""
+    hearts = [player.heart_pos for player in game.active_players]
+    if game.game_mode == 'single':
+        hearts.append(game.ai_heart_pos)
+    clearance = HEART_RADIUS + FIREBALL_RADIUS + game.fireballs.speed * 2
+    while len(game.fireballs) < count:
+        x, y = rng.uniform(1, game.frame_width - 1), rng.uniform(1, game.frame_height - 1)
+        if all(math.hypot(x - hx, y - hy) > clearance for hx, hy in hearts):
+            angle = rng.uniform(0, 2 * math.pi)
+            game.fireballs.spawn(x, y, x + math.cos(angle), y + math.sin(angle), rng.choice(OWNERS))
+
+
+def create_poses(count, complexity):
+    import mediapipe as mp
+    return [mp.solutions.pose.Pose(model_complexity=complexity, min_detection_confidence=0.7,
+                                   min_tracking_confidence=0.7) for _ in range(count)]
+
+
+def run_case(base_frame, mode, count, frames, poses):
+    height, width = base_frame.shape[:2]
+    game = Game.headless(width, height, mode)
+    rng = np.random.default_rng(0)
+    for player in game.active_players:
+        player.landmarks = player_landmarks(rng)
+    game.gestures.update(game.active_players)
+    place_fireballs(game, count, random.Random(0))
+    positions = game.fireballs.positions.copy()
+    previous_positions = game.fireballs.previous_positions.copy()
+    alive = game.fireballs.alive.copy()
+
+    preprocessor = FramePreprocessor(CAMERA_ZOOM)
+    timings = {stage: [] for stage in STAGES if stage != 'pose' or poses}
+    clock = time.perf_counter
+
+    shots_fired = 0
+    for index in range(frames):
+        # Untimed: fresh input frame, fixed fireballs, landmarks of a thrust, cooldown that has expired
+        frame = base_frame.copy()
+        kept = len(alive)
+        game.fireballs.positions[:kept] = positions
+        game.fireballs.previous_positions[:kept] = previous_positions
+        game.fireballs.alive[:kept] = alive
+        game.fireballs.hits[:] = False
+        game.frame_timestamp = index / 30
+        for player in game.active_players:
+            player.cooldown = -math.inf
+            player.fresh_landmarks = player.landmarks = player_landmarks(rng, player.fire_direction)
+            player.landmarks[[LEFT_WRIST, RIGHT_WRIST], 2] = 0.0
+            player.fresh_timestamp = game.frame_timestamp
+            prime_thrust(player, game.frame_timestamp)
+
+        start = clock()
+        frame = preprocessor.display_frame(frame)
+        stamp = clock()
+        timings['preprocess'].append(stamp - start)
+
+        rgb_frames = []
+        for player in game.active_players:
+            region = frame[:, player.offset_x:player.offset_x + player.width]
+            rgb_frames.append(preprocessor.inference_frame(region, POSE_INFERENCE_WIDTH, key=player.name))
+        start, stamp = stamp, clock()
+        timings['inference_frame'].append(stamp - start)
+
+        if poses:
+            for pose, rgb_frame in zip(poses, rgb_frames):
+                pose.process(rgb_frame)
+            start, stamp = stamp, clock()
+            timings['pose'].append(stamp - start)
+
+        game.update_players()
+        start, stamp = stamp, clock()
+        timings['handle_player_input'].append(stamp - start)
+
+        # Untimed: take the shots back out, so the fireball count stays fixed
+        shots = game.fireballs.alive.copy()
+        shots[:kept] &= ~alive
+        shots_fired += int(shots.sum())
+        game.fireballs.remove_indices(np.flatnonzero(shots))
+        stamp = clock()
+
+        game.update_fireballs()
+        start, stamp = stamp, clock()
+        fireball_time = stamp - start
+        if mode == 'single':
+            game.check_collisions_single_player()
+        else:
+            game.check_collisions_two_player()
+        start, stamp = stamp, clock()
+        timings['collisions'].append(stamp - start)
+        game.draw_fireballs(frame)
+        start, stamp = stamp, clock()
+        timings['update_and_draw_fireballs'].append(fireball_time + stamp - start)
+
+        if mode == 'single':
+            game.draw_ui_single_player(frame)
+        else:
+            game.draw_ui_two_player(frame, width // 2)
+        start, stamp = stamp, clock()
+        timings['draw_ui'].append(stamp - start)
+
+        game.draw_debug_info(frame)
+        start, stamp = stamp, clock()
+        timings['draw_debug_info'].append(stamp - start)
+
+    healths = (game.player1_health, game.player2_health, game.ai_health)
+    if shots_fired != frames * len(game.active_players) or min(healths) < DEFAULT_HEALTH:
+        print("Warning: players did not fire on every frame or fireballs hit during the run; "
+              "timings are not comparable", file=sys.stderr)
+    return timings
+
+
+def summarize(samples):
+    ms = np.array(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    mean = float(ms.mean())
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99), 'mean_ms': mean,
+            'throughput_fps': 1000 / mean if mean > 0 else float('inf'), 'samples': len(ms)}
+
+
+def compare(results, baseline_path, threshold):
+    """Prints the p50 ratio of each stage against a baseline file; returns the number of regressions."""
+    with open(baseline_path) as file:
+        baseline = {(r['resolution'], r['mode'], r['fireballs'], r['stage']): r for r in json.load(file)['results']}
+    regressions = 0
+    print(f"\n{'resolution':>10} {'mode':>6} {'balls':>6} {'stage':>26} {'base p50':>9} {'p50':>9} {'ratio':>6}")
+    for result in results:
+        key = (result['resolution'], result['mode'], result['fireballs'], result['stage'])
+        if key not in baseline:
+            continue
+        base = baseline[key]['p50_ms']
+        ratio = result['p50_ms'] / base if base > 0 else 1.0
+        # Sub-10µs stages are too noisy to call regressions
+        regressed = ratio > threshold and result['p50_ms'] - base > 0.01
+        regressions += regressed
+        print(f"{key[0]:>10} {key[1]:>6} {key[2]:>6} {key[3]:>26} {base:>9.3f} {result['p50_ms']:>9.3f} "
+              f"{ratio:>6.2f}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resolutions', nargs='+', choices=sorted(RESOLUTIONS), default=['720p', '1080p'])
+    parser.add_argument('--counts', type=int, nargs='+', default=[0, 10, 100, 1000])
+    parser.add_argument('--modes', nargs='+', choices=('single', 'two'), default=['single', 'two'])
+    parser.add_argument('--frames', type=int, default=200, help="frames per case")
+    parser.add_argument('--image', help="input frame to use instead of a synthetic one (e.g. a photo of a player)")
+    parser.add_argument('--no-pose', action='store_true', help="skip the Pose.process stage (no MediaPipe needed)")
+    parser.add_argument('--json', metavar='PATH', help="write the results to PATH")
+    parser.add_argument('--compare', metavar='PATH', help="compare against results written earlier with --json")
+    parser.add_argument('--threshold', type=float, default=1.15, help="p50 ratio that counts as a regression")
+    args = parser.parse_args()
+
+    image = cv2.imread(args.image) if args.image else None
+    if args.image and image is None:
+        print(f"Error: Could not read {args.image}")
+        return 1
+
+    results = []
+    print(f"{'resolution':>10} {'mode':>6} {'balls':>6} {'stage':>26} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'FPS':>9}")
+    for resolution in args.resolutions:
+        width, height = RESOLUTIONS[resolution]
+        base_frame = cv2.resize(image, (width, height)) if image is not None else \
+            SyntheticSource(width, height, paced=False).read()[1]
+        for mode in args.modes:
+            poses = [] if args.no_pose else create_poses(1 if mode == 'single' else 2, MODEL_COMPLEXITY)
+            for count in args.counts:
+                timings = run_case(base_frame, mode, count, args.frames, poses)
+                for stage, samples in timings.items():
+                    result = {'resolution': resolution, 'mode': mode, 'fireballs': count, 'stage': stage,
+                              **summarize(samples)}
+                    results.append(result)
+                    print(f"{resolution:>10} {mode:>6} {count:>6} {stage:>26} {result['p50_ms']:>8.3f} "
+                          f"{result['p95_ms']:>8.3f} {result['p99_ms']:>8.3f} {result['throughput_fps']:>9.0f}")
+            for pose in poses:
+                pose.close()
+
+    if args.json:
+        meta = {'python': platform.python_version(), 'numpy': np.__version__, 'opencv': cv2.__version__,
+                'platform': platform.platform(), 'machine': platform.machine(), 'frames': args.frames,
+                'input': args.image or 'synthetic', 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        with open(args.json, 'w') as file:
+            json.dump({'meta': meta, 'results': results}, file, indent=1)
+        print(f"Results written to {args.json}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        print(f"{regressions} regression(s) above {args.threshold:.2f}x")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
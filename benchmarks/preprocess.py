@@ -0,0 +1,97 @@
+"""
+Frame preprocessing: zoom_frame + flip + resize + cvtColor vs. FramePreprocessor, and an allocation check.
+
+Times both paths per frame and verifies they produce the same images. The allocation check runs
+the FramePreprocessor in steady state under tracemalloc (NumPy and OpenCV image buffers are
+traced) and fails if any frame-sized block is allocated; it exits non-zero in that case, so it can
+run as a test.
+
+Run from the repository root:
+    python -m benchmarks.preprocess
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from game.constants import POSE_INFERENCE_WIDTH
+from game.preprocess import FramePreprocessor
+from game.sources import SyntheticSource
+from game.utils import zoom_frame, resize_for_inference
+
+
+def legacy_path(frame, zoom, regions, width):
+    frame = cv2.flip(zoom_frame(frame, zoom), 1)
+    rgb = [cv2.cvtColor(resize_for_inference(frame[:, start:stop], width), cv2.COLOR_BGR2RGB)
+           for start, stop in regions]
+    return cv2.resize(frame, (frame.shape[1], frame.shape[0])), rgb
+
+
+def fused_path(preprocessor, frame, regions, width):
+    frame = preprocessor.display_frame(frame)
+    rgb = [preprocessor.inference_frame(frame[:, start:stop], width, key=i) for i, (start, stop) in enumerate(regions)]
+    return frame, rgb
+
+
+def time_path(path, frames):
+    start = time.perf_counter()
+    for frame in frames:
+        path(frame)
+    return (time.perf_counter() - start) / len(frames) * 1000
+
+
+def allocation_check(preprocessor, frames, regions, width):
+    """Peak memory (bytes) allocated while preprocessing one frame in steady state, worst frame."""
+    for frame in frames[:3]:
+        fused_path(preprocessor, frame, regions, width)
+    tracemalloc.start()
+    largest = 0
+    for frame in frames:
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        fused_path(preprocessor, frame, regions, width)
+        largest = max(largest, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return largest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--zooms', type=float, nargs='+', default=[1.0, 1.25])
+    parser.add_argument('--frames', type=int, default=100)
+    args = parser.parse_args()
+
+    source = SyntheticSource(args.width, args.height, paced=False)
+    frames = [source.read()[1] for _ in range(args.frames)]
+    frame_bytes = args.width * args.height * 3
+    mid_x = args.width // 2
+    failures = 0
+
+    print(f"{'zoom':>5} {'players':>8} {'legacy ms':>10} {'fused ms':>9} {'max diff':>9} {'largest alloc':>14} {'check':>6}")
+    for zoom in args.zooms:
+        for regions in ([(0, args.width)], [(0, mid_x), (mid_x, args.width)]):
+            preprocessor = FramePreprocessor(zoom)
+            legacy_ms = time_path(lambda frame: legacy_path(frame, zoom, regions, POSE_INFERENCE_WIDTH), frames)
+            fused_ms = time_path(lambda frame: fused_path(preprocessor, frame, regions, POSE_INFERENCE_WIDTH), frames)
+
+            legacy_display, legacy_rgb = legacy_path(frames[0], zoom, regions, POSE_INFERENCE_WIDTH)
+            display, rgb = fused_path(preprocessor, frames[0], regions, POSE_INFERENCE_WIDTH)
+            diff = max(int(np.abs(a.astype(np.int16) - b).max()) for a, b in zip([legacy_display] + legacy_rgb,
+                                                                                    [display] + rgb))
+
+            largest = allocation_check(preprocessor, frames, regions, POSE_INFERENCE_WIDTH)
+            # Even the smallest image buffer (a downscaled inference image) is larger than this
+            ok = largest < frame_bytes // 16
+            failures += not ok
+            print(f"{zoom:>5.2f} {len(regions):>8} {legacy_ms:>10.3f} {fused_ms:>9.3f} {diff:>9} "
+                  f"{largest:>13}B {'ok' if ok else 'FAIL':>6}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+CPU saved and false fire triggers of filtered, frame-skipping pose tracking on a recorded clip.
+
+The clip is played back twice with clip timestamps:
+  raw      - pose on every frame, thrust from the raw wrist-z difference of consecutive frames
+  tracked  - pose only when LandmarkTracker.suggested_interval() asks for it, gestures from the
+             game's GestureEngine (windowed velocity of the One Euro filtered wrist depth)
+For both it reports the number of inferences, inference time, and fire triggers (arms straight +
+thrust, with the player cooldown). Record the clip with a known number of deliberate thrusts and
+pass --expected to turn trigger counts into false triggers; an idle clip uses --expected 0.
+
+Run from the repository root:
+    python -m benchmarks.tracking clip.mp4 --expected 5
+"""
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+
+from game.constants import MODEL_COMPLEXITY, CAMERA_ZOOM, POSE_INFERENCE_WIDTH, ARM_STRAIGHT_ANGLE, \
+    THRUST_SENSITIVITY, PLAYER_COOLDOWN
+from game.gesture import GestureEngine, PlayerState
+from game.tracking import LandmarkTracker
+from game.utils import zoom_frame, resize_for_inference, get_angle
+
+PoseLandmark = mp.solutions.pose.PoseLandmark
+
+
+def load_clip(path):
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while True:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(cv2.flip(zoom_frame(frame, CAMERA_ZOOM), 1))
+    cap.release()
+    return frames, fps
+
+
+def arms_straight(landmarks):
+    lm = landmarks.landmark
+    left = get_angle(lm[PoseLandmark.LEFT_SHOULDER], lm[PoseLandmark.LEFT_ELBOW], lm[PoseLandmark.LEFT_WRIST])
+    right = get_angle(lm[PoseLandmark.RIGHT_SHOULDER], lm[PoseLandmark.RIGHT_ELBOW], lm[PoseLandmark.RIGHT_WRIST])
+    return left > ARM_STRAIGHT_ANGLE and right > ARM_STRAIGHT_ANGLE
+
+
+class Playback:
+    def __init__(self):
+        self.pose = mp.solutions.pose.Pose(model_complexity=MODEL_COMPLEXITY,
+                                           min_detection_confidence=0.7, min_tracking_confidence=0.7)
+        self.inferences = 0
+        self.inference_time = 0.0
+        self.triggers = 0
+        self._cooldown = 0.0
+
+    def infer(self, frame):
+        start = time.perf_counter()
+        rgb_frame = cv2.cvtColor(resize_for_inference(frame, POSE_INFERENCE_WIDTH), cv2.COLOR_BGR2RGB)
+        results = self.pose.process(rgb_frame)
+        self.inference_time += time.perf_counter() - start
+        self.inferences += 1
+        return results.pose_landmarks
+
+    def fire_check(self, landmarks, forward_velocity, timestamp):
+        if timestamp > self._cooldown and arms_straight(landmarks) and abs(forward_velocity) >= THRUST_SENSITIVITY:
+            self._cooldown = timestamp + PLAYER_COOLDOWN
+            self.triggers += 1
+
+
+def play_raw(frames, fps):
+    playback = Playback()
+    last_wrist_z = None
+    for i, frame in enumerate(frames):
+        landmarks = playback.infer(frame)
+        if landmarks is None:
+            last_wrist_z = None
+            continue
+        lm = landmarks.landmark
+        wrist_z = (lm[PoseLandmark.LEFT_WRIST].z + lm[PoseLandmark.RIGHT_WRIST].z) / 2
+        forward_velocity = 0 if last_wrist_z is None else last_wrist_z - wrist_z
+        last_wrist_z = wrist_z
+        playback.fire_check(landmarks, forward_velocity, i / fps)
+    return playback
+
+
+def play_tracked(frames, fps):
+    playback = Playback()
+    player = PlayerState('player1', 1, None, LandmarkTracker())
+    player.set_region(0, frames[0].shape[1], frames[0].shape[0])
+    gestures = GestureEngine()
+    for i, frame in enumerate(frames):
+        if i % player.tracker.suggested_interval() != 0:
+            continue
+        landmarks = playback.infer(frame)
+        if landmarks is None:
+            player.tracker.reset()
+            player.reset()
+            continue
+        player.fresh_timestamp = i / fps
+        player.fresh_landmarks = player.tracker.update(landmarks, player.fresh_timestamp).points
+        player.landmarks = player.fresh_landmarks
+        gestures.update([player])
+        if i / fps > playback._cooldown and player.arms_straight and player.thrusting:
+            playback._cooldown = i / fps + PLAYER_COOLDOWN
+            playback.triggers += 1
+    return playback
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('clip', help="recorded video of a player")
+    parser.add_argument('--expected', type=int, default=None, help="number of deliberate thrusts in the clip")
+    args = parser.parse_args()
+
+    frames, fps = load_clip(args.clip)
+    if not frames:
+        print(f"Error: Could not read frames from {args.clip}")
+        return
+    minutes = len(frames) / fps / 60
+    print(f"{len(frames)} frames, {len(frames) / fps:.1f} s at {fps:.0f} FPS")
+
+    raw = play_raw(frames, fps)
+    tracked = play_tracked(frames, fps)
+    print(f"{'mode':>8} {'inferences':>11} {'infer s':>8} {'triggers':>9} {'per min':>8} {'false':>6}")
+    for name, playback in (('raw', raw), ('tracked', tracked)):
+        false = '-' if args.expected is None else str(max(0, playback.triggers - args.expected))
+        print(f"{name:>8} {playback.inferences:>11} {playback.inference_time:>8.2f} {playback.triggers:>9} "
+              f"{playback.triggers / minutes:>8.1f} {false:>6}")
+    saved = 1 - tracked.inference_time / raw.inference_time if raw.inference_time else 0.0
+    print(f"Inference CPU saved: {saved:.0%}")
+
+
+if __name__ == '__main__':
+    main()
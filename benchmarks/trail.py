@@ -0,0 +1,65 @@
+"""
+Per-fireball cost of the circle fallback (full-frame trail blending vs. TrailRenderer)
+next to the sprite path.
+
+Run from the repository root:
+    python -m benchmarks.trail
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from game.compositor import SpriteCompositor
+from game.constants import FIREBALL_RADIUS, FIREBALL_TRAIL_LENGTH
+from game.sprites import sprite_cache
+from game.trail import TrailRenderer
+
+
+def legacy_trail(frame, points, radius, color):
+    """The original fallback trail, kept here as the baseline."""
+    for i, pos in enumerate(points):
+        alpha = (i + 1) / len(points)
+        overlay = frame.copy()
+        cv2.circle(overlay, pos, radius, color, -1)
+        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+
+
+def time_ms(draw, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        draw()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    trail = np.array([(args.width // 4 + i * 40, args.height // 2) for i in range(FIREBALL_TRAIL_LENGTH)], np.int32)
+    points = [tuple(point) for point in trail.tolist()]
+    color = (0, 165, 255)
+    renderer = TrailRenderer()
+    compositor = SpriteCompositor()
+    sprite = sprite_cache.get('player1')
+
+    results = {
+        'legacy trail': time_ms(lambda: legacy_trail(frame, points, FIREBALL_RADIUS // 2, color), args.repeats),
+        'ROI trail': time_ms(lambda: renderer.draw(frame, trail, FIREBALL_RADIUS // 2, color), args.repeats),
+    }
+    if sprite is not None:
+        results['sprite'] = time_ms(lambda: compositor.draw(frame, [sprite], [points[-1]]), args.repeats)
+
+    for name, ms in results.items():
+        print(f"{name:>14}: {ms:8.3f} ms per fireball")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+
+from .constants import AUDIO_CACHE_DIR, AUDIO_CHANNELS, AUDIO_COALESCE_WINDOW, AUDIO_VOICE_LIMITS
+
+
+def load_pcm(path, cache_dir=AUDIO_CACHE_DIR):
+    """
+    Loads a sound effect as a pygame Sound. The PCM samples decoded from the file are cached in
+    cache_dir, keyed by the file's size and modification time and by the mixer format, so later
+    starts create the Sound straight from the raw samples instead of decoding the MP3 again.
+    """
+    import pygame
+
+    cache_path = None
+    if cache_dir:
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{pygame.mixer.get_init()}"
+        name = os.path.splitext(os.path.basename(path))[0]
+        cache_path = os.path.join(cache_dir, f"{name}-{hashlib.sha1(key.encode()).hexdigest()[:16]}.pcm")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as file:
+                return pygame.mixer.Sound(buffer=file.read())
+
+    sound = pygame.mixer.Sound(path)
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Written under a temporary name, so a crash never leaves a truncated cache file
+            with open(cache_path + '.tmp', 'wb') as file:
+                file.write(sound.get_raw())
+            os.replace(cache_path + '.tmp', cache_path)
+        except OSError as error:
+            print(f"Warning: Could not cache decoded sound {path}: {error}")
+    return sound
+
+
+class AudioBus:
+    """
+    Plays sound effects on a dedicated thread.
+
+    The game only emit()s sound names onto a queue and never waits for the mixer. The audio thread
+    plays them on a fixed pool of mixer channels with these rules:
+
+        coalescing    an event for a sound that was started less than coalesce_window seconds ago is dropped
+        voice limits  a sound never plays on more than voice_limits[name] channels; its oldest voice is restarted
+        channel pool  when all channels are busy, the oldest voice of any sound is stolen
+
+    so a barrage of hits cannot pile up identical sounds or starve the others of channels.
+    Background music is streamed by pygame.mixer.music as before.
+    """
+    def __init__(self, sounds, music=None, channels=AUDIO_CHANNELS, voice_limits=AUDIO_VOICE_LIMITS,
+                 coalesce_window=AUDIO_COALESCE_WINDOW, cache_dir=AUDIO_CACHE_DIR):
+        """sounds maps a name to (path, volume); music is an optional (path, volume) played in a loop."""
+        # pygame is only imported once sound is actually wanted
+        import pygame
+
+        start = time.perf_counter()
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self._music = pygame.mixer.music
+        if music is not None:
+            path, volume = music
+            self._music.load(path)
+            self._music.play(-1)  # -1表示无限循环
+            self._music.set_volume(volume)
+        self.sounds = {}
+        for name, (path, volume) in sounds.items():
+            sound = load_pcm(path, cache_dir)
+            sound.set_volume(volume)
+            self.sounds[name] = sound
+        self.load_time = time.perf_counter() - start
+
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.voice_limits = voice_limits
+        self.coalesce_window = coalesce_window
+        self.stats = {'emitted': 0, 'played': 0, 'coalesced': 0, 'voices_restarted': 0, 'channels_stolen': 0}
+        # channel index -> (name, start time) of what it was last asked to play
+        self._voices = {}
+        self._last_start = {}
+        self._events = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._audio_loop, name='audio', daemon=True)
+        self._thread.start()
+
+    def emit(self, name):
+        """Queues sound name for playback; returns at once."""
+        self.stats['emitted'] += 1
+        self._events.put((name, time.perf_counter()))
+
+    def pause_music(self, paused):
+        if paused:
+            self._music.pause()
+        else:
+            self._music.unpause()
+
+    def close(self):
+        self._events.put(None)
+        self._thread.join(timeout=1.0)
+        for channel in self.channels:
+            channel.stop()
+
+    def _audio_loop(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            self._play(*event)
+
+    def _play(self, name, emitted):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+        last = self._last_start.get(name)
+        if last is not None and emitted - last < self.coalesce_window:
+            self.stats['coalesced'] += 1
+            return
+
+        # Voices that finished (or were taken over) no longer count
+        for index in list(self._voices):
+            channel = self.channels[index]
+            if not channel.get_busy() or channel.get_sound() is not self.sounds[self._voices[index][0]]:
+                del self._voices[index]
+
+        own = [index for index, (voice, _) in self._voices.items() if voice == name]
+        if len(own) >= self.voice_limits.get(name, len(self.channels)):
+            index = min(own, key=lambda i: self._voices[i][1])
+            self.stats['voices_restarted'] += 1
+        else:
+            free = [i for i in range(len(self.channels)) if i not in self._voices]
+            if free:
+                index = free[0]
+            else:
+                index = min(self._voices, key=lambda i: self._voices[i][1])
+                self.stats['channels_stolen'] += 1
+
+        now = time.perf_counter()
+        self.channels[index].play(sound)
+        self._voices[index] = (name, now)
+        self._last_start[name] = now
+        self.stats['played'] += 1
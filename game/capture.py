@@ -0,0 +1,166 @@
+import collections
+import threading
+import time
+
+import cv2
+
+from .constants import CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS, CAMERA_FOURCC, CAPTURE_BUFFER_SIZE
+
+CapturedFrame = collections.namedtuple('CapturedFrame', ['frame', 'timestamp', 'sequence'])
+
+
+def open_camera(index=CAMERA_INDEX, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, fps=CAMERA_FPS, fourcc=CAMERA_FOURCC):
+    """
+    Opens a camera with low-latency settings: the smallest driver buffer and, where supported,
+    the requested FOURCC, resolution and frame rate (0 / None keeps the device default).
+    """
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        return cap
+
+    # Not every backend honours these; whatever the device accepted is reported below
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if width and height:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+
+    actual_fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc_text = ''.join(chr((actual_fourcc >> (8 * i)) & 0xFF) for i in range(4)) if actual_fourcc > 0 else 'n/a'
+    print(f"Camera: {int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))} "
+          f"@ {cap.get(cv2.CAP_PROP_FPS):.0f} FPS, FOURCC {fourcc_text}, buffer {int(cap.get(cv2.CAP_PROP_BUFFERSIZE))}")
+    return cap
+
+
+class CaptureThread:
+    """
+    Reads frames from a capture source on a dedicated thread into a small ring buffer.
+    read() always hands out the newest frame; older frames that were never read are dropped and counted.
+    It mirrors the cv2.VideoCapture methods the game uses (isOpened, read, release).
+    """
+    def __init__(self, source, buffer_size=CAPTURE_BUFFER_SIZE):
+        self.source = source
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self._frames = collections.deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._last_sequence = -1
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._capture_loop, name='capture', daemon=True)
+            self._thread.start()
+        return self
+
+    def isOpened(self):
+        return self.source.isOpened() and (self._thread is None or self._running)
+
+    def read_latest(self, timeout=1.0):
+        """
+        Waits until a frame newer than the last one returned is available and returns it as a
+        CapturedFrame, or None on timeout / when capture has stopped.
+        """
+        deadline = time.perf_counter() + timeout
+        with self._condition:
+            while not self._frames or self._frames[-1].sequence <= self._last_sequence:
+                remaining = deadline - time.perf_counter()
+                if not self._running or remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+            captured = self._frames[-1]
+            # Frames captured after the last read but never handed out are stale now
+            self.frames_dropped += captured.sequence - self._last_sequence - 1 if self._last_sequence >= 0 else 0
+            self._last_sequence = captured.sequence
+            self._frames.clear()
+            return captured
+
+    def read(self):
+        captured = self.read_latest()
+        if captured is None:
+            return False, None
+        return True, captured.frame
+
+    def release(self):
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.source.release()
+
+    def _capture_loop(self):
+        sequence = 0
+        while self._running:
+            success, frame = self.source.read()
+            timestamp = time.perf_counter()
+            if not success:
+                self.read_failures += 1
+                if not self.source.isOpened():
+                    break
+                time.sleep(0.005)
+                continue
+
+            with self._condition:
+                self._frames.append(CapturedFrame(frame, timestamp, sequence))
+                self.frames_captured += 1
+                self._condition.notify_all()
+            sequence += 1
+
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+
+class DirectCapture:
+    """
+    Reads one frame per read_latest() call on the caller's thread, so no frame is ever dropped.
+    Used for unpaced sources, where the game should process every frame as fast as it can.
+    Same interface as CaptureThread.
+    """
+    def __init__(self, source):
+        self.source = source
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self._sequence = 0
+
+    def start(self):
+        return self
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def read_latest(self, timeout=1.0):
+        success, frame = self.source.read()
+        if not success:
+            self.read_failures += 1
+            return None
+        captured = CapturedFrame(frame, time.perf_counter(), self._sequence)
+        self._sequence += 1
+        self.frames_captured += 1
+        return captured
+
+    def read(self):
+        captured = self.read_latest()
+        if captured is None:
+            return False, None
+        return True, captured.frame
+
+    def release(self):
+        self.source.release()
+
+
+def start_capture(source, buffer_size=CAPTURE_BUFFER_SIZE):
+    """Starts capturing from source: on a thread for real-time sources, on demand for unpaced ones."""
+    if getattr(source, 'paced', True):
+        return CaptureThread(source, buffer_size).start()
+    return DirectCapture(source)
@@ -0,0 +1,64 @@
+import time
+
+# FIREBALL_SPEED and AI_ANIMATION_SPEED were tuned as "per frame" at roughly this rate
+REFERENCE_TICK_RATE = 30
+
+
+class SimulationClock:
+    """
+    Fixed-timestep clock with an accumulator.
+    Each rendered frame asks advance() how many simulation ticks to run, so gameplay speed does not
+    depend on how fast the camera/pose loop runs. Rendering interpolates between the last two ticks
+    using alpha.
+    """
+    def __init__(self, tick_rate, max_ticks_per_frame):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        # Multiply "per reference tick" speeds by this to get per-tick speeds at the actual rate
+        self.time_scale = REFERENCE_TICK_RATE / tick_rate
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self._last_time = None
+
+    def advance(self, now=None):
+        """Adds the time elapsed since the previous call and returns the number of ticks to simulate."""
+        if now is None:
+            now = time.perf_counter()
+        if self._last_time is None:
+            # The first frame after a reset runs one tick, so there is always something to show
+            self._last_time = now
+            self.accumulator = 0.0
+            self.ticks += 1
+            return 1
+
+        self.accumulator += max(0.0, now - self._last_time)
+        self._last_time = now
+
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_ticks_per_frame:
+            # After a long stall, skip ahead instead of trying to catch up (spiral of death)
+            self.dropped_ticks += ticks - self.max_ticks_per_frame
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.dt
+        self.ticks += ticks
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far the current frame lies between the last tick and the next one (0..1)."""
+        return min(1.0, self.accumulator / self.dt)
+
+    def interpolate(self, previous, current):
+        """Interpolates an (x, y) position between the last two ticks for rendering."""
+        alpha = self.alpha
+        return (int(previous[0] + (current[0] - previous[0]) * alpha),
+                int(previous[1] + (current[1] - previous[1]) * alpha))
+
+    def reset(self):
+        """Forgets the elapsed time, e.g. after a pause, so no ticks are replayed on resume."""
+        self._last_time = None
+        self.accumulator = 0.0
@@ -0,0 +1,61 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .constants import HEART_RADIUS, FIREBALL_RADIUS
+from .fireball import OWNERS
+
+HitEvent = namedtuple('HitEvent', ['index', 'target', 'owner'])
+
+
+class HitTarget:
+    """A circle (usually a heart) that can be hit by fireballs from the given owners."""
+    def __init__(self, name, position, hit_by, radius=HEART_RADIUS + FIREBALL_RADIUS):
+        self.name = name
+        self.position = position
+        self.hit_by = hit_by
+        self.radius = radius
+
+
+def find_hits(fireballs, targets):
+    """
+    Tests every live fireball of a FireballSystem against every target in one vectorized pass.
+
+    Each fireball is tested along the segment it travelled during its last step (swept circle test),
+    so fast fireballs cannot tunnel through a heart between frames. A fireball hits at most one target:
+    the first one along its path. Returns HitEvents in spawn order.
+    """
+    indices = fireballs.active_indices()
+    indices = indices[~fireballs.hits[indices]]
+    if len(indices) == 0 or not targets:
+        return []
+
+    centers = np.array([target.position for target in targets], dtype=np.float64)
+    radii = np.array([target.radius for target in targets], dtype=np.float64)
+    accepts = np.zeros((len(targets), len(OWNERS)), bool)
+    for i, target in enumerate(targets):
+        accepts[i, [OWNERS.index(owner) for owner in target.hit_by]] = True
+
+    owners = fireballs.owners[indices]
+    candidates = accepts[:, owners].T
+    if not candidates.any():
+        return []
+
+    start = fireballs.previous_positions[indices]
+    step = fireballs.positions[indices] - start
+    to_center = centers[None, :, :] - start[:, None, :]
+
+    # Parameter of the point on each step segment closest to each target centre
+    length_sq = np.einsum('ij,ij->i', step, step)
+    projection = np.einsum('ijk,ik->ij', to_center, step)
+    t = np.divide(projection, length_sq[:, None], out=np.zeros_like(projection), where=length_sq[:, None] > 0)
+    np.clip(t, 0.0, 1.0, out=t)
+
+    offset = to_center - t[:, :, None] * step[:, None, :]
+    distance_sq = np.einsum('ijk,ijk->ij', offset, offset)
+    hits = candidates & (distance_sq < radii[None, :] ** 2)
+
+    hit_rows = np.flatnonzero(hits.any(axis=1))
+    first_target = np.where(hits[hit_rows], t[hit_rows], np.inf).argmin(axis=1)
+    return [HitEvent(int(indices[row]), targets[column].name, OWNERS[owners[row]])
+            for row, column in zip(hit_rows.tolist(), first_target.tolist())]
@@ -1,9 +1,34 @@
+import os
+import sys
+
 # =============================================================================
 # --- 游戏配置 (可在此处调整游戏参数) ---
 # =============================================================================
 
 # --- 性能与精度 ---
 MODEL_COMPLEXITY = 0        # 模型复杂度: 0=最快, 1=均衡, 2=最准。降低此值可显著减少延迟。
+POSE_INFERENCE_WIDTH = 640  # 姿态识别使用的画面宽度 (按比例缩小, 0=使用原始分辨率)。关键点是归一化坐标, 会自动对应回显示画面。
+TARGET_FPS = 30             # 目标帧率, 自动画质调节以此为每帧时间预算
+QUALITY_GOVERNOR_ENABLED = True # 画面跟不上时自动降低识别画质, 有余量时再恢复 (最高只恢复到上面配置的宽度和模型复杂度; 关闭时始终使用配置的画质)
+QUALITY_LEVELS = [          # 画质档位, 从高到低: (识别宽度, 模型复杂度, 每几帧识别一次); 上面配置的画质为最高档, 只使用不比它更重的档位
+    (960, 1, 1),
+    (640, 1, 1),
+    (640, 0, 1),
+    (480, 0, 1),
+    (480, 0, 2),
+    (320, 0, 2),
+    (320, 0, 3),
+]
+POSE_PIPELINED = True       # 在后台线程上识别姿态, 与画面渲染并行 (False=逐帧同步识别)
+POSE_MAX_STALENESS = 0.25   # 姿态结果最长可沿用的时间 (秒), 超过则视为"未检测到玩家"
+
+# --- 关键点滤波与预测 ---
+TRACKING_MIN_CUTOFF = 1.0   # One Euro 滤波最小截止频率 (Hz), 越小越平滑, 但静止时延迟越大
+TRACKING_BETA = 5.0         # 截止频率随速度提高的系数, 越大快速动作的延迟越小
+TRACKING_D_CUTOFF = 1.0     # 速度估计的截止频率 (Hz)
+TRACKING_MAX_PREDICTION = 0.1 # 两次识别之间最多向前预测的时间 (秒)
+TRACKING_MAX_SKIP = 2       # 玩家静止时最多每几帧识别一次姿态 (1=每帧识别)
+TRACKING_STILL_SPEED = 0.3  # 低于此速度 (画面宽度/秒) 视为静止, 可以跳帧识别
 
 # --- 尺寸大小 (单位: 像素) ---
 HEART_RADIUS = 15       # 心脏的半径 (用于显示和碰撞检测)
@@ -19,6 +44,7 @@ AI_MAX_COOLDOWN = 1.5       # AI发射火球的最大间隔时间 (秒)
 # --- 手势检测灵敏度 ---
 ARM_STRAIGHT_ANGLE = 100    # 判定为“手臂伸直”的最小角度 (180为完全伸直)
 THRUST_SENSITIVITY = 0.02   # 向前推射动作的灵敏度 (值越大, 要求推得越快)
+THRUST_WINDOW = 3           # 计算推射速度所用的最近姿态样本数 (越大越平滑, 但反应越慢)
 
 # --- AI 行为 ---
 AI_ANIMATION_SPEED = 0.2    # AI上下移动动画的速度 (值越大, 移动越快)
@@ -43,5 +69,57 @@ VOLUME_FIREBALL_2 = 1.0 # 第二种火球音效音量
 VOLUME_HIT = 0.8        # 击中音效音量
 VOLUME_WIN = 1.0        # 胜利音效音量
 
+# --- 音效播放 ---
+AUDIO_CHANNELS = 8          # 音效使用的混音声道数量
+AUDIO_VOICE_LIMITS = {      # 每种音效最多同时播放几个, 超出时重新播放其中最早的一个
+    'fireball': 3,
+    'fireball2': 3,
+    'hit': 2,
+    'win': 1,
+}
+AUDIO_COALESCE_WINDOW = 0.05 # 同一音效在此时间 (秒) 内重复触发时只播放一次
+AUDIO_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'fireball-game', 'sounds') # 解码后的音效缓存目录, 之后启动无需再解码 MP3 (None=不缓存)
+
 # --- 摄像头 ---
 CAMERA_ZOOM = 1.0 # 摄像头画面缩放比例 (1.0为不缩放, >1.0为放大)
+CAMERA_INDEX = 0          # 摄像头设备编号
+CAMERA_WIDTH = 0          # 请求的采集分辨率宽度 (0=使用设备默认值)
+CAMERA_HEIGHT = 0         # 请求的采集分辨率高度 (0=使用设备默认值)
+CAMERA_FPS = 30           # 请求的采集帧率 (0=使用设备默认值)
+CAMERA_FOURCC = "MJPG"    # 请求的像素格式, MJPG 通常能在高分辨率下保持高帧率 (None=使用设备默认值)
+CAPTURE_BUFFER_SIZE = 2   # 采集线程缓存的帧数, 游戏总是取最新一帧, 旧帧会被丢弃
+
+# --- 画面显示 ---
+DISPLAY_BACKEND = 'pygame'  # 显示方式: 'pygame' (不转换像素格式, 推荐) 或 'opencv' (cv2.imshow); pygame 打不开窗口时自动改用 opencv
+DISPLAY_THREADED = sys.platform != 'darwin'  # 在独立线程上显示画面和读取按键, 游戏循环不必等待屏幕 (macOS 只能在主线程开窗口, 默认关闭)
+DISPLAY_VSYNC = True        # 与屏幕刷新同步 (仅 pygame), 避免画面撕裂
+DISPLAY_MAX_FPS = 0         # 显示帧率上限 (0=有新画面就立即显示)
+
+# --- 火球贴图 ---
+FIREBALL_ROTATION_STEPS = 0 # 预旋转的飞行方向数量 (0=不旋转, 例如 16 表示每 22.5° 一张贴图)
+FIREBALL_TRAIL_LENGTH = 10  # 贴图加载失败时, 圆形火球拖尾的长度 (帧)
+TEXT_LAYOUT_CACHE_SIZE = 64 # 缓存的文字排版 (字号/尺寸) 数量上限, 超出时淘汰最久未用的
+OVERLAY_TEXT_CACHE_SIZE = 8 # 缓存的全屏提示文字 (暂停/胜负/退出确认) 数量上限
+
+# --- 模拟时钟 ---
+SIMULATION_TICK_RATE = 30   # 游戏逻辑每秒更新次数, 与摄像头/姿态识别的帧率无关 (速度参数按 30 次/秒 标定)
+SIMULATION_MAX_TICKS = 5    # 每帧最多补算的逻辑步数, 卡顿过久时直接跳过而不是追帧
+
+# --- 性能统计 ---
+TELEMETRY_WINDOW = 300      # 统计直方图保留最近多少帧的耗时
+TELEMETRY_INTERVAL = 5.0    # 写入 JSON Lines 统计日志的间隔 (秒)
+TELEMETRY_REFRESH = 0.5     # 屏幕上 FPS/延迟面板的刷新间隔 (秒)
+
+# --- 调试信息 ---
+DEBUG_PANEL_ENABLED = True  # 启动时是否显示调试面板 (游戏中按 'd' 切换)
+DEBUG_PANEL_RATE = 5        # 调试面板每秒重绘次数, 其余帧直接贴上缓存的图像
+
+# --- 联网对战 ---
+NET_PORT = 5005             # 主机监听的 UDP 端口
+NET_CONNECT_TIMEOUT = 5.0   # 客户端等待主机应答的最长时间 (秒)
+NET_TIMEOUT = 2.0           # 超过这么久收不到对方数据包即视为断线 (秒)
+NET_HISTORY = 64            # 主机保留多少个已发送状态, 用于计算相对客户端已确认状态的增量
+NET_MAX_FIREBALLS = 64      # 每个状态包最多携带的新增火球数, 其余的放到后续包中
+NET_MAX_SHOTS = 4           # 客户端每个输入包最多重发的未确认射击数
+NET_MAX_SHOT_AGE = 0.3      # 主机为补偿网络延迟, 最多把客户端的火球提前多少秒的飞行距离
+NET_SHOT_SLACK = 0.05       # 主机校验客户端射击 (冷却时间, 射击时刻) 时允许的误差 (秒), 另加两倍测得的网络抖动
@@ -0,0 +1,95 @@
+import time
+
+import cv2
+import numpy as np
+
+from .constants import DEBUG_PANEL_ENABLED, DEBUG_PANEL_RATE
+from .ui import Texture
+
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (0, 0, 255)
+_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_PAD = 4
+
+
+def player_debug_lines(player, title, quality=None, missing="No player detected"):
+    """
+    The debug lines of one player as (text, scale, color, thickness, advance) tuples, where advance
+    is the distance to the next line's baseline.
+    """
+    lines = [(title, 0.7, WHITE, 2, 30)]
+    if quality is not None:
+        lines.append((f"Quality: {quality}", 0.6, WHITE, 1, 25))
+
+    data = player.debug_data()
+    if not data:
+        lines.append((missing, 0.6, WHITE, 1, 25))
+        return lines
+
+    arms_straight = data['Arms Straight']
+    thrusting = data['Thrusting']
+    lines += [
+        (f"Arm Angles (L/R): {data['L-Angle']:.1f} / {data['R-Angle']:.1f}", 0.6, WHITE, 1, 25),
+        (f"Arms Straight: {'YES' if arms_straight else 'NO'}", 0.6, GREEN if arms_straight else RED, 2, 30),
+        (f"Fwd Velocity: {data['Fwd Velocity']:.4f}", 0.6, WHITE, 1, 25),
+        (f"Thrusting: {'YES' if thrusting else 'NO'}", 0.6, GREEN if thrusting else RED, 2, 25),
+    ]
+
+    # Green while the aim would fire: towards the opponent and not steeply down
+    forward = data['dir_x'] * player.fire_direction > 0
+    upward = not (data['magnitude'] > 0 and data['dir_y'] / data['magnitude'] > 0.8)
+    lines.append((f"Fire Angle: {data['Fire Angle']:.1f}", 0.6, GREEN if forward and upward else RED, 2, 25))
+    return lines
+
+
+def render_panel(lines):
+    """Renders lines into a premultiplied BGRA image; the first baseline is at y = 30 of the image."""
+    width, height, y = 0, 0, 30
+    for text, scale, _, thickness, advance in lines:
+        (text_width, _), baseline = cv2.getTextSize(text, _FONT, scale, thickness)
+        width = max(width, text_width)
+        height = y + baseline + thickness
+        y += advance
+
+    image = np.zeros((height + _PAD, width + 2 * _PAD, 4), np.uint8)
+    y = 30
+    for text, scale, color, thickness, advance in lines:
+        cv2.putText(image, text, (_PAD, y), _FONT, scale, (*color, 255), thickness)
+        y += advance
+    return image
+
+
+class DebugPanel:
+    """
+    The gesture debug overlay.
+
+    Panels are re-rendered into small cached textures only rate times a second and blended onto every
+    frame in between. The caller passes a function that returns the panels as (x, lines); it is only
+    called at a refresh, so while the panel is hidden no debug values are gathered or drawn at all.
+    """
+    def __init__(self, enabled=DEBUG_PANEL_ENABLED, rate=DEBUG_PANEL_RATE):
+        self.enabled = enabled
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.refreshes = 0
+        self._panels = []
+        self._next_refresh = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        # Show current values at once when turned back on
+        self._next_refresh = 0.0
+
+    def invalidate(self):
+        self._next_refresh = 0.0
+
+    def draw(self, frame, build):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if now >= self._next_refresh:
+            self._next_refresh = now + self.interval
+            self._panels = [Texture(render_panel(lines), x - _PAD, 0, frame.shape) for x, lines in build()]
+            self.refreshes += 1
+        for panel in self._panels:
+            panel.blend(frame)
@@ -0,0 +1,207 @@
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .constants import DISPLAY_BACKEND, DISPLAY_THREADED, DISPLAY_VSYNC, DISPLAY_MAX_FPS
+
+NO_KEY = 0xFF  # What cv2.waitKey(...) & 0xFF returns when no key was pressed
+
+
+class PygameWindow:
+    """A fullscreen pygame window; frames are wrapped with frombuffer, scaled to the screen by SDL."""
+    def __init__(self, title, size, vsync):
+        import pygame
+
+        self.pygame = pygame
+        pygame.display.init()
+        # SCALED keeps the frame size as the logical size, so mouse positions are in frame pixels
+        self.screen = pygame.display.set_mode(size, pygame.FULLSCREEN | pygame.SCALED, vsync=1 if vsync else 0)
+        pygame.display.set_caption(title)
+
+    def show(self, frame):
+        h, w = frame.shape[:2]
+        # Wraps the BGR pixels without converting them; the blit is the only copy
+        pygame = self.pygame
+        surface = pygame.image.frombuffer(np.ascontiguousarray(frame).data, (w, h), 'BGR')
+        self.screen.blit(surface, (0, 0))
+        pygame.display.flip()
+
+    def pump(self, keys, clicks):
+        pygame = self.pygame
+        for event in pygame.event.get():
+            if event.type == pygame.KEYDOWN and event.key < 256:
+                # Letters, space and ESC have the same codes as in OpenCV
+                keys.put(event.key)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                clicks.put(event.pos)
+            elif event.type == pygame.QUIT:
+                keys.put(ord('q'))
+
+    def close(self):
+        self.pygame.display.quit()
+
+
+class OpenCVWindow:
+    """A fullscreen cv2.imshow window, the fallback when pygame cannot open one."""
+    def __init__(self, title, size, vsync):
+        self.title = title
+        self._clicks = []
+        cv2.namedWindow(title, cv2.WND_PROP_FULLSCREEN)
+        cv2.setWindowProperty(title, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        cv2.setMouseCallback(title, self._on_mouse)
+
+    def _on_mouse(self, event, x, y, flags, param):
+        if event == cv2.EVENT_LBUTTONDOWN:
+            self._clicks.append((x, y))
+
+    def show(self, frame):
+        cv2.imshow(self.title, frame)
+
+    def pump(self, keys, clicks):
+        key = cv2.waitKey(1) & 0xFF
+        if key != NO_KEY:
+            keys.put(key)
+        while self._clicks:
+            clicks.put(self._clicks.pop(0))
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+WINDOWS = {'pygame': PygameWindow, 'opencv': OpenCVWindow}
+
+
+class Display:
+    """
+    Presents frames and collects input without blocking the game loop.
+
+    present() hands a frame to the presentation thread through a single slot: if the previous frame
+    has not been shown yet it is replaced (and counted as dropped), so the loop never waits for the
+    screen. The thread shows frames, optionally paced to max_fps and/or the screen's vsync, and
+    pumps window events into key and click queues that the loop polls. A presented frame is read
+    after present() returns, so it must not be overwritten while holds() is True.
+
+    With threaded=False everything runs inline in present(), for platforms where windows must
+    live on the main thread.
+    """
+    def __init__(self, title, size, backend=DISPLAY_BACKEND, threaded=DISPLAY_THREADED, vsync=DISPLAY_VSYNC,
+                 max_fps=DISPLAY_MAX_FPS):
+        self.title = title
+        self.size = size
+        self.backend = backend
+        self.threaded = threaded
+        self.vsync = vsync
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.frames_presented = 0
+        self.frames_dropped = 0
+        self.keys = queue.SimpleQueue()
+        self.clicks = queue.SimpleQueue()
+        self._window = None
+        self._error = None
+        self._slot = None
+        self._showing = None
+        self._next_present = 0.0
+        self._condition = threading.Condition()
+        self._running = threaded
+        self._thread = None
+        if threaded:
+            opened = threading.Event()
+            self._thread = threading.Thread(target=self._present_loop, args=(opened,), name='display', daemon=True)
+            self._thread.start()
+            opened.wait()
+            if self._window is None:
+                self._thread = None
+                raise RuntimeError(f"Cannot open a window: {self._error}")
+        else:
+            self._window = self._open()
+
+    def present(self, frame):
+        if not self.threaded:
+            self._show(frame)
+            self._window.pump(self.keys, self.clicks)
+            return
+        with self._condition:
+            if self._slot is not None:
+                self.frames_dropped += 1
+            self._slot = frame
+            self._condition.notify()
+
+    def holds(self, frame):
+        """True while frame is waiting to be shown or being shown, i.e. must not be overwritten."""
+        return frame is self._slot or frame is self._showing
+
+    def poll_key(self):
+        """The next key pressed, or NO_KEY; never blocks."""
+        if not self.threaded:
+            self._window.pump(self.keys, self.clicks)
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return NO_KEY
+
+    def poll_click(self):
+        """The (x, y) frame position of the next left click, or None."""
+        try:
+            return self.clicks.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        elif self._window is not None:
+            self._window.close()
+        self._window = None
+
+    def _open(self):
+        try:
+            window = WINDOWS[self.backend](self.title, self.size, self.vsync)
+        except Exception as error:  # pygame.error, or pygame not installed
+            if self.backend == 'opencv':
+                raise
+            print(f"Warning: Could not open a {self.backend} window ({error}), using OpenCV instead")
+            self.backend = 'opencv'
+            window = OpenCVWindow(self.title, self.size, self.vsync)
+        print(f"Display: {self.backend}{', threaded' if self.threaded else ''}"
+              f"{', vsync' if self.vsync and self.backend == 'pygame' else ''}"
+              f"{f', max {1 / self.interval:.0f} FPS' if self.interval else ''}")
+        return window
+
+    def _show(self, frame):
+        if self.interval:
+            delay = self._next_present - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_present = max(self._next_present + self.interval, time.perf_counter())
+        self._window.show(frame)
+        self.frames_presented += 1
+
+    def _present_loop(self, opened):
+        try:
+            self._window = self._open()
+        except Exception as error:
+            self._error = error
+            return
+        finally:
+            opened.set()
+        while True:
+            with self._condition:
+                # Wake up regularly to keep the window responsive even without new frames
+                if self._running and self._slot is None:
+                    self._condition.wait(0.01)
+                if not self._running:
+                    break
+                frame, self._slot = self._slot, None
+                self._showing = frame
+            self._window.pump(self.keys, self.clicks)
+            if frame is not None:
+                self._show(frame)
+                self._showing = None
+        self._window.close()
@@ -2,79 +2,275 @@ import math
 import cv2
 import numpy as np
 
-from .constants import FIREBALL_RADIUS, FIREBALL_SPEED, FIREBALL_IMAGE_RED, FIREBALL_IMAGE_BLUE
+from .constants import FIREBALL_RADIUS, FIREBALL_SPEED, FIREBALL_TRAIL_LENGTH
+from .compositor import SpriteCompositor
+from .sprites import sprite_cache
+from .trail import TrailRenderer
 
-class Fireball:
-    """Represents a single fireball in the game."""
-    def __init__(self, x, y, target_x, target_y, owner):
-        self.x = x
-        self.y = y
-        self.owner = owner
-        self.hit = False
+OWNERS = ('player1', 'player2', 'ai')
+FALLBACK_COLORS = {
+    'player1': (0, 165, 255),
+    'player2': (255, 0, 255),
+    'ai': (255, 0, 255),
+}
+
+_compositor = SpriteCompositor()
+_trail_renderer = TrailRenderer()
+
+
+class FireballSystem:
+    """
+    Stores all live fireballs as parallel NumPy arrays (struct of arrays).
+    Free slots are recycled through a free-list, and movement, trail history and off-screen
+    culling are done for every fireball at once. Iterating yields Fireball views in spawn order.
+    """
+    def __init__(self, capacity=64, trail_length=FIREBALL_TRAIL_LENGTH, speed=FIREBALL_SPEED):
+        self.trail_length = trail_length
+        self.speed = speed
         self.radius = FIREBALL_RADIUS
-        self.trail = []
-
-        if owner == 'player1':
-            self.image = cv2.imread(FIREBALL_IMAGE_RED, cv2.IMREAD_UNCHANGED)
-        elif owner == 'player2' or owner == 'ai':
-            self.image = cv2.imread(FIREBALL_IMAGE_BLUE, cv2.IMREAD_UNCHANGED)
-        
-        if self.image is None:
-            print(f"Error: Could not load fireball image for {owner}")
-            # Fallback to drawing circles if image not found
-            self.draw_fallback = True
-            if owner == 'player1':
-                self.color = (0, 165, 255)
-            elif owner == 'player2':
-                self.color = (255, 0, 255)
-            else: # AI
-                self.color = (255, 0, 255)
-        else:
-            self.draw_fallback = False
-            self.image = cv2.resize(self.image, (self.radius * 2, self.radius * 2))
+        self.capacity = 0
+        self.positions = np.zeros((0, 2))
+        self.previous_positions = np.zeros((0, 2))
+        self.velocities = np.zeros((0, 2))
+        self.owners = np.zeros(0, np.int8)
+        self.hits = np.zeros(0, bool)
+        self.alive = np.zeros(0, bool)
+        self.serials = np.zeros(0, np.int64)
+        self.trails = np.zeros((0, trail_length, 2), np.int32)
+        self.trail_heads = np.zeros(0, np.intp)
+        self.trail_counts = np.zeros(0, np.intp)
+        self.sprites = []
+        self._free = []
+        self._next_serial = 0
+        self._grow(capacity)
+
+    def spawn(self, x, y, target_x, target_y, owner):
+        """Adds a fireball flying from (x, y) towards (target_x, target_y) and returns its view."""
+        if not self._free:
+            self._grow(self.capacity * 2)
+        index = self._free.pop()
 
         angle = math.atan2(target_y - y, target_x - x)
-        self.dx = math.cos(angle) * FIREBALL_SPEED
-        self.dy = math.sin(angle) * FIREBALL_SPEED
+        self.positions[index] = (x, y)
+        self.previous_positions[index] = (x, y)
+        self.velocities[index] = (math.cos(angle) * self.speed, math.sin(angle) * self.speed)
+        self.owners[index] = OWNERS.index(owner)
+        self.hits[index] = False
+        self.alive[index] = True
+        self.serials[index] = self._next_serial
+        self._next_serial += 1
+        self.trail_heads[index] = 0
+        self.trail_counts[index] = 0
+        self.sprites[index] = sprite_cache.get(owner, angle)
+        return Fireball._view(self, index)
+
+    def active_indices(self):
+        """Indices of the live fireballs, in the order they were spawned."""
+        indices = np.flatnonzero(self.alive)
+        return indices[np.argsort(self.serials[indices], kind='stable')]
 
     def update(self):
-        self.trail.append((int(self.x), int(self.y)))
-        if len(self.trail) > 10:
-            self.trail.pop(0)
-        self.x += self.dx
-        self.y += self.dy
+        """Records the trail point and moves every live fireball by one step."""
+        indices = np.flatnonzero(self.alive)
+        if len(indices) == 0:
+            return
+        heads = self.trail_heads[indices]
+        self.trails[indices, heads] = self.positions[indices].astype(np.int32)
+        self.trail_heads[indices] = (heads + 1) % self.trail_length
+        self.trail_counts[indices] = np.minimum(self.trail_counts[indices] + 1, self.trail_length)
+        # The previous position is kept so collisions can test the whole step, not just its end point
+        self.previous_positions[indices] = self.positions[indices]
+        self.positions[indices] += self.velocities[indices]
+
+    def draw(self, frame, compositor=_compositor, alpha=1.0):
+        """
+        Draws every live fireball; sprite fireballs are blended in a single compositor pass.
+        alpha interpolates between the previous and the current position (see SimulationClock).
+        """
+        sprites = []
+        sprite_indices = []
+        for index in self.active_indices().tolist():
+            sprite = self.sprites[index]
+            if sprite is None:
+                Fireball._view(self, index).draw(frame, alpha)
+            else:
+                sprites.append(sprite)
+                sprite_indices.append(index)
+        compositor.draw(frame, sprites, self.render_positions(sprite_indices, alpha))
+
+    def render_positions(self, indices, alpha=1.0):
+        previous = self.previous_positions[indices]
+        return previous + (self.positions[indices] - previous) * alpha
+
+    def advance(self, index, ticks):
+        """Moves one fireball ahead by ticks (may be fractional) at once, e.g. to make up for network delay."""
+        self.positions[index] += self.velocities[index] * ticks
+        self.previous_positions[index] = self.positions[index]
+
+    def cull(self, width, height):
+        """Removes every fireball whose centre has left the (width x height) frame."""
+        x, y = self.positions[:, 0], self.positions[:, 1]
+        outside = self.alive & ~((0 < x) & (x < width) & (0 < y) & (y < height))
+        self.remove_indices(np.flatnonzero(outside))
+
+    def remove_indices(self, indices):
+        indices = np.asarray(indices, np.intp)
+        indices = indices[self.alive[indices]]
+        self.alive[indices] = False
+        for index in indices.tolist():
+            self.sprites[index] = None
+            self._free.append(index)
+
+    def remove(self, fireball):
+        self.remove_indices([fireball.index])
+
+    def clear(self):
+        self.remove_indices(np.flatnonzero(self.alive))
+
+    def trail_points(self, index):
+        """The trail of one fireball as an (n, 2) array, oldest point first."""
+        count = self.trail_counts[index]
+        start = (self.trail_heads[index] - count) % self.trail_length
+        return np.roll(self.trails[index], -start, axis=0)[:count]
+
+    @property
+    def spawned(self):
+        """Number of fireballs spawned since the system was created."""
+        return self._next_serial
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def __iter__(self):
+        return iter([Fireball._view(self, index) for index in self.active_indices().tolist()])
+
+    def _grow(self, capacity):
+        capacity = max(capacity, 1)
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        self.positions = np.concatenate((self.positions, np.zeros((extra, 2))))
+        self.previous_positions = np.concatenate((self.previous_positions, np.zeros((extra, 2))))
+        self.velocities = np.concatenate((self.velocities, np.zeros((extra, 2))))
+        self.owners = np.concatenate((self.owners, np.zeros(extra, np.int8)))
+        self.hits = np.concatenate((self.hits, np.zeros(extra, bool)))
+        self.alive = np.concatenate((self.alive, np.zeros(extra, bool)))
+        self.serials = np.concatenate((self.serials, np.zeros(extra, np.int64)))
+        self.trails = np.concatenate((self.trails, np.zeros((extra, self.trail_length, 2), np.int32)))
+        self.trail_heads = np.concatenate((self.trail_heads, np.zeros(extra, np.intp)))
+        self.trail_counts = np.concatenate((self.trail_counts, np.zeros(extra, np.intp)))
+        self.sprites.extend([None] * extra)
+        # Pop from the end, so hand out the lowest slots first
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+
+class Fireball:
+    """
+    Represents a single fireball in the game.
+    This is a thin view over one slot of a FireballSystem; a fireball created directly
+    gets a private single-slot system.
+    """
+    def __init__(self, x, y, target_x, target_y, owner, system=None):
+        if system is None:
+            system = FireballSystem(capacity=1)
+        view = system.spawn(x, y, target_x, target_y, owner)
+        self.system = view.system
+        self.index = view.index
 
-    def draw(self, frame):
+    @classmethod
+    def _view(cls, system, index):
+        view = cls.__new__(cls)
+        view.system = system
+        view.index = index
+        return view
+
+    @property
+    def x(self):
+        return self.system.positions[self.index, 0]
+
+    @x.setter
+    def x(self, value):
+        self.system.positions[self.index, 0] = value
+
+    @property
+    def y(self):
+        return self.system.positions[self.index, 1]
+
+    @y.setter
+    def y(self, value):
+        self.system.positions[self.index, 1] = value
+
+    @property
+    def dx(self):
+        return self.system.velocities[self.index, 0]
+
+    @property
+    def dy(self):
+        return self.system.velocities[self.index, 1]
+
+    @property
+    def owner(self):
+        return OWNERS[self.system.owners[self.index]]
+
+    @property
+    def hit(self):
+        return bool(self.system.hits[self.index])
+
+    @hit.setter
+    def hit(self, value):
+        self.system.hits[self.index] = value
+
+    @property
+    def radius(self):
+        return self.system.radius
+
+    @property
+    def sprite(self):
+        return self.system.sprites[self.index]
+
+    @property
+    def image(self):
+        sprite = self.sprite
+        return None if sprite is None else sprite.image
+
+    @property
+    def draw_fallback(self):
+        # Fallback to drawing circles if the image could not be loaded
+        return self.sprite is None
+
+    @property
+    def color(self):
+        return FALLBACK_COLORS[self.owner]
+
+    @property
+    def trail(self):
+        return [tuple(point) for point in self.system.trail_points(self.index).tolist()]
+
+    def __eq__(self, other):
+        return isinstance(other, Fireball) and other.system is self.system and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.system), self.index))
+
+    def update(self):
+        system = self.system
+        head = system.trail_heads[self.index]
+        system.trails[self.index, head] = system.positions[self.index].astype(np.int32)
+        system.trail_heads[self.index] = (head + 1) % system.trail_length
+        system.trail_counts[self.index] = min(system.trail_counts[self.index] + 1, system.trail_length)
+        system.previous_positions[self.index] = system.positions[self.index]
+        system.positions[self.index] += system.velocities[self.index]
+
+    def draw(self, frame, alpha=1.0):
+        render_x, render_y = self.system.render_positions(self.index, alpha)
+        x, y = int(render_x), int(render_y)
         if self.draw_fallback:
             # Fallback drawing (old circle method)
-            for i, pos in enumerate(self.trail):
-                alpha = (i + 1) / len(self.trail)
-                overlay = frame.copy()
-                cv2.circle(overlay, pos, self.radius // 2, self.color, -1)
-                cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
-            
+            _trail_renderer.draw(frame, self.system.trail_points(self.index), self.radius // 2, self.color)
+
             border_color = (0, 255, 255) if self.owner.startswith('player') else (255, 255, 0)
-            cv2.circle(frame, (int(self.x), int(self.y)), self.radius, self.color, -1)
-            cv2.circle(frame, (int(self.x), int(self.y)), self.radius, border_color, 2)
+            cv2.circle(frame, (x, y), self.radius, self.color, -1)
+            cv2.circle(frame, (x, y), self.radius, border_color, 2)
         else:
-            # Draw image
-            x_offset = int(self.x - self.radius)
-            y_offset = int(self.y - self.radius)
-
-            # Ensure the fireball is within frame boundaries
-            y1, y2 = max(0, y_offset), min(frame.shape[0], y_offset + self.image.shape[0])
-            x1, x2 = max(0, x_offset), min(frame.shape[1], x_offset + self.image.shape[1])
-
-            # Calculate the region of the image to paste
-            img_y1, img_y2 = y1 - y_offset, y2 - y_offset
-            img_x1, img_x2 = x1 - x_offset, x2 - x_offset
-
-            if img_x1 < img_x2 and img_y1 < img_y2:
-                # Extract the alpha channel and invert it for the background mask
-                alpha_s = self.image[img_y1:img_y2, img_x1:img_x2, 3] / 255.0
-                alpha_l = 1.0 - alpha_s
-
-                # Extract the color channels of the fireball image
-                for c in range(0, 3):
-                    frame[y1:y2, x1:x2, c] = (alpha_s * self.image[img_y1:img_y2, img_x1:img_x2, c] + \
-                                              alpha_l * frame[y1:y2, x1:x2, c])
+            _compositor.blit(frame, self.sprite, int(render_x - self.radius), int(render_y - self.radius))
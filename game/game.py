@@ -1,46 +1,212 @@
+import functools
+import hashlib
+import importlib
 import math
 import random
 import time
 
 import cv2
-import mediapipe as mp
-import pygame
 
 from .constants import (
-    MODEL_COMPLEXITY, HEART_RADIUS, PLAYER_COOLDOWN, AI_MIN_COOLDOWN, AI_MAX_COOLDOWN, ARM_STRAIGHT_ANGLE,
-    THRUST_SENSITIVITY, AI_ANIMATION_SPEED, AI_ANIMATION_RANGE, PLAYABLE_AREA_MARGIN,
+    HEART_RADIUS, PLAYER_COOLDOWN, AI_MIN_COOLDOWN, AI_MAX_COOLDOWN, AI_ANIMATION_SPEED, AI_ANIMATION_RANGE, PLAYABLE_AREA_MARGIN,
     SOUND_BACKGROUND, SOUND_FIREBALL, SOUND_FIREBALL_2, SOUND_HIT, SOUND_WIN,
     VOLUME_BACKGROUND, VOLUME_FIREBALL, VOLUME_FIREBALL_2, VOLUME_HIT, VOLUME_WIN, CAMERA_ZOOM, DEFAULT_HEALTH,
-    FIREBALL_RADIUS
+    FIREBALL_SPEED, SIMULATION_TICK_RATE, SIMULATION_MAX_TICKS
 )
-from .fireball import Fireball
-from .utils import get_angle, draw_centered_text, zoom_frame, draw_heart
+from .audio import AudioBus
+from .capture import start_capture
+from .clock import SimulationClock
+from .collision import HitTarget, find_hits
+from .compositor import SpriteCompositor
+from .debug import DebugPanel, player_debug_lines
+from .display import Display, NO_KEY
+from .fireball import FireballSystem
+from .gesture import GestureEngine, PlayerState
+from .governor import QualityGovernor
+from .inference import PoseWorker
+from .layout import layout_cache
+from .preprocess import FramePreprocessor
+from .recording import SessionRecorder
+from .sources import CameraSource
+from .sprites import sprite_cache
+from .startup import Startup
+from .telemetry import Telemetry
+from .tracking import LandmarkTracker
+from .ui import OverlayText, UILayer, dim_region
+from .utils import draw_centered_text, draw_heart
 
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        self.mp_pose = mp.solutions.pose
-        self.pose_player1 = self.mp_pose.Pose(
-            model_complexity=MODEL_COMPLEXITY,
-            min_detection_confidence=0.7, 
-            min_tracking_confidence=0.7
-        )
-        self.pose_player2 = self.mp_pose.Pose(
-            model_complexity=MODEL_COMPLEXITY,
-            min_detection_confidence=0.7, 
-            min_tracking_confidence=0.7
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
-
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            print("Error: Cannot open camera.")
-            exit()
+    def __init__(self, source=None, game_mode=None, show_window=True, record_path=None, telemetry=None, net=None):
+        """
+        source is a FrameSource or a function that opens one (default: the camera). Without a window
+        there is no mode menu and no keyboard; game_mode ('single' or 'two', default 'single') is used
+        instead. telemetry is an optional Telemetry instance that times the stages of the game loop.
+        net is a NetHost or NetClient (see netplay.py) for a two-player game over the network; it
+        skips the menu, and this machine's camera plays only one of the players.
+
+        Opening the source, importing MediaPipe and loading sprites and sounds run in parallel on
+        startup threads. The mode menu is shown as soon as the first frame arrives, and Pose models
+        are only built for the players of the chosen mode.
+        """
+        self.startup = startup = Startup()
+        self.governor = QualityGovernor()
+        # MediaPipe is only needed for live play; recorded sessions replay without it
+        mediapipe = startup.submit('import mediapipe', importlib.import_module, 'mediapipe')
+        capture = startup.submit('frame source', self.open_capture, source or CameraSource)
+        # Decode and resize the fireball sprites once, before the first shot is fired
+        sprites = startup.submit('sprites', sprite_cache.preload)
+        # Without a window (CI, benchmark machines) there is no sound either, as in headless()
+        audio = startup.submit('sounds', self.load_audio) if show_window else None
+
+        def build_pose():
+            self.mp_pose = mediapipe.result().solutions.pose
+            return self.create_pose(self.governor.level.model_complexity)
+
+        # Every mode has at least one local player, so its model is built while the menu is on screen
+        poses = [startup.submit('pose model 1', build_pose)]
+        # A client joins the host while the camera opens
+        connection = startup.submit('connect', net.connect) if net is not None and not net.authoritative else None
+
+        try:
+            self.cap, frame = capture.result()
+            startup.mark('first frame')
+            frame_height, frame_width, _ = frame.shape
+            arena = frame_width, frame_height, random.randrange(2 ** 32)
+            if net is not None:
+                # Both ends play on the host's frame size, with its seed
+                arena = connection.result() if connection is not None else net.connect(arena)
+        except RuntimeError:
+            if hasattr(self, 'cap'):
+                self.cap.release()
+            if net is not None:
+                net.close()
+            startup.shutdown()
+            raise
+        frame_width, frame_height, seed = arena
+        self.init_state(frame_width, frame_height, seed, [None, None])
+        self.net = net
+        self.compositor = SpriteCompositor()
+        self.preprocessor = FramePreprocessor(CAMERA_ZOOM)
+        if telemetry is not None:
+            self.telemetry = telemetry
+            self.telemetry.context = self.telemetry_context
+
+        def abort():
+            self.audio = audio.result() if audio is not None else None
+            self.cleanup()
+            startup.shutdown()
+
+        if net is not None:
+            game_mode = 'two'
+        self.show_window = show_window
+        self.window_name = 'Fireball Game'
+        self.display = None
+        if show_window:
+            try:
+                self.display = Display(self.window_name, (frame_width, frame_height))
+            except RuntimeError:
+                abort()
+                raise
+            game_mode = game_mode or self.show_mode_selection()
+            if game_mode is None:
+                abort()
+                raise SystemExit
+        startup.mark('mode chosen')
+        self.set_game_mode(game_mode or 'single')
+        for i in range(len(poses), len(self.local_players)):
+            poses.append(startup.submit(f'pose model {i + 1}', build_pose))
+        for player, pose in zip(self.local_players, poses):
+            player.worker = PoseWorker(pose.result())
+        startup.mark('pose models')
+        if record_path:
+            self.recorder = SessionRecorder(record_path, self.game_mode, self.frame_width, self.frame_height,
+                                            self.seed, len(self.active_players))
+
+        sprites.result()
+        self.audio = audio.result() if audio is not None else None
+        startup.mark('ready')
+        startup.shutdown()
+
+    @staticmethod
+    def open_capture(source):
+        """
+        Opens source (a FrameSource, or a function returning one), starts capturing and reads the
+        first frame. Returns the capture and the frame.
+        """
+        if callable(source):
+            source = source()
+        if not source.isOpened():
+            raise RuntimeError("Cannot open frame source.")
+        cap = start_capture(source)
+        ret, frame = cap.read()
+        if not ret:
+            cap.release()
+            raise RuntimeError("Cannot read frame from frame source.")
+        return cap, frame
 
-        self.fireballs = []
-        self.player1_cooldown = 0
-        self.player2_cooldown = 0
+    @staticmethod
+    def load_audio():
+        """
+        The background music and sound effects; effects are decoded once (cached on disk) and played
+        on the audio thread. Returns None when there is no audio device, and the game plays silently.
+        """
+        try:
+            return AudioBus({
+                'fireball': (SOUND_FIREBALL, VOLUME_FIREBALL),
+                'fireball2': (SOUND_FIREBALL_2, VOLUME_FIREBALL_2),
+                'hit': (SOUND_HIT, VOLUME_HIT),
+                'win': (SOUND_WIN, VOLUME_WIN),
+            }, music=(SOUND_BACKGROUND, VOLUME_BACKGROUND))
+        except RuntimeError as error:
+            # pygame.error (a RuntimeError), e.g. when the mixer finds no audio device
+            print(f"Warning: Could not start sound: {error}")
+            return None
+
+    @classmethod
+    def headless(cls, frame_width, frame_height, game_mode, seed=0, net=None):
+        """
+        A game without camera, pose model, window or sound, e.g. to replay() a recording or to benchmark
+        single stages. It can still draw onto frames of the given size.
+        """
+        game = cls.__new__(cls)
+        game.init_state(frame_width, frame_height, seed, [None, None])
+        game.net = net
+        game.set_game_mode(game_mode)
+        game.governor = QualityGovernor()
+        game.compositor = SpriteCompositor()
+        game.show_window = False
+        game.display = None
+        game.startup = None
+        return game
+
+    def init_state(self, frame_width, frame_height, seed, workers):
+        """Sets up everything the gameplay itself needs, shared by live play and replays."""
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.frame_timestamp = 0.0
+        self.frame_count = 0
+        self.recorder = None
+        self.telemetry = Telemetry()
+        self.debug_panel = DebugPanel()
+        self.audio = None
+        self.overlay_text = OverlayText()
+        self.shown_screen = None
+        self.net = None
+        # All gameplay randomness comes from this seeded generator, so a recorded session replays identically
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        # Player 1 fires to the right, player 2 to the left
+        self.players = [
+            PlayerState('player1', 1, workers[0], LandmarkTracker()),
+            PlayerState('player2', -1, workers[1], LandmarkTracker()),
+        ]
+        self.active_players = self.players
+        self.gestures = GestureEngine()
+
+        self.clock = SimulationClock(SIMULATION_TICK_RATE, SIMULATION_MAX_TICKS)
+        self.fireballs = FireballSystem(speed=FIREBALL_SPEED * self.clock.time_scale)
         self.ai_cooldown = 0
         self.game_over_state = False
         self.winner = None
@@ -48,43 +214,81 @@ class Game:
         self.player1_health = DEFAULT_HEALTH
         self.player2_health = DEFAULT_HEALTH
         self.ai_health = DEFAULT_HEALTH
-        
-        ret, frame = self.cap.read()
-        if not ret:
-            print("Error: Cannot read frame from camera.")
-            exit()
-        self.frame_height, self.frame_width, _ = frame.shape
 
         self.ai_base_pos = (self.frame_width - 100, self.frame_height // 2)
         self.ai_heart_pos = self.ai_base_pos
+        self.ai_previous_heart_pos = self.ai_base_pos
         self.animation_time = 0
 
-        self.window_name = 'Fireball Game'
-        cv2.namedWindow(self.window_name, cv2.WND_PROP_FULLSCREEN)
-        cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
-        self.last_wrist_z_p1 = None
-        self.last_wrist_z_p2 = None
-        self.debug_data_p1 = {}
-        self.debug_data_p2 = {}
-        self.game_mode = self.show_mode_selection()
         self.paused = False # Added for pause functionality
         self.show_exit_confirm = False # For ESC confirmation
 
-        # --- 音效加载 ---
-        pygame.mixer.music.load(SOUND_BACKGROUND)
-        pygame.mixer.music.play(-1)  # -1表示无限循环
-        self.fireball_sound = pygame.mixer.Sound(SOUND_FIREBALL)
-        self.fireball2_sound = pygame.mixer.Sound(SOUND_FIREBALL_2)
-        self.hit_sound = pygame.mixer.Sound(SOUND_HIT)
-        self.win_sound = pygame.mixer.Sound(SOUND_WIN)
-
-        # --- 设置音量 ---
-        pygame.mixer.music.set_volume(VOLUME_BACKGROUND)
-        self.fireball_sound.set_volume(VOLUME_FIREBALL)
-        self.fireball2_sound.set_volume(VOLUME_FIREBALL_2)
-        self.hit_sound.set_volume(VOLUME_HIT)
-        self.win_sound.set_volume(VOLUME_WIN)
+    def set_game_mode(self, game_mode):
+        self.game_mode = game_mode
+        mid_x = self.frame_width // 2
+        if self.game_mode == 'single':
+            self.players[0].set_region(0, self.frame_width, self.frame_height)
+            self.active_players = self.players[:1]
+        else:
+            self.players[0].set_region(0, mid_x, self.frame_height)
+            self.players[1].set_region(mid_x, self.frame_width - mid_x, self.frame_height)
+            self.active_players = self.players
+        # The players tracked by this machine's camera; in a networked game the other one is remote
+        self.local_players = self.active_players if self.net is None else [self.players[self.net.player_index]]
+        self.ui = self.create_ui()
+
+    def create_ui(self):
+        """The UI layer of the current mode: static borders drawn once, text panels filled in each frame."""
+        ui = UILayer(self.frame_width, self.frame_height)
+        self.play_areas = []
+        if self.game_mode == 'two':
+            margin = PLAYABLE_AREA_MARGIN
+            mid_x = self.frame_width // 2
+            self.play_areas = [((margin, margin), (mid_x - margin, self.frame_height - margin)),
+                               ((mid_x + margin, margin), (self.frame_width - margin, self.frame_height - margin))]
+            for i, (top_left, bottom_right) in enumerate(self.play_areas):
+                self.draw_dashed_rect(ui.static, top_left, bottom_right, (255, 255, 255, 255), 2, 15)
+                ui.set_text(f'out_of_bounds_{i}', "OUT OF BOUNDS", (top_left[0] + 20, top_left[1] + 40),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 3, visible=False)
+            ui.invalidate()
+        return ui
+
+    def telemetry_context(self):
+        """Extra fields for each telemetry log line."""
+        return {
+            'mode': self.game_mode,
+            'quality': self.governor.describe(),
+            'frames_captured': self.cap.frames_captured,
+            'frames_dropped': self.cap.frames_dropped,
+            'ticks_dropped': self.clock.dropped_ticks,
+            'fireballs': len(self.fireballs),
+            'frames_presented': self.display.frames_presented if self.display else 0,
+            'frames_not_presented': self.display.frames_dropped if self.display else 0,
+        }
+
+    def play_sound(self, name):
+        """Emits a sound effect event; without audio (headless) it is ignored."""
+        if self.audio is not None:
+            self.audio.emit(name)
+
+    def create_pose(self, model_complexity):
+        return self.mp_pose.Pose(
+            model_complexity=model_complexity,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+
+    def update_quality(self, frame_cost):
+        """
+        Feeds the frame cost to the governor and rebuilds the Pose models if the complexity changed.
+        The models are built on the workers' build threads, so the loop does not stall meanwhile.
+        """
+        previous = self.governor.level
+        if self.governor.record(frame_cost):
+            level = self.governor.level
+            if level.model_complexity != previous.model_complexity:
+                for player in self.local_players:
+                    player.worker.replace_pose(functools.partial(self.create_pose, level.model_complexity))
 
     def show_mode_selection(self):
         selection = None
@@ -99,20 +303,26 @@ class Game:
             self.frame_height // 2 - button_height // 2
         )
 
-        def mouse_callback(event, x, y, flags, param):
-            nonlocal selection
-            if event == cv2.EVENT_LBUTTONDOWN:
-                if single_player_pos[0] < x < single_player_pos[0] + button_width and \
-                   single_player_pos[1] < y < single_player_pos[1] + button_height:
-                    selection = 'single'
-                elif two_player_pos[0] < x < two_player_pos[0] + button_width and \
-                     two_player_pos[1] < y < two_player_pos[1] + button_height:
-                    selection = 'two'
-
-        cv2.setMouseCallback(self.window_name, mouse_callback)
+        def button_at(x, y):
+            if single_player_pos[0] < x < single_player_pos[0] + button_width and \
+               single_player_pos[1] < y < single_player_pos[1] + button_height:
+                return 'single'
+            if two_player_pos[0] < x < two_player_pos[0] + button_width and \
+               two_player_pos[1] < y < two_player_pos[1] + button_height:
+                return 'two'
+            return None
 
         while selection is None:
-            frame = self.cap.read()[1]
+            success, frame = self.cap.read()
+            if not success:
+                if not self.cap.isOpened():
+                    print("Frame source ended before a mode was chosen.")
+                    return None
+                # No new frame yet; the window still answers keys meanwhile
+                key = self.display.poll_key()
+                if key == ord('q') or key == 27:
+                    return None
+                continue
             frame = cv2.flip(frame, 1)
             
             # Single Player Button
@@ -123,385 +333,420 @@ class Game:
             cv2.rectangle(frame, two_player_pos, (two_player_pos[0] + button_width, two_player_pos[1] + button_height), (0, 0, 255), -1)
             cv2.putText(frame, 'Two Player', (two_player_pos[0] + 70, two_player_pos[1] + 65), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
             
-            cv2.imshow(self.window_name, frame)
-            key = cv2.waitKey(1) & 0xFF
+            # A new frame every time, so it can be handed over without copying
+            self.display.present(frame)
+            if self.startup is not None:
+                self.startup.mark('menu shown')
+            key = self.display.poll_key()
             if key == ord('q') or key == 27: # 'q' or ESC key to exit
-                exit()
-        
-        cv2.setMouseCallback(self.window_name, lambda *args: None)
+                return None
+            click = self.display.poll_click()
+            while click is not None and selection is None:
+                selection = button_at(*click)
+                click = self.display.poll_click()
+
         return selection
 
-    def run(self):
-        while self.cap.isOpened():
-            success, frame = self.cap.read()
-            if not success:
+    def run(self, max_frames=0):
+        """Plays until the player quits, the frame source ends or max_frames frames (0 = no limit) were shown."""
+        started = time.perf_counter()
+        while self.cap.isOpened() and not (max_frames and self.frame_count >= max_frames):
+            captured = self.cap.read_latest()
+            if captured is None:
                 continue
-
-            frame = zoom_frame(frame, CAMERA_ZOOM)
-            frame = cv2.flip(frame, 1)
-
-            key = cv2.waitKey(5) & 0xFF
-            if key == ord(' '): # Spacebar to toggle pause
-                if not self.show_exit_confirm:
-                    self.paused = not self.paused
-                    if self.paused:
-                        pygame.mixer.music.pause()
-                    else:
-                        pygame.mixer.music.unpause()
-            elif key == 27: # ESC key to show exit confirmation
-                if not self.show_exit_confirm:
-                    self.show_exit_confirm = True
-                else:
-                    self.show_exit_confirm = False
-            elif key == ord('q'): # 'q' key to exit directly
-                break
-            elif key == ord('y') and self.show_exit_confirm: # Confirm exit
+            frame = captured.frame
+            self.frame_timestamp = captured.timestamp
+            self.frame_count += 1
+            frame_start = time.perf_counter()
+            telemetry = self.telemetry
+            telemetry.begin_frame(captured.timestamp)
+
+            # While a pause or game-over screen is on display, the camera image behind it is frozen
+            frozen = self.shown_screen is not None
+            if not frozen:
+                # Zoom and mirror into a display frame the display is not still showing
+                frame = self.preprocessor.display_frame(frame, self.display)
+                telemetry.lap('preprocess')
+
+            # Keys arrive through the display's event queue; polling never waits
+            key = self.display.poll_key() if self.display else NO_KEY
+            telemetry.lap('input')
+            running = self.step(key, None if frozen else frame)
+            if self.recorder is not None:
+                self.recorder.write(self.frame_timestamp, key, self.active_players)
+                telemetry.lap('record')
+            if not running:
                 break
-            elif key == ord('n') and self.show_exit_confirm: # Cancel exit
-                self.show_exit_confirm = False
 
-            if self.game_over_state:
-                if key == ord('r'):
-                    self.reset_game()
-                self.draw_overlay_text(frame, f"{self.winner if self.winner else ''} Wins!", "Press 'r' to restart",
-                                       main_color=(0, 255, 0), overlay_alpha=0.5)
-            elif self.paused:
-                self.draw_overlay_text(frame, "PAUSED", overlay_alpha=0.6)
-            else:
-                if self.game_mode == 'single':
-                    self.run_single_player(frame)
-                else:
-                    self.run_two_player(frame)
-
-            # Display exit confirmation dialog if needed
-            if self.show_exit_confirm:
-                self.draw_overlay_text(frame, "Exit Game?",
-                                     "Press 'Y' to exit, 'N' to cancel, or ESC to toggle",
-                                     main_scale=2, main_thickness=4)
-
-            # Scale frame to screen resolution
-            frame_resized = cv2.resize(frame, (self.frame_width, self.frame_height))
-            cv2.imshow(self.window_name, frame_resized)
-        
+            screen = self.screen_state()
+            if screen is not None and screen == self.shown_screen:
+                # Still showing the same screen: nothing to draw or display
+                telemetry.end_frame()
+                continue
+            if frozen:
+                frame = self.preprocessor.display_frame(frame, self.display)
+            if self.net is not None:
+                # Each machine shows its own camera, scaled into its player's half of the shared arena
+                player = self.local_players[0]
+                frame = self.preprocessor.arena_frame(frame, self.frame_width, self.frame_height, player.offset_x,
+                                                      player.width, self.display)
+            self.shown_screen = screen
+            self.draw(frame)
+            telemetry.lap('draw')
+            telemetry.draw(frame)
+
+            if self.display:
+                # Hands the frame to the display thread, which scales it to the screen
+                self.display.present(frame)
+                telemetry.lap('display')
+            telemetry.end_frame()
+            if self.startup is not None:
+                self.startup.mark('first playable frame')
+                self.startup.report()
+                self.startup = None
+
+            if not (self.paused or self.game_over_state):
+                # With pipelined inference the slower of the main loop and the pose worker sets the pace;
+                # inference that only runs every few frames costs that fraction of it per frame
+                interval = self.governor.level.inference_interval
+                self.update_quality(max(time.perf_counter() - frame_start,
+                                        *(player.worker.inference_time /
+                                          max(interval, player.tracker.suggested_interval())
+                                          for player in self.local_players)))
+
+        elapsed = time.perf_counter() - started
+        if elapsed > 0:
+            print(f"Played {self.frame_count} frames in {elapsed:.1f} s ({self.frame_count / elapsed:.1f} FPS)")
         self.cleanup()
 
-    def run_single_player(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose_player1.process(rgb_frame)
+    def screen_state(self):
+        """
+        What the pause/game-over screen shows, or None during play. While it stays the same, the
+        screen on display is kept instead of being drawn again.
+        """
+        if not (self.paused or self.game_over_state):
+            return None
+        return self.paused, self.game_over_state, self.winner, self.show_exit_confirm
 
-        self.animate_ai()
+    def replay(self, recording):
+        """
+        Runs a recorded session through the gameplay logic as fast as possible and returns its outcome.
+        The digest covers every fireball position of every frame, so equal digests mean equal games.
+        """
+        start = time.perf_counter()
+        digest = hashlib.sha1()
+        frames = 0
+        for index in range(len(recording)):
+            self.frame_timestamp, key = recording.restore(index, self.active_players)
+            self.frame_count += 1
+            frames += 1
+            if not self.step(key):
+                break
+            digest.update(self.fireballs.positions[self.fireballs.active_indices()].tobytes())
+        elapsed = time.perf_counter() - start
+
+        duration = float(recording.frames['timestamp'][frames - 1] - recording.frames['timestamp'][0]) if frames else 0.0
+        return {
+            'frames': frames,
+            'duration': duration,
+            'elapsed': elapsed,
+            'speedup': duration / elapsed if elapsed > 0 else 0.0,
+            'fireballs': self.fireballs.spawned,
+            'player1_health': self.player1_health,
+            'player2_health': self.player2_health,
+            'ai_health': self.ai_health,
+            'winner': self.winner,
+            'digest': digest.hexdigest(),
+        }
 
-        player_landmarks = None
-        if results.pose_landmarks:
-            player_landmarks = results.pose_landmarks
+    def step(self, key, frame=None):
+        """
+        Advances the game by one camera frame: handles the key pressed, tracks the players in frame
+        and runs their gestures, the AI and the simulation ticks that are due. Without a frame (replay)
+        the player tracking state must already be set. Returns False when the game should quit.
+        """
+        if key == ord(' '): # Spacebar to toggle pause
+            if not self.show_exit_confirm:
+                self.press_shared_key(key)
+        elif key == 27: # ESC key to show exit confirmation
+            if not self.show_exit_confirm:
+                self.show_exit_confirm = True
+            else:
+                self.show_exit_confirm = False
+        elif key == ord('q'): # 'q' key to exit directly
+            return False
+        elif key == ord('y') and self.show_exit_confirm: # Confirm exit
+            return False
+        elif key == ord('n') and self.show_exit_confirm: # Cancel exit
+            self.show_exit_confirm = False
+        elif key == ord('f'): # Toggle the FPS/latency overlay (when telemetry is enabled)
+            self.telemetry.show_overlay = not self.telemetry.show_overlay
+        elif key == ord('d'): # Toggle the debug panel
+            self.debug_panel.toggle()
+
+        if self.net is not None:
+            # The remote player's landmarks, keys and shots (host) or the host's game state (client)
+            self.net.receive(self)
+            self.telemetry.lap('net_receive')
 
-        if player_landmarks:
-            self.handle_player_input(player_landmarks, 'player1')
+        if self.game_over_state:
+            if key == ord('r'):
+                self.press_shared_key(key)
+        elif not self.paused:
+            if frame is not None:
+                for player in self.local_players:
+                    # A networked player has the whole camera image to itself
+                    region = frame if self.net is not None else frame[:, player.offset_x:player.offset_x + player.width]
+                    self.track_player(player, region)
+                self.telemetry.lap('tracking')
+            self.update_players()
+            self.telemetry.lap('gestures')
+            if self.game_mode == 'single':
+                self.simulate_single_player()
+            else:
+                self.simulate_two_player()
+            self.telemetry.lap('simulation')
+
+        if self.net is not None:
+            self.net.send(self)
+            self.telemetry.lap('net_send')
+        return True
+
+    def press_shared_key(self, key):
+        """Pause and restart change the game of both players: a network client asks the host for them."""
+        if self.net is not None and not self.net.authoritative:
+            self.net.send_key(key)
+        elif key == ord(' '):
+            self.set_paused(not self.paused)
+        elif key == ord('r') and self.game_over_state:
+            self.reset_game()
+
+    def set_paused(self, paused):
+        self.paused = paused
+        self.clock.reset()
+        if self.audio is not None:
+            self.audio.pause_music(paused)
+
+    def draw(self, frame):
+        if self.game_over_state:
+            self.draw_overlay_text(frame, f"{self.winner if self.winner else ''} Wins!", "Press 'r' to restart",
+                                   main_color=(0, 255, 0), overlay_alpha=0.5)
+        elif self.paused:
+            self.draw_overlay_text(frame, "PAUSED", overlay_alpha=0.6)
+        elif self.game_mode == 'single':
+            self.draw_fireballs(frame)
+            self.draw_ui_single_player(frame)
+            self.draw_debug_info(frame)
         else:
-            self.debug_data_p1 = {} # Clear debug data if no player
-
-        if not self.game_over_state and player_landmarks:
-            self.handle_ai_action(player_landmarks)
-            self.check_collisions_single_player(player_landmarks)
-
-        self.update_and_draw_fireballs(frame)
-        self.draw_ui_single_player(frame, player_landmarks)
-        self.draw_debug_info_single_player(frame)
+            self.draw_fireballs(frame)
+            self.draw_ui_two_player(frame, self.frame_width // 2)
+            self.draw_debug_info(frame)
+
+        # Display exit confirmation dialog if needed
+        if self.show_exit_confirm:
+            self.draw_overlay_text(frame, "Exit Game?",
+                                 "Press 'Y' to exit, 'N' to cancel, or ESC to toggle",
+                                 main_scale=2, main_thickness=4)
+
+    def simulate_single_player(self):
+        player = self.players[0]
+        if not self.game_over_state and player.detected:
+            self.handle_ai_action(player)
+
+        # Advance the simulation by however many fixed ticks have elapsed since the last frame
+        for _ in range(self.clock.advance(self.frame_timestamp)):
+            self.animate_ai()
+            self.update_fireballs()
+            if not self.game_over_state and player.detected:
+                self.check_collisions_single_player()
+            self.fireballs.cull(self.frame_width, self.frame_height)
+
+    def simulate_two_player(self):
+        for _ in range(self.clock.advance(self.frame_timestamp)):
+            self.update_fireballs()
+            # Only the host of a networked game decides hits
+            if not self.game_over_state and (self.net is None or self.net.authoritative):
+                self.check_collisions_two_player()
+            self.fireballs.cull(self.frame_width, self.frame_height)
+
+    def update_players(self):
+        """Derives the gestures of all active players in one pass and acts on new inference results."""
+        self.gestures.update(self.active_players)
+        for player in self.active_players:
+            # Gestures are measured between inferences, so only act on results that were not seen yet
+            if player.fresh_landmarks is not None:
+                self.handle_player_input(player)
+
+    def track_player(self, player, frame):
+        """
+        Submits the player's frame region for pose inference when it is due and stores on the player
+        the landmarks predicted for this frame and, for a new inference result, its filtered landmarks.
+        Inference is skipped on frames where neither the governor nor the player's movement needs it.
+        """
+        tracker = player.tracker
+        level = self.governor.level
+        interval = max(level.inference_interval, tracker.suggested_interval())
+        if self.frame_count % interval == 0:
+            rgb_frame = self.preprocessor.inference_frame(frame, level.inference_width, player.worker, player.name)
+            player.worker.submit(rgb_frame, self.frame_timestamp)
+
+        pose = player.worker.latest(self.frame_timestamp)
+        if pose is None or pose.landmarks is None:
+            if tracker.active:
+                tracker.reset()
+                player.reset()
+            return
+        player.fresh_landmarks = None
+        if pose.fresh:
+            player.fresh_landmarks = tracker.update(pose.landmarks, pose.timestamp).points
+            player.fresh_timestamp = pose.timestamp
+        player.landmarks = tracker.predict(self.frame_timestamp).points
 
-    def run_two_player(self, frame):
-        mid_x = self.frame_width // 2
-        
-        # Player 1 (Left side)
-        frame_p1 = frame[:, :mid_x]
-        rgb_frame_p1 = cv2.cvtColor(frame_p1, cv2.COLOR_BGR2RGB)
-        results_p1 = self.pose_player1.process(rgb_frame_p1)
-
-        # Player 2 (Right side)
-        frame_p2 = frame[:, mid_x:]
-        rgb_frame_p2 = cv2.cvtColor(frame_p2, cv2.COLOR_BGR2RGB)
-        results_p2 = self.pose_player2.process(rgb_frame_p2)
-
-        player1_landmarks = None
-        if results_p1.pose_landmarks:
-            player1_landmarks = results_p1.pose_landmarks
-
-        player2_landmarks = None
-        if results_p2.pose_landmarks:
-            player2_landmarks = results_p2.pose_landmarks
-
-        if player1_landmarks:
-            self.handle_player_input(player1_landmarks, 'player1')
-        else:
-            self.debug_data_p1 = {}
+    def animate_ai(self):
+        self.ai_previous_heart_pos = self.ai_heart_pos
+        self.animation_time += AI_ANIMATION_SPEED * self.clock.time_scale
+        v_offset = int(math.sin(self.animation_time) * AI_ANIMATION_RANGE)
+        self.ai_heart_pos = (self.ai_base_pos[0], self.ai_base_pos[1] + v_offset)
 
-        if player2_landmarks:
-            self.handle_player_input(player2_landmarks, 'player2', offset_x=mid_x)
-        else:
-            self.debug_data_p2 = {}
+    def handle_player_input(self, player):
+        current_time = self.frame_timestamp
+        if current_time <= player.cooldown or not (player.arms_straight and player.thrusting):
+            return
+        player.cooldown = current_time + PLAYER_COOLDOWN
 
-        if not self.game_over_state:
-            self.check_collisions_two_player(player1_landmarks, player2_landmarks, mid_x)
+        # --- Direction Check ---
+        dir_x, dir_y = player.aim
+        magnitude = player.magnitude
+        is_firing_forward = dir_x * player.fire_direction > 0
 
-        self.update_and_draw_fireballs(frame)
-        self.draw_ui_two_player(frame, player1_landmarks, player2_landmarks, mid_x)
-        self.draw_debug_info_two_player(frame)
+        is_firing_upwards = True
+        if magnitude > 0:
+            norm_dir_y = dir_y / magnitude
+            if norm_dir_y > 0.8: # Corresponds to about 53 degrees downward
+                is_firing_upwards = False
 
-    def animate_ai(self):
-        self.animation_time += AI_ANIMATION_SPEED
-        v_offset = int(math.sin(self.animation_time) * AI_ANIMATION_RANGE)
-        self.ai_heart_pos = (self.ai_base_pos[0], self.ai_base_pos[1] + v_offset)
+        if is_firing_forward and is_firing_upwards:
+            # --- Fireball Creation ---
+            if magnitude > 0:
+                norm_dir_x = dir_x / magnitude
+                norm_dir_y = dir_y / magnitude
+            else:
+                norm_dir_x, norm_dir_y = 0, -1 # Fallback
 
-    def handle_player_input(self, player_landmarks, player, offset_x=0):
-        current_time = time.time()
-        
-        landmarks = player_landmarks.landmark
-        
-        left_wrist = landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST]
-        right_wrist = landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST]
-        left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        left_elbow = landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW]
-        right_elbow = landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW]
-
-        left_arm_angle = get_angle(left_shoulder, left_elbow, left_wrist)
-        right_arm_angle = get_angle(right_shoulder, right_elbow, right_wrist)
-        arms_are_straight = left_arm_angle > ARM_STRAIGHT_ANGLE and right_arm_angle > ARM_STRAIGHT_ANGLE
-
-        last_wrist_z = self.last_wrist_z_p1 if player == 'player1' else self.last_wrist_z_p2
-        current_wrist_z = (left_wrist.z + right_wrist.z) / 2
-        forward_velocity = 0
-        if last_wrist_z is not None:
-            forward_velocity = last_wrist_z - current_wrist_z
-        
-        if player == 'player1':
-            self.last_wrist_z_p1 = current_wrist_z
-        else:
-            self.last_wrist_z_p2 = current_wrist_z
+            palm_offset = 30  # pixels
+            wrist_pixel_x, wrist_pixel_y = player.wrist_pos
+            start_x = wrist_pixel_x + norm_dir_x * palm_offset
+            start_y = wrist_pixel_y + norm_dir_y * palm_offset
 
-        is_thrusting = abs(forward_velocity) >= THRUST_SENSITIVITY
+            target_x = start_x + dir_x * 100
+            target_y = start_y + dir_y * 100
 
-        # --- Calculate Fire Angle for Debugging ---
-        player_frame_width = self.frame_width if self.game_mode == 'single' else self.frame_width // 2
-        wrist_mid_x = (left_wrist.x + right_wrist.x) / 2
-        wrist_mid_y = (left_wrist.y + right_wrist.y) / 2
-        elbow_mid_x = (left_elbow.x + right_elbow.x) / 2
-        elbow_mid_y = (left_elbow.y + right_elbow.y) / 2
+            fireball = self.fireballs.spawn(start_x, start_y, target_x, target_y, player.name)
+            # A thrust fires once; the next shot needs a new one
+            player.clear_history()
+            if self.net is not None and not self.net.authoritative:
+                # Shown at once; the host decides whether the shot really happened
+                self.net.predict_shot(fireball, target_x, target_y)
 
-        wrist_pixel_x = wrist_mid_x * player_frame_width + offset_x
-        wrist_pixel_y = wrist_mid_y * self.frame_height
-        elbow_pixel_x = elbow_mid_x * player_frame_width + offset_x
-        elbow_pixel_y = elbow_mid_y * self.frame_height
-        
-        dir_x = wrist_pixel_x - elbow_pixel_x
-        dir_y = wrist_pixel_y - elbow_pixel_y
-        magnitude = math.hypot(dir_x, dir_y)
-        
-        fire_angle_rad = math.atan2(dir_y, dir_x)
-        fire_angle_deg = math.degrees(fire_angle_rad)
-
-        debug_data = {
-            'L-Angle': left_arm_angle,
-            'R-Angle': right_arm_angle,
-            'Arms Straight': arms_are_straight,
-            'Fwd Velocity': forward_velocity,
-            'Thrusting': is_thrusting,
-            'Fire Angle': fire_angle_deg,
-            'dir_x': dir_x,
-            'dir_y': dir_y,
-            'magnitude': magnitude
-        }
+            if player.name == 'player1':
+                self.play_sound('fireball')
+            else:
+                self.play_sound('fireball2')
 
-        if player == 'player1':
-            self.debug_data_p1 = debug_data
-        else:
-            self.debug_data_p2 = debug_data
-
-        cooldown = self.player1_cooldown if player == 'player1' else self.player2_cooldown
-
-        if current_time > cooldown:
-            if arms_are_straight and is_thrusting:
-                if player == 'player1':
-                    self.player1_cooldown = current_time + PLAYER_COOLDOWN
-                else:
-                    self.player2_cooldown = current_time + PLAYER_COOLDOWN
-
-                # --- Direction Check ---
-                is_firing_forward = False
-                if (player == 'player1' or self.game_mode == 'single') and dir_x > 0: # Player 1/Single Player fires right
-                    is_firing_forward = True
-                elif player == 'player2' and dir_x < 0: # Player 2 fires left
-                    is_firing_forward = True
-
-                is_firing_upwards = True
-                if magnitude > 0:
-                    norm_dir_y = dir_y / magnitude
-                    if norm_dir_y > 0.8: # Corresponds to about 53 degrees downward
-                        is_firing_upwards = False
-
-                if is_firing_forward and is_firing_upwards:
-                    # --- Fireball Creation ---
-                    if magnitude > 0:
-                        norm_dir_x = dir_x / magnitude
-                        norm_dir_y = dir_y / magnitude
-                    else:
-                        norm_dir_x, norm_dir_y = 0, -1 # Fallback
-
-                    palm_offset = 30  # pixels
-                    start_x = wrist_pixel_x + norm_dir_x * palm_offset
-                    start_y = wrist_pixel_y + norm_dir_y * palm_offset
-
-                    target_x = start_x + dir_x * 100
-                    target_y = start_y + dir_y * 100
-
-                    self.fireballs.append(Fireball(start_x, start_y, target_x, target_y, player))
-                    
-                    if player == 'player1':
-                        self.fireball_sound.play()
-                    else:
-                        self.fireball2_sound.play()
-                    
-                    if player == 'player1':
-                        self.last_wrist_z_p1 = None
-                    else:
-                        self.last_wrist_z_p2 = None
-    
-    def handle_ai_action(self, player_landmarks):
-        current_time = time.time()
+    def handle_ai_action(self, player):
+        current_time = self.frame_timestamp
         if current_time > self.ai_cooldown:
-            self.ai_cooldown = current_time + random.uniform(AI_MIN_COOLDOWN, AI_MAX_COOLDOWN)
-            player_heart_pos = self.get_heart_position(player_landmarks.landmark)
-            
+            self.ai_cooldown = current_time + self.random.uniform(AI_MIN_COOLDOWN, AI_MAX_COOLDOWN)
+            player_heart_pos = player.heart_pos
+
             ai_start_x = self.ai_heart_pos[0] - 30
             ai_start_y = self.ai_heart_pos[1]
-            self.fireballs.append(Fireball(ai_start_x, ai_start_y, player_heart_pos[0], player_heart_pos[1], 'ai'))
-            self.fireball2_sound.play()
-
-    def get_heart_position(self, landmarks, offset_x=0, width=None):
-        if width is None:
-            width = self.frame_width
-        left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        heart_x = (left_shoulder.x + right_shoulder.x) / 2 * width + offset_x
-        heart_y = (left_shoulder.y + right_shoulder.y) / 2 * self.frame_height + 30
-        return int(heart_x), int(heart_y)
-
-    def update_and_draw_fireballs(self, frame):
-        for fireball in self.fireballs[:]:
-            fireball.update()
-            fireball.draw(frame)
-            if not (0 < fireball.x < self.frame_width and 0 < fireball.y < self.frame_height):
-                self.fireballs.remove(fireball)
-
-    def check_collisions_single_player(self, player_landmarks):
-        player_heart_pos = self.get_heart_position(player_landmarks.landmark)
-
-        for fireball in self.fireballs[:]:
-            if fireball.owner == 'ai' and not fireball.hit:
-                if math.hypot(fireball.x - player_heart_pos[0], fireball.y - player_heart_pos[1]) < HEART_RADIUS + FIREBALL_RADIUS:
-                    self.player1_health -= 1
-                    fireball.hit = True
-                    self.hit_sound.play()
-                    if self.player1_health <= 0:
-                        self.game_over_state = True
-                        self.winner = 'AI'
-                        self.win_sound.play()
-                    self.fireballs.remove(fireball)
-
-            elif fireball.owner == 'player1' and not fireball.hit:
-                if math.hypot(fireball.x - self.ai_heart_pos[0], fireball.y - self.ai_heart_pos[1]) < HEART_RADIUS + FIREBALL_RADIUS:
-                    self.ai_health -= 1
-                    fireball.hit = True
-                    self.hit_sound.play()
-                    if self.ai_health <= 0:
-                        self.game_over_state = True
-                        self.winner = 'Player'
-                        self.win_sound.play()
-                    self.fireballs.remove(fireball)
-
-    def check_collisions_two_player(self, player1_landmarks, player2_landmarks, mid_x):
-        if not player1_landmarks or not player2_landmarks:
+            self.fireballs.spawn(ai_start_x, ai_start_y, player_heart_pos[0], player_heart_pos[1], 'ai')
+            self.play_sound('fireball2')
+
+    def update_fireballs(self):
+        """Moves all fireballs by one simulation tick."""
+        self.fireballs.update()
+
+    def draw_fireballs(self, frame):
+        # All sprite fireballs are blended in a single compositor pass, between the last two ticks
+        self.fireballs.draw(frame, self.compositor, self.clock.alpha)
+
+    def check_collisions_single_player(self):
+        self.apply_hits([
+            HitTarget('player1', self.players[0].heart_pos, hit_by=('ai',)),
+            HitTarget('ai', self.ai_heart_pos, hit_by=('player1',)),
+        ], winners={'player1': 'AI', 'ai': 'Player'})
+
+    def check_collisions_two_player(self):
+        player1, player2 = self.players
+        if not player1.detected or not player2.detected:
             return
 
-        player1_heart_pos = self.get_heart_position(player1_landmarks.landmark, 0, mid_x)
-        player2_heart_pos = self.get_heart_position(player2_landmarks.landmark, mid_x, self.frame_width / 2)
-
-        for fireball in self.fireballs[:]:
-            if fireball.owner == 'player1' and not fireball.hit:
-                if math.hypot(fireball.x - player2_heart_pos[0], fireball.y - player2_heart_pos[1]) < HEART_RADIUS + FIREBALL_RADIUS:
-                    self.player2_health -= 1
-                    fireball.hit = True
-                    self.hit_sound.play()
-                    if self.player2_health <= 0:
-                        self.game_over_state = True
-                        self.winner = 'Player 1'
-                        self.win_sound.play()
-                    self.fireballs.remove(fireball)
-
-            elif fireball.owner == 'player2' and not fireball.hit:
-                if math.hypot(fireball.x - player1_heart_pos[0], fireball.y - player1_heart_pos[1]) < HEART_RADIUS + FIREBALL_RADIUS:
-                    self.player1_health -= 1
-                    fireball.hit = True
-                    self.hit_sound.play()
-                    if self.player1_health <= 0:
-                        self.game_over_state = True
-                        self.winner = 'Player 2'
-                        self.win_sound.play()
-                    self.fireballs.remove(fireball)
-
-    def draw_ui_single_player(self, frame, player_landmarks):
-        # Draw health bars
-        cv2.putText(frame, f"Player Health: {self.player1_health}", (10, self.frame_height - 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"AI Health: {self.ai_health}", (self.frame_width - 250, self.frame_height - 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-        if player_landmarks:
-            heart_pos = self.get_heart_position(player_landmarks.landmark)
+        self.apply_hits([
+            HitTarget('player1', player1.heart_pos, hit_by=('player2',)),
+            HitTarget('player2', player2.heart_pos, hit_by=('player1',)),
+        ], winners={'player1': 'Player 2', 'player2': 'Player 1'})
+
+    def apply_hits(self, targets, winners):
+        """
+        Applies the hits found by the collision engine: every target name has a matching
+        '<name>_health' attribute, and winners maps a target to whoever wins when it drops to zero.
+        """
+        hits = find_hits(self.fireballs, targets)
+        for hit in hits:
+            health = getattr(self, f"{hit.target}_health") - 1
+            setattr(self, f"{hit.target}_health", health)
+            self.fireballs.hits[hit.index] = True
+            self.play_sound('hit')
+            if health <= 0 and not self.game_over_state:
+                self.game_over_state = True
+                self.winner = winners[hit.target]
+                self.play_sound('win')
+        self.fireballs.remove_indices([hit.index for hit in hits])
+
+    def draw_ui_single_player(self, frame):
+        # Health panels are only re-rendered when the value changes
+        self.ui.set_text('health_0', f"Player Health: {self.player1_health}", (10, self.frame_height - 60),
+                         cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        self.ui.set_text('health_1', f"AI Health: {self.ai_health}", (self.frame_width - 250, self.frame_height - 60),
+                         cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        self.ui.composite(frame)
+
+        if self.players[0].detected:
+            heart_pos = self.players[0].heart_pos
             draw_heart(frame, heart_pos, HEART_RADIUS // 3, (0, 0, 255))
             draw_centered_text(frame, "Player", heart_pos, HEART_RADIUS * 4)
 
-        draw_heart(frame, self.ai_heart_pos, HEART_RADIUS // 3, (255, 0, 0))
-        draw_centered_text(frame, "AI", self.ai_heart_pos, HEART_RADIUS * 4)
+        ai_heart_pos = self.clock.interpolate(self.ai_previous_heart_pos, self.ai_heart_pos)
+        draw_heart(frame, ai_heart_pos, HEART_RADIUS // 3, (255, 0, 0))
+        draw_centered_text(frame, "AI", ai_heart_pos, HEART_RADIUS * 4)
 
     def draw_overlay_text(self, frame, main_text, sub_text=None, main_font=cv2.FONT_HERSHEY_TRIPLEX,
                          main_scale=3, main_thickness=5, main_color=(255, 255, 255),
                          sub_font=cv2.FONT_HERSHEY_SIMPLEX, sub_scale=1, sub_thickness=2,
                          sub_color=(200, 200, 200), overlay_alpha=0.7, spacing=50):
         """
-        Display overlay text with optional subtitle
+        Display overlay text with optional subtitle. The frame is dimmed in place and the text block
+        is rendered once and then blended from the cache.
         """
-        # Create overlay
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (0, 0), (self.frame_width, self.frame_height), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, overlay_alpha, frame, 1 - overlay_alpha, 0, frame)
-
-        # Main text
-        main_text_size = cv2.getTextSize(main_text, main_font, main_scale, main_thickness)[0]
-        main_text_x = (self.frame_width - main_text_size[0]) // 2
-        main_text_y = (self.frame_height - main_text_size[1]) // 2
-
-        if sub_text:
-            main_text_y -= spacing // 2
-
-        cv2.putText(frame, main_text, (main_text_x, main_text_y), main_font, main_scale, main_color, main_thickness)
-
-        # Sub text if provided
-        if sub_text:
-            sub_text_size = cv2.getTextSize(sub_text, sub_font, sub_scale, sub_thickness)[0]
-            sub_text_x = (self.frame_width - sub_text_size[0]) // 2
-            sub_text_y = main_text_y + main_text_size[1] + spacing
-            cv2.putText(frame, sub_text, (sub_text_x, sub_text_y), sub_font, sub_scale, sub_color, sub_thickness)
+        dim_region(frame, overlay_alpha)
+        self.overlay_text.get(frame.shape, main_text, sub_text, main_font, main_scale, main_thickness, main_color,
+                              sub_font, sub_scale, sub_thickness, sub_color, spacing).blend(frame)
 
     def reset_game(self):
-        self.fireballs = []
-        self.player1_cooldown = 0
-        self.player2_cooldown = 0
+        self.fireballs.clear()
+        self.clock.reset()
         self.ai_cooldown = 0
         self.game_over_state = False
         self.winner = None
         self.player1_health = DEFAULT_HEALTH
         self.player2_health = DEFAULT_HEALTH
         self.ai_health = DEFAULT_HEALTH
-        self.last_wrist_z_p1 = None
-        self.last_wrist_z_p2 = None
+        for player in self.players:
+            player.cooldown = 0
+            player.tracker.reset()
+            player.reset()
 
     def draw_dashed_rect(self, frame, top_left, bottom_right, color, thickness=1, dash_length=10):
         x1, y1 = top_left
@@ -519,200 +764,75 @@ class Game:
         for i in range(y1, y2, dash_length * 2):
             cv2.line(frame, (x2, i), (x2, i + dash_length), color, thickness)
 
-    def draw_ui_two_player(self, frame, player1_landmarks, player2_landmarks, mid_x):
-        # Draw health bars
-        cv2.putText(frame, f"Player 1 Health: {self.player1_health}", (10, self.frame_height - 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Player 2 Health: {self.player2_health}", (self.frame_width - 300, self.frame_height - 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-        margin = PLAYABLE_AREA_MARGIN
-        # Player 1 playable area
-        p1_top_left = (margin, margin)
-        p1_bottom_right = (mid_x - margin, self.frame_height - margin)
-        self.draw_dashed_rect(frame, p1_top_left, p1_bottom_right, (255, 255, 255), 2, 15)
-
-        # Player 2 playable area
-        p2_top_left = (mid_x + margin, margin)
-        p2_bottom_right = (self.frame_width - margin, self.frame_height - margin)
-        self.draw_dashed_rect(frame, p2_top_left, p2_bottom_right, (255, 255, 255), 2, 15)
-
-        if player1_landmarks:
-            heart_pos = self.get_heart_position(player1_landmarks.landmark, 0, mid_x)
-            draw_heart(frame, heart_pos, HEART_RADIUS // 3, (0, 0, 255))
-            draw_centered_text(frame, "Player 1", heart_pos, HEART_RADIUS * 4)
-            
-            # Check if player 1 is out of bounds
-            if not (p1_top_left[0] < heart_pos[0] < p1_bottom_right[0] and \
-                    p1_top_left[1] < heart_pos[1] < p1_bottom_right[1]):
-                overlay = frame.copy()
-                cv2.rectangle(overlay, (0, 0), (mid_x, self.frame_height), (0, 0, 255), -1)
-                cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
-                cv2.putText(frame, "OUT OF BOUNDS", (p1_top_left[0] + 20, p1_top_left[1] + 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 3)
-
-
-        if player2_landmarks:
-            heart_pos = self.get_heart_position(player2_landmarks.landmark, mid_x, self.frame_width / 2)
-            draw_heart(frame, heart_pos, HEART_RADIUS // 3, (255, 0, 0))
-            draw_centered_text(frame, "Player 2", heart_pos, HEART_RADIUS * 4)
-
-            # Check if player 2 is out of bounds
-            if not (p2_top_left[0] < heart_pos[0] < p2_bottom_right[0] and \
-                    p2_top_left[1] < heart_pos[1] < p2_bottom_right[1]):
-                overlay = frame.copy()
-                cv2.rectangle(overlay, (mid_x, 0), (self.frame_width, self.frame_height), (0, 0, 255), -1)
-                cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
-                cv2.putText(frame, "OUT OF BOUNDS", (p2_top_left[0] + 20, p2_top_left[1] + 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 3)
-
-        if self.game_over_state:
-            self.draw_overlay_text(frame, f"{self.winner} Wins!", "Press 'r' to restart",
-                                 main_color=(0, 255, 0), overlay_alpha=0.5)
-
-    def draw_debug_info_single_player(self, frame):
-        y_pos = 30
-        cv2.putText(frame, "-- DEBUG INFO --", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        y_pos += 30
-
-        if not self.debug_data_p1:
-            cv2.putText(frame, "No player detected", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-            return
-
-        # Arm Angles
-        l_angle = self.debug_data_p1.get('L-Angle', 0)
-        r_angle = self.debug_data_p1.get('R-Angle', 0)
-        cv2.putText(frame, f"Arm Angles (L/R): {l_angle:.1f} / {r_angle:.1f}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        y_pos += 25
-
-        # Arms Straight Condition
-        arms_straight = self.debug_data_p1.get('Arms Straight', False)
-        color = (0, 255, 0) if arms_straight else (0, 0, 255)
-        cv2.putText(frame, f"Arms Straight: {'YES' if arms_straight else 'NO'}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-        y_pos += 30
-
-        # Thrust Velocity
-        fwd_vel = self.debug_data_p1.get('Fwd Velocity', 0)
-        cv2.putText(frame, f"Fwd Velocity: {fwd_vel:.4f}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        y_pos += 25
-
-        # Thrusting Condition
-        is_thrusting = self.debug_data_p1.get('Thrusting', False)
-        color = (0, 255, 0) if is_thrusting else (0, 0, 255)
-        cv2.putText(frame, f"Thrusting: {'YES' if is_thrusting else 'NO'}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-        y_pos += 25
-
-        # Fire Angle
-        fire_angle = self.debug_data_p1.get('Fire Angle', 'N/A')
-        angle_color = (255, 255, 255)
-        if isinstance(fire_angle, float):
-            # Change color based on whether the angle is valid for firing
-            is_forward = self.debug_data_p1.get('dir_x', 0) > 0
-            is_upward = True
-            magnitude = self.debug_data_p1.get('magnitude', 0)
-            if magnitude > 0:
-                if (self.debug_data_p1.get('dir_y', 0) / magnitude) > 0.8:
-                    is_upward = False
-            if is_forward and is_upward:
-                angle_color = (0, 255, 0) # Green for valid
-            else:
-                angle_color = (0, 0, 255) # Red for invalid
-            cv2.putText(frame, f"Fire Angle: {fire_angle:.1f}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, angle_color, 2)
-        else:
-            cv2.putText(frame, f"Fire Angle: {fire_angle}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, angle_color, 1)
-
-    def draw_debug_info_two_player(self, frame):
-        # Player 1 Debug Info (Left)
-        y_pos = 30
-        cv2.putText(frame, "-- P1 DEBUG --", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        y_pos += 30
-
-        if not self.debug_data_p1:
-            cv2.putText(frame, "No player 1 detected", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        else:
-            l_angle = self.debug_data_p1.get('L-Angle', 0)
-            r_angle = self.debug_data_p1.get('R-Angle', 0)
-            cv2.putText(frame, f"Arm Angles (L/R): {l_angle:.1f} / {r_angle:.1f}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-            y_pos += 25
-
-            arms_straight = self.debug_data_p1.get('Arms Straight', False)
-            color = (0, 255, 0) if arms_straight else (0, 0, 255)
-            cv2.putText(frame, f"Arms Straight: {'YES' if arms_straight else 'NO'}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            y_pos += 30
-
-            fwd_vel = self.debug_data_p1.get('Fwd Velocity', 0)
-            cv2.putText(frame, f"Fwd Velocity: {fwd_vel:.4f}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-            y_pos += 25
-
-            is_thrusting = self.debug_data_p1.get('Thrusting', False)
-            color = (0, 255, 0) if is_thrusting else (0, 0, 255)
-            cv2.putText(frame, f"Thrusting: {'YES' if is_thrusting else 'NO'}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            y_pos += 25
-
-            # P1 Fire Angle
-            fire_angle_p1 = self.debug_data_p1.get('Fire Angle', 'N/A')
-            angle_color_p1 = (255, 255, 255)
-            if isinstance(fire_angle_p1, float):
-                is_forward = self.debug_data_p1.get('dir_x', 0) > 0
-                is_upward = True
-                magnitude = self.debug_data_p1.get('magnitude', 0)
-                if magnitude > 0:
-                    if (self.debug_data_p1.get('dir_y', 0) / magnitude) > 0.8:
-                        is_upward = False
-                if is_forward and is_upward:
-                    angle_color_p1 = (0, 255, 0)
-                else:
-                    angle_color_p1 = (0, 0, 255)
-                cv2.putText(frame, f"Fire Angle: {fire_angle_p1:.1f}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, angle_color_p1, 2)
+    def draw_ui_two_player(self, frame, mid_x):
+        ui = self.ui
+        ui.set_text('health_0', f"Player 1 Health: {self.player1_health}", (10, self.frame_height - 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        ui.set_text('health_1', f"Player 2 Health: {self.player2_health}", (self.frame_width - 300, self.frame_height - 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+        halves = ((0, mid_x), (mid_x, self.frame_width))
+        for i, player in enumerate(self.players):
+            (x1, y1), (x2, y2) = self.play_areas[i]
+            out_of_bounds = player.detected and not (x1 < player.heart_pos[0] < x2 and y1 < player.heart_pos[1] < y2)
+            ui.set_visible(f'out_of_bounds_{i}', out_of_bounds)
+            if out_of_bounds:
+                # Tint the player's half red, in place
+                ui.tint(frame, (halves[i][0], 0), (halves[i][1], self.frame_height), (0, 0, 255), 0.3)
+        if self.net is not None:
+            # Connection problems are shown in the remote player's half
+            status = self.net.status()
+            if status is None:
+                ui.set_visible('net_status', False)
             else:
-                cv2.putText(frame, f"Fire Angle: {fire_angle_p1}", (10, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, angle_color_p1, 1)
+                (x1, y1), _ = self.play_areas[1 - self.net.player_index]
+                ui.set_text('net_status', status, (x1 + 20, y1 + 90), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+
+        # Borders, health and notices in one pass
+        ui.composite(frame)
+
+        for player, color, label in zip(self.players, ((0, 0, 255), (255, 0, 0)), ("Player 1", "Player 2")):
+            if player.detected:
+                draw_heart(frame, player.heart_pos, HEART_RADIUS // 3, color)
+                draw_centered_text(frame, label, player.heart_pos, HEART_RADIUS * 4)
+
+    def draw_debug_info(self, frame):
+        self.debug_panel.draw(frame, self.debug_sections)
+
+    def debug_sections(self):
+        """The debug panels of the current mode as (x, lines); only called when the panel refreshes."""
+        player1 = self.players[0]
+        quality = self.governor.describe()
+        if self.game_mode == 'single':
+            return [(10, player_debug_lines(player1, "-- DEBUG INFO --", quality))]
+        sections = [(10, player_debug_lines(player1, "-- P1 DEBUG --", quality, "No player 1 detected")),
+                    (self.frame_width - 240, player_debug_lines(self.players[1], "-- P2 DEBUG --",
+                                                                missing="No player 2 detected"))]
+        # The gestures of a networked player are measured on the other machine
+        return [section for section, player in zip(sections, self.players) if player in self.local_players]
 
-        # Player 2 Debug Info (Right)
-        y_pos = 30
-        x_pos = self.frame_width - 240
-        cv2.putText(frame, "-- P2 DEBUG --", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        y_pos += 30
-
-        if not self.debug_data_p2:
-            cv2.putText(frame, "No player 2 detected", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        else:
-            l_angle = self.debug_data_p2.get('L-Angle', 0)
-            r_angle = self.debug_data_p2.get('R-Angle', 0)
-            cv2.putText(frame, f"Arm Angles (L/R): {l_angle:.1f} / {r_angle:.1f}", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-            y_pos += 25
-
-            arms_straight = self.debug_data_p2.get('Arms Straight', False)
-            color = (0, 255, 0) if arms_straight else (0, 0, 255)
-            cv2.putText(frame, f"Arms Straight: {'YES' if arms_straight else 'NO'}", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            y_pos += 30
-
-            fwd_vel = self.debug_data_p2.get('Fwd Velocity', 0)
-            cv2.putText(frame, f"Fwd Velocity: {fwd_vel:.4f}", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-            y_pos += 25
-
-            is_thrusting = self.debug_data_p2.get('Thrusting', False)
-            color = (0, 255, 0) if is_thrusting else (0, 0, 255)
-            cv2.putText(frame, f"Thrusting: {'YES' if is_thrusting else 'NO'}", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            y_pos += 25
-
-            # P2 Fire Angle
-            fire_angle_p2 = self.debug_data_p2.get('Fire Angle', 'N/A')
-            angle_color_p2 = (255, 255, 255)
-            if isinstance(fire_angle_p2, float):
-                is_forward = self.debug_data_p2.get('dir_x', 0) < 0 # Player 2 fires left
-                is_upward = True
-                magnitude = self.debug_data_p2.get('magnitude', 0)
-                if magnitude > 0:
-                    if (self.debug_data_p2.get('dir_y', 0) / magnitude) > 0.8:
-                        is_upward = False
-                if is_forward and is_upward:
-                    angle_color_p2 = (0, 255, 0)
-                else:
-                    angle_color_p2 = (0, 0, 255)
-                cv2.putText(frame, f"Fire Angle: {fire_angle_p2:.1f}", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, angle_color_p2, 2)
-            else:
-                cv2.putText(frame, f"Fire Angle: {fire_angle_p2}", (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.6, angle_color_p2, 1)
     def cleanup(self):
-        self.pose_player1.close()
-        self.pose_player2.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.telemetry.close()
+        print(f"Capture: {self.cap.frames_captured} frames captured, {self.cap.frames_dropped} stale frames dropped")
+        stats = sprite_cache.stats()
+        print(f"Sprite cache: {stats['hits']} hits, {stats['misses']} misses")
+        stats = layout_cache.stats()
+        print(f"Layout cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+        if self.audio is not None:
+            self.audio.close()
+            stats = self.audio.stats
+            print(f"Audio: {stats['played']} of {stats['emitted']} sound events played, {stats['coalesced']} coalesced, "
+                  f"{stats['voices_restarted']} voices restarted, {stats['channels_stolen']} channels stolen")
+        if self.net is not None:
+            self.net.close()
+            print(f"Net: {self.net.describe()}")
+        for player in self.players:
+            # Only the players of the chosen mode have a pose model
+            if player.worker is not None:
+                player.worker.close()
         self.cap.release()
-        cv2.destroyAllWindows()
+        if self.display is not None:
+            self.display.close()
 
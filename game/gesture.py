@@ -0,0 +1,164 @@
+import numpy as np
+
+from .clock import REFERENCE_TICK_RATE
+from .constants import ARM_STRAIGHT_ANGLE, THRUST_SENSITIVITY, THRUST_WINDOW
+
+# MediaPipe Pose landmark indices used by the game
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+HEART_OFFSET_Y = 30     # The heart sits this many pixels below the middle of the shoulders
+
+
+class PlayerState:
+    """
+    Everything the game tracks about one player: pose worker and landmark tracker, the landmark
+    arrays of the current frame, and the gesture quantities derived from them.
+    """
+    __slots__ = (
+        'name', 'fire_direction', 'worker', 'tracker', 'offset_x', 'width', 'height',
+        'landmarks', 'fresh_landmarks', 'fresh_timestamp', 'heart_pos',
+        'arm_angles', 'arms_straight', 'forward_velocity', 'thrusting',
+        'wrist_pos', 'aim', 'magnitude', 'fire_angle', 'cooldown',
+        'z_history', 't_history', 'history_count',
+    )
+
+    def __init__(self, name, fire_direction, worker, tracker, window=THRUST_WINDOW):
+        self.name = name
+        self.fire_direction = fire_direction    # +1 fires to the right, -1 to the left
+        self.worker = worker
+        self.tracker = tracker
+        self.offset_x = 0
+        self.width = 0
+        self.height = 0
+        self.z_history = np.zeros(window)
+        self.t_history = np.zeros(window)
+        self.cooldown = 0
+        self.reset()
+
+    def set_region(self, offset_x, width, height):
+        """The part of the frame (in display pixels) this player's landmarks are normalized to."""
+        self.offset_x = offset_x
+        self.width = width
+        self.height = height
+
+    @property
+    def detected(self):
+        return self.landmarks is not None
+
+    def clear_history(self):
+        self.history_count = 0
+
+    def reset(self):
+        self.landmarks = None
+        self.fresh_landmarks = None
+        self.fresh_timestamp = 0.0
+        self.heart_pos = None
+        self.arm_angles = (0.0, 0.0)
+        self.arms_straight = False
+        self.forward_velocity = 0.0
+        self.thrusting = False
+        self.wrist_pos = (0.0, 0.0)
+        self.aim = (0.0, 0.0)
+        self.magnitude = 0.0
+        self.fire_angle = 0.0
+        self.clear_history()
+
+    def debug_data(self):
+        """The gesture values shown by the debug overlay, or {} while the player is not detected."""
+        if not self.detected:
+            return {}
+        dir_x, dir_y = self.aim
+        return {
+            'L-Angle': self.arm_angles[0],
+            'R-Angle': self.arm_angles[1],
+            'Arms Straight': self.arms_straight,
+            'Fwd Velocity': self.forward_velocity,
+            'Thrusting': self.thrusting,
+            'Fire Angle': self.fire_angle,
+            'dir_x': dir_x,
+            'dir_y': dir_y,
+            'magnitude': self.magnitude
+        }
+
+
+class GestureEngine:
+    """
+    Derives gameplay quantities for any number of players in one vectorized pass over their
+    stacked landmark arrays (rows of x, y, z, visibility in normalized image coordinates).
+    """
+    def update(self, players):
+        """
+        Updates heart positions from each detected player's current landmarks, and arm angles,
+        windowed thrust velocity and aim from each player's new (fresh) inference result.
+        """
+        detected = [player for player in players if player.landmarks is not None]
+        if detected:
+            points = np.stack([player.landmarks for player in detected])
+            sizes, offsets = self._regions(detected)
+            shoulders = points[:, [LEFT_SHOULDER, RIGHT_SHOULDER], :2].mean(axis=1)
+            hearts = shoulders * sizes + offsets
+            hearts[:, 1] += HEART_OFFSET_Y
+            for player, (heart_x, heart_y) in zip(detected, hearts.astype(int).tolist()):
+                player.heart_pos = (heart_x, heart_y)
+
+        fresh = [player for player in players if player.fresh_landmarks is not None]
+        if fresh:
+            self._update_gestures(fresh)
+
+    def _regions(self, players):
+        sizes = np.array([(player.width, player.height) for player in players], dtype=np.float64)
+        offsets = np.array([(player.offset_x, 0) for player in players], dtype=np.float64)
+        return sizes, offsets
+
+    def _update_gestures(self, players):
+        points = np.stack([player.fresh_landmarks for player in players])
+        sizes, offsets = self._regions(players)
+
+        # Arm angle at the elbow, per arm, in normalized coordinates (same as utils.get_angle)
+        shoulders = points[:, [LEFT_SHOULDER, RIGHT_SHOULDER], :2]
+        elbows = points[:, [LEFT_ELBOW, RIGHT_ELBOW], :2]
+        wrists = points[:, [LEFT_WRIST, RIGHT_WRIST], :2]
+        to_wrist = wrists - elbows
+        to_shoulder = shoulders - elbows
+        angles = np.abs(np.degrees(np.arctan2(to_wrist[..., 1], to_wrist[..., 0]) -
+                                   np.arctan2(to_shoulder[..., 1], to_shoulder[..., 0])))
+        arms_straight = (angles > ARM_STRAIGHT_ANGLE).all(axis=1)
+
+        # Aim from the elbow midpoint to the wrist midpoint, in display pixels
+        wrist_pixels = wrists.mean(axis=1) * sizes + offsets
+        elbow_pixels = elbows.mean(axis=1) * sizes + offsets
+        aim = wrist_pixels - elbow_pixels
+        magnitudes = np.hypot(aim[:, 0], aim[:, 1])
+        fire_angles = np.degrees(np.arctan2(aim[:, 1], aim[:, 0]))
+
+        # Forward thrust: drop of the wrist depth over the sample window, per reference frame
+        wrist_z = points[:, [LEFT_WRIST, RIGHT_WRIST], 2].mean(axis=1)
+        for player, z in zip(players, wrist_z.tolist()):
+            self._push_history(player, z)
+        z_history = np.stack([player.z_history for player in players])
+        t_history = np.stack([player.t_history for player in players])
+        counts = np.array([player.history_count for player in players])
+        elapsed = t_history[:, -1] - t_history[np.arange(len(players)), -counts]
+        dropped = z_history[np.arange(len(players)), -counts] - z_history[:, -1]
+        velocities = np.divide(dropped, elapsed * REFERENCE_TICK_RATE, out=np.zeros(len(players)),
+                               where=(counts > 1) & (elapsed > 0))
+        thrusting = np.abs(velocities) >= THRUST_SENSITIVITY
+
+        for i, player in enumerate(players):
+            player.arm_angles = (float(angles[i, 0]), float(angles[i, 1]))
+            player.arms_straight = bool(arms_straight[i])
+            player.forward_velocity = float(velocities[i])
+            player.thrusting = bool(thrusting[i])
+            player.wrist_pos = (float(wrist_pixels[i, 0]), float(wrist_pixels[i, 1]))
+            player.aim = (float(aim[i, 0]), float(aim[i, 1]))
+            player.magnitude = float(magnitudes[i])
+            player.fire_angle = float(fire_angles[i])
+
+    def _push_history(self, player, z):
+        # Shift-register ring buffer: the newest sample is always last, so the window is a plain slice
+        player.z_history[:-1] = player.z_history[1:]
+        player.t_history[:-1] = player.t_history[1:]
+        player.z_history[-1] = z
+        player.t_history[-1] = player.fresh_timestamp
+        player.history_count = min(player.history_count + 1, len(player.z_history))
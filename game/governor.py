@@ -0,0 +1,96 @@
+import collections
+
+from .constants import (
+    QUALITY_LEVELS, TARGET_FPS, MODEL_COMPLEXITY, POSE_INFERENCE_WIDTH, QUALITY_GOVERNOR_ENABLED
+)
+
+QualityLevel = collections.namedtuple('QualityLevel', ['inference_width', 'model_complexity', 'inference_interval'])
+
+
+def _not_heavier(level, other):
+    """True if level infers on no wider images, with no more complex a model and no more often than other."""
+    def width(level):
+        # 0 means the full camera resolution
+        return level.inference_width or float('inf')
+    return (width(level) <= width(other) and level.model_complexity <= other.model_complexity
+            and level.inference_interval >= other.inference_interval)
+
+
+class QualityGovernor:
+    """
+    Steps the pose quality level down when frames take longer than the target budget and back up when
+    there is headroom. Frame cost is smoothed with an exponential moving average, and a change is only
+    made after the condition has held for a number of frames (longer for stepping up), followed by a
+    cooldown, so the level does not oscillate.
+
+    The configured width and complexity are the top level; below it come the levels of QUALITY_LEVELS
+    that are no heavier in any respect. So the governor only trades quality away from what was
+    configured, and when it is disabled exactly the configured level runs.
+    """
+    def __init__(self, levels=QUALITY_LEVELS, target_fps=TARGET_FPS, enabled=QUALITY_GOVERNOR_ENABLED,
+                 smoothing=0.1, down_frames=15, up_frames=90, cooldown_frames=60,
+                 down_threshold=1.1, up_threshold=0.7):
+        configured = QualityLevel(POSE_INFERENCE_WIDTH, MODEL_COMPLEXITY, 1)
+        self.levels = [configured] + [level for level in map(QualityLevel._make, levels)
+                                      if level != configured and _not_heavier(level, configured)]
+        self.index = 0
+        self.budget = 1.0 / target_fps
+        self.enabled = enabled
+        self.smoothing = smoothing
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.cooldown_frames = cooldown_frames
+        self.down_threshold = down_threshold
+        self.up_threshold = up_threshold
+        self.frame_cost = None
+        self._over = 0
+        self._under = 0
+        self._cooldown = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def record(self, frame_cost):
+        """Records the cost (seconds) of one frame. Returns True when the quality level changed."""
+        if self.frame_cost is None:
+            self.frame_cost = frame_cost
+        else:
+            self.frame_cost += (frame_cost - self.frame_cost) * self.smoothing
+
+        if not self.enabled:
+            return False
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return False
+
+        if self.frame_cost > self.budget * self.down_threshold:
+            self._over += 1
+            self._under = 0
+        elif self.frame_cost < self.budget * self.up_threshold:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = 0
+            self._under = 0
+
+        if self._over >= self.down_frames and self.index < len(self.levels) - 1:
+            return self._change(self.index + 1)
+        if self._under >= self.up_frames and self.index > 0:
+            return self._change(self.index - 1)
+        return False
+
+    def describe(self):
+        level = self.level
+        return (f"Q{self.index}/{len(self.levels) - 1} {level.inference_width or 'full'}px "
+                f"c{level.model_complexity} 1/{level.inference_interval}")
+
+    def _change(self, index):
+        direction = "down" if index > self.index else "up"
+        self.index = index
+        self._over = 0
+        self._under = 0
+        self._cooldown = self.cooldown_frames
+        print(f"Quality {direction}: {self.describe()} (frame cost {self.frame_cost * 1000:.1f} ms, "
+              f"budget {self.budget * 1000:.1f} ms)")
+        return True
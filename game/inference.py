@@ -0,0 +1,137 @@
+import collections
+import threading
+import time
+
+from .constants import POSE_PIPELINED, POSE_MAX_STALENESS
+
+PoseResult = collections.namedtuple('PoseResult', ['landmarks', 'timestamp', 'sequence', 'fresh', 'latency'])
+
+
+class PoseWorker:
+    """
+    Runs pose estimation for one player on a worker thread.
+
+    The main loop submits the newest frame and immediately renders with the latest finished result,
+    so inference of frame N overlaps with rendering of frame N-1. Only one frame is ever pending:
+    submitting while the worker is busy replaces the waiting frame. Results carry the capture
+    timestamp of their frame; results older than max_staleness seconds count as "no player".
+    With pipelined=False, submit() runs inference inline like before.
+    """
+    def __init__(self, pose, pipelined=POSE_PIPELINED, max_staleness=POSE_MAX_STALENESS):
+        self.pose = pose
+        self.pipelined = pipelined
+        self.max_staleness = max_staleness
+        self.frames_submitted = 0
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.inference_time = 0.0
+        self._next_pose = None
+        self._builds = 0
+        self._closed = False
+        self._pending = None
+        self._processing = None
+        self._result = None
+        self._sequence = 0
+        self._last_returned = -1
+        self._condition = threading.Condition()
+        self._running = pipelined
+        self._thread = None
+        if pipelined:
+            self._thread = threading.Thread(target=self._worker_loop, name='pose', daemon=True)
+            self._thread.start()
+
+    def submit(self, rgb_frame, timestamp):
+        """Queues a frame (which must not be modified afterwards) captured at timestamp for inference."""
+        self.frames_submitted += 1
+        if not self.pipelined:
+            with self._condition:
+                self._swap_pose()
+            self._process(rgb_frame, timestamp)
+            self._processing = None
+            return
+        with self._condition:
+            if self._pending is not None:
+                self.frames_skipped += 1
+            self._pending = (rgb_frame, timestamp)
+            self._condition.notify()
+
+    def holds(self, rgb_frame):
+        """True while rgb_frame is waiting for or going through inference, i.e. must not be overwritten."""
+        pending = self._pending
+        return rgb_frame is self._processing or (pending is not None and pending[0] is rgb_frame)
+
+    def latest(self, timestamp):
+        """
+        Returns the newest PoseResult relative to a frame captured at timestamp, or None if there is
+        none yet or it is too stale. fresh is True the first time a result is returned.
+        """
+        result = self._result
+        if result is None or timestamp - result.timestamp > self.max_staleness:
+            return None
+        fresh = result.sequence != self._last_returned
+        self._last_returned = result.sequence
+        return result._replace(fresh=fresh)
+
+    def replace_pose(self, build):
+        """
+        Swaps in a new Pose (e.g. another model complexity). build() runs on its own thread, since
+        building a model takes hundreds of milliseconds; the old Pose keeps running until the new one
+        is ready and is closed once it is idle. Only the most recently requested Pose is swapped in.
+        """
+        with self._condition:
+            self._builds += 1
+            generation = self._builds
+        threading.Thread(target=self._build_pose, args=(build, generation), name='pose-build', daemon=True).start()
+
+    def close(self):
+        with self._condition:
+            self._running = False
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._next_pose is not None:
+            self._next_pose.close()
+        self.pose.close()
+
+    def _build_pose(self, build, generation):
+        pose = build()
+        with self._condition:
+            if self._closed or generation != self._builds:
+                # The worker was closed or another Pose was requested while this one was being built
+                pose.close()
+                return
+            if self._next_pose is not None:
+                self._next_pose.close()
+            self._next_pose = pose
+
+    def _swap_pose(self):
+        """Puts a finished replacement Pose in place; called with the condition held, between frames."""
+        if self._next_pose is not None:
+            self.pose.close()
+            self.pose, self._next_pose = self._next_pose, None
+
+    def _process(self, rgb_frame, timestamp):
+        start = time.perf_counter()
+        results = self.pose.process(rgb_frame)
+        self.inference_time = time.perf_counter() - start
+        self._sequence += 1
+        self.frames_processed += 1
+        # A single reference assignment, so the main thread never sees a half-written result
+        self._result = PoseResult(results.pose_landmarks, timestamp, self._sequence, True,
+                                  time.perf_counter() - timestamp)
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                rgb_frame, timestamp = self._pending
+                self._pending = None
+                self._processing = rgb_frame
+                self._swap_pose()
+            self._process(rgb_frame, timestamp)
+            self._processing = None
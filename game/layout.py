@@ -0,0 +1,91 @@
+import math
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .constants import TEXT_LAYOUT_CACHE_SIZE
+
+# Parameter steps of the heart curve, as drawn since the first version (t = 0 .. 6.27 in steps of 0.05)
+_HEART_T = np.arange(0, 628, 5) / 100.0
+
+
+class LayoutCache:
+    """
+    Process-wide cache of UI geometry and text layout.
+
+    Heart polygons are computed once per size as int32 offsets from the centre, so drawing a heart
+    is a translation and a fillPoly. Text layouts (the font scale that fits a width and the resulting
+    text size) are memoized per (text, font, size, thickness) in a LRU map of at most max_layouts.
+    """
+    def __init__(self, max_layouts=TEXT_LAYOUT_CACHE_SIZE):
+        self.max_layouts = max_layouts
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hearts = {}
+        self._layouts = OrderedDict()
+
+    def heart(self, center, size):
+        """The heart polygon of the given size around center, shaped (N, 1, 2) for fillPoly."""
+        entry = self._hearts.get(size)
+        if entry is None:
+            self.misses += 1
+            t = _HEART_T
+            dx = size * (16 * np.sin(t) ** 3)
+            dy = -size * (13 * np.cos(t) - 5 * np.cos(2 * t) - 2 * np.cos(3 * t) - np.cos(4 * t))
+            # Floored, so that adding an integer centre truncates like int(x + dx) did on screen. The epsilon
+            # absorbs rounding residue (e.g. -1e-15), which x + dx would have rounded away
+            offsets = np.floor(np.stack([dx, dy], axis=1) + 1e-9).astype(np.int32).reshape(-1, 1, 2)
+            entry = self._hearts[size] = (offsets, np.empty_like(offsets))
+        else:
+            self.hits += 1
+        offsets, points = entry
+        np.add(offsets, (math.floor(center[0]), math.floor(center[1])), out=points)
+        return points
+
+    def fit_text(self, text, font, size, thickness):
+        """
+        (font_scale, width, height) of text shrunk in 10% steps from scale 1.0 until it is at
+        most size * 1.8 wide.
+        """
+        key = (text, font, size, thickness)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            self.hits += 1
+            self._layouts.move_to_end(key)
+            return layout
+
+        self.misses += 1
+        font_scale = 1.0
+        (text_width, text_height), _ = cv2.getTextSize(text, font, font_scale, thickness)
+        while text_width > size * 1.8:  # Use 1.8 for padding
+            font_scale *= 0.9
+            (text_width, text_height), _ = cv2.getTextSize(text, font, font_scale, thickness)
+
+        layout = self._layouts[key] = (font_scale, text_width, text_height)
+        if len(self._layouts) > self.max_layouts:
+            self._layouts.popitem(last=False)
+            self.evictions += 1
+        return layout
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'hearts': len(self._hearts),
+            'layouts': len(self._layouts),
+        }
+
+    def clear(self):
+        self._hearts.clear()
+        self._layouts.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+layout_cache = LayoutCache()
@@ -0,0 +1,635 @@
+import heapq
+import random
+import socket
+import struct
+import time
+
+import numpy as np
+
+from .constants import (
+    NET_PORT, NET_CONNECT_TIMEOUT, NET_TIMEOUT, NET_HISTORY, NET_MAX_FIREBALLS, NET_MAX_SHOTS, NET_MAX_SHOT_AGE,
+    NET_SHOT_SLACK, PLAYER_COOLDOWN
+)
+from .display import NO_KEY
+from .fireball import OWNERS
+from .gesture import LEFT_SHOULDER, RIGHT_WRIST
+from .recording import LANDMARK_COUNT
+
+# Packet layouts (little-endian). Every packet starts with the same 6-byte header; sequence numbers,
+# shot ids and fireball serials are 16 bits and wrap around.
+MAGIC = b'FB'
+VERSION = 1
+HEADER = struct.Struct('<2sBBH')            # magic, version, packet type, sequence
+HELLO, WELCOME, INPUT, STATE, BYE = range(1, 6)
+WELCOME_BODY = struct.Struct('<HHQ')        # arena width, height, seed
+# A player: whether detected, then only the landmarks the gestures use (shoulders, elbows, wrists)
+# as x, y, z in 1/LANDMARK_SCALE units of the normalized coordinates
+SENT_LANDMARKS = slice(LEFT_SHOULDER, RIGHT_WRIST + 1)
+PLAYER = struct.Struct('<B18h')
+LANDMARK_SCALE = 16384
+# Client -> host: flags, acknowledged state sequence, client time (ms), echoed host time (ms), key
+# serial, key, shot count, then the player and the shots not yet acknowledged
+INPUT_BODY = struct.Struct('<BHIIBBB')
+SHOT = struct.Struct('<H4hH')               # shot id, start x, start y, target x, target y (pixels), age (ms)
+# Host -> client: baseline sequence, echoed client time (ms), host time (ms), last shot handled,
+# flags, winner, health of player 1 and 2, removed and added fireball counts; then the host's player,
+# the serials of the removed fireballs and the added fireballs
+STATE_BODY = struct.Struct('<HIIHBBBBBB')
+FIREBALL = struct.Struct('<HBH4h')          # serial, owner, shot id, x, y (1/8 px), velocity (1/64 px per tick)
+POSITION_SCALE = 8
+VELOCITY_SCALE = 64
+MAX_PACKET = 2048
+
+# Bits of the INPUT flags
+HAS_ACK = 1
+HAS_ECHO = 2
+# Bits of the STATE flags
+PAUSED = 1
+GAME_OVER = 2
+FULL = 4        # no baseline: the fireballs are all of the host's
+WINNERS = (None, 'Player 1', 'Player 2')
+
+
+def newer(a, b):
+    """True if 16-bit sequence number a comes after b."""
+    return a != b and (a - b) & 0xFFFF < 0x8000
+
+
+def _fixed(value, scale):
+    return max(-32768, min(32767, round(value * scale)))
+
+
+def pack_player(player):
+    if player.landmarks is None:
+        return PLAYER.pack(0, *([0] * 18))
+    points = np.clip(np.rint(player.landmarks[SENT_LANDMARKS, :3] * LANDMARK_SCALE), -32768, 32767)
+    return PLAYER.pack(1, *points.astype(int).ravel().tolist())
+
+
+def unpack_player(data, offset, player):
+    """Puts a received player onto player, the way SessionRecording.restore() does for recorded frames."""
+    values = PLAYER.unpack_from(data, offset)
+    if not values[0]:
+        if player.landmarks is not None:
+            player.reset()
+        return
+    landmarks = np.zeros((LANDMARK_COUNT, 4))
+    landmarks[SENT_LANDMARKS, :3] = np.array(values[1:], np.float64).reshape(-1, 3) / LANDMARK_SCALE
+    landmarks[SENT_LANDMARKS, 3] = 1.0
+    player.landmarks = landmarks
+    # Gestures of a remote player are measured on its own machine
+    player.fresh_landmarks = None
+
+
+def _parse(data):
+    """The (type, sequence) of a packet of this game, or None."""
+    if len(data) < HEADER.size:
+        return None
+    magic, version, kind, sequence = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return kind, sequence
+
+
+def _milliseconds():
+    return int(time.perf_counter() * 1000) & 0xFFFFFFFF
+
+
+class LossyLink:
+    """
+    A non-blocking UDP socket that can delay, jitter and drop the packets it sends, to play or
+    benchmark a networked game on one machine over loopback as if over a real network. latency and
+    jitter (seconds) are added to each direction, so with both ends configured alike the round trip
+    takes 2 * latency; loss is the fraction of packets dropped. Delayed packets go out on the next
+    send() or receive() call once they are due.
+    """
+    def __init__(self, port=0, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('', port))
+        self.socket.setblocking(False)
+        self.port = self.socket.getsockname()[1]
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.stats = {'sent': 0, 'received': 0, 'dropped': 0, 'bytes_sent': 0, 'bytes_received': 0}
+        self._delayed = []
+        self._count = 0
+
+    def send(self, data, address):
+        self.stats['sent'] += 1
+        self.stats['bytes_sent'] += len(data)
+        if self.loss and self.random.random() < self.loss:
+            self.stats['dropped'] += 1
+            return
+        if not (self.latency or self.jitter):
+            self._send_now(data, address)
+            return
+        due = time.perf_counter() + self.latency + self.random.uniform(0.0, self.jitter)
+        heapq.heappush(self._delayed, (due, self._count, data, address))
+        self._count += 1
+
+    def receive(self):
+        """Sends the delayed packets that are due, then returns the packets that arrived as (data, address)."""
+        now = time.perf_counter()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, data, address = heapq.heappop(self._delayed)
+            self._send_now(data, address)
+
+        packets = []
+        while True:
+            try:
+                data, address = self.socket.recvfrom(MAX_PACKET)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                # The other end is not (yet) listening
+                continue
+            self.stats['received'] += 1
+            self.stats['bytes_received'] += len(data)
+            packets.append((data, address))
+        return packets
+
+    def close(self):
+        # Packets still held back (e.g. a goodbye) go out now
+        for _, _, data, address in sorted(self._delayed):
+            self._send_now(data, address)
+        self._delayed = []
+        self.socket.close()
+
+    def _send_now(self, data, address):
+        try:
+            self.socket.sendto(data, address)
+        except OSError:
+            # UDP gives no delivery guarantee anyway; a lost packet is recovered by the next one
+            self.stats['dropped'] += 1
+
+
+class NetHost:
+    """
+    The authoritative end of a networked two-player game. The host's camera player is player 1;
+    player 2 plays on another machine, whose NetClient streams its landmarks, keys and shot requests.
+
+    The host runs the simulation and collisions for both and sends the game state every frame.
+    Fireballs are sent as a delta against the last state the client acknowledged: the ones added and
+    removed since, so a lost packet costs nothing but the delay until the next one. Shots of player 2
+    are validated (cooldown, game running) before they are spawned, and are spawned as far along as
+    the client's fireball already is: each shot carries how long ago it was fired, counting half the
+    round trip for the way here. The host measures the round trip and its jitter itself, and rejects
+    shots that claim to be older than the time since the client's previous input plus the way here
+    allows; the cooldown is checked with a slack of NET_SHOT_SLACK plus twice the jitter.
+    """
+    authoritative = True
+    player_index = 0
+
+    def __init__(self, link, timeout=NET_TIMEOUT, history=NET_HISTORY, max_fireballs=NET_MAX_FIREBALLS,
+                 max_shot_age=NET_MAX_SHOT_AGE, shot_slack=NET_SHOT_SLACK):
+        self.link = link
+        self.timeout = timeout
+        self.history = history
+        self.max_fireballs = max_fireballs
+        self.max_shot_age = max_shot_age
+        self.shot_slack = shot_slack
+        self.arena = None
+        self.peer = None
+        self.sequence = 0
+        self.stats = {'states': 0, 'inputs': 0, 'inputs_lost': 0, 'inputs_late': 0,
+                      'shots_accepted': 0, 'shots_rejected': 0}
+        self._reset_peer()
+
+    def _reset_peer(self):
+        self.last_heard = 0.0
+        self.last_shot = 0
+        self._sent = {}         # state sequence -> fireball serials the client knows after applying it
+        self._acked = None
+        self._input_sequence = None
+        self._key_serial = 0    # a client starts at 0, with no key
+        self._echo = (0, 0.0)   # newest client time and when it arrived
+        self._previous_input = None
+        self.rtt = None
+        self.jitter = 0.0
+        self._shot_ids = {}     # fireball serial -> shot id of player 2's shot that spawned it
+
+    def connect(self, arena):
+        """arena is (width, height, seed); the client plays on the same. Returns it."""
+        self.arena = arena
+        print(f"Net: hosting on UDP port {self.link.port}, waiting for player 2")
+        return arena
+
+    @property
+    def connected(self):
+        return self.peer is not None
+
+    def status(self):
+        return None if self.connected else "Waiting for player 2..."
+
+    def receive(self, game):
+        """Handles the packets that arrived: puts player 2's landmarks onto the game and applies its keys and shots."""
+        now = time.perf_counter()
+        for data, address in self.link.receive():
+            parsed = _parse(data)
+            if parsed is None:
+                continue
+            kind, sequence = parsed
+            if kind == HELLO:
+                if address != self.peer:
+                    if self.peer is not None:
+                        self._disconnect(game)
+                    self.peer = address
+                    self.last_heard = now
+                    print(f"Net: player 2 joined from {address[0]}:{address[1]}")
+                width, height, seed = self.arena
+                self.link.send(HEADER.pack(MAGIC, VERSION, WELCOME, 0) + WELCOME_BODY.pack(width, height, seed), address)
+            elif address != self.peer:
+                continue
+            elif kind == BYE:
+                print("Net: player 2 left")
+                self._disconnect(game)
+            elif kind == INPUT and len(data) >= HEADER.size + INPUT_BODY.size + PLAYER.size:
+                if self._input_sequence is not None:
+                    if not newer(sequence, self._input_sequence):
+                        # Reordered on the way: a newer input was already applied
+                        self.stats['inputs_late'] += 1
+                        continue
+                    self.stats['inputs_lost'] += ((sequence - self._input_sequence) & 0xFFFF) - 1
+                self._input_sequence = sequence
+                self.last_heard = now
+                self.stats['inputs'] += 1
+                self._apply_input(game, data, now)
+
+        if self.peer is not None and now - self.last_heard > self.timeout:
+            print("Net: player 2 timed out")
+            self._disconnect(game)
+
+    def _disconnect(self, game):
+        self.peer = None
+        self._reset_peer()
+        game.players[1].reset()
+
+    def _apply_input(self, game, data, now):
+        (flags, ack, client_time, host_time, key_serial, key,
+         shot_count) = INPUT_BODY.unpack_from(data, HEADER.size)
+        if flags & HAS_ACK and (self._acked is None or newer(ack, self._acked)):
+            self._acked = ack
+        if flags & HAS_ECHO:
+            rtt = ((_milliseconds() - host_time) & 0xFFFFFFFF) / 1000
+            if self.rtt is None:
+                self.rtt = rtt
+            else:
+                self.jitter = 0.9 * self.jitter + 0.1 * abs(rtt - self.rtt)
+                self.rtt = 0.9 * self.rtt + 0.1 * rtt
+        # A shot fired before the client sent its previous input would have come with that one, so it
+        # can be no older than the time between the two inputs plus the way here
+        slack = self.shot_slack + 2 * self.jitter
+        since_previous = 0.0
+        if self._previous_input is not None:
+            previous_time, previous_arrival = self._previous_input
+            since_previous = min(((client_time - previous_time) & 0xFFFFFFFF) / 1000,
+                                 now - previous_arrival + slack)
+        self._previous_input = (client_time, now)
+        one_way = self.rtt / 2 if self.rtt is not None else self.max_shot_age
+        max_age = since_previous + one_way + slack
+        self._echo = (client_time, now)
+        offset = HEADER.size + INPUT_BODY.size
+        unpack_player(data, offset, game.players[1])
+        offset += PLAYER.size
+
+        # The last key is repeated in every input until the next one, so it survives lost packets
+        if key_serial != self._key_serial:
+            self._key_serial = key_serial
+            if key != NO_KEY:
+                game.press_shared_key(key)
+
+        for _ in range(min(shot_count, (len(data) - offset) // SHOT.size)):
+            shot_id, x, y, target_x, target_y, age = SHOT.unpack_from(data, offset)
+            offset += SHOT.size
+            if newer(shot_id, self.last_shot):
+                self.last_shot = shot_id
+                self._fire(game, shot_id, x, y, target_x, target_y, age / 1000, max_age, slack)
+
+    def _fire(self, game, shot_id, x, y, target_x, target_y, age, max_age, slack):
+        player = game.players[1]
+        fired = game.frame_timestamp - age
+        if game.game_over_state or game.paused or not player.detected or age > max_age or \
+                fired < player.cooldown - slack:
+            self.stats['shots_rejected'] += 1
+            return
+        player.cooldown = fired + PLAYER_COOLDOWN
+        age = min(age, self.max_shot_age)
+        fireball = game.fireballs.spawn(x, y, target_x, target_y, player.name)
+        # Where the client's fireball is by now, so hits are decided where player 2 sees it
+        game.fireballs.advance(fireball.index, age * game.clock.tick_rate)
+        self._shot_ids[int(game.fireballs.serials[fireball.index]) & 0xFFFF] = shot_id
+        game.play_sound('fireball2')
+        self.stats['shots_accepted'] += 1
+
+    def send(self, game):
+        """Sends the state of this frame to the client."""
+        if self.peer is None:
+            return
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        fireballs = game.fireballs
+        indices = fireballs.active_indices()
+        current = dict(zip((fireballs.serials[indices] & 0xFFFF).tolist(), indices.tolist()))
+        for serial in [serial for serial in self._shot_ids if serial not in current]:
+            del self._shot_ids[serial]
+
+        flags = (PAUSED if game.paused else 0) | (GAME_OVER if game.game_over_state else 0)
+        baseline = self._sent.get(self._acked) if self._acked is not None else None
+        if baseline is None:
+            flags |= FULL
+            baseline = set()
+        removed = [serial for serial in baseline if serial not in current][:255]
+        added = [serial for serial in current if serial not in baseline][:min(self.max_fireballs, 255)]
+        self._sent[self.sequence] = (baseline - set(removed)) | set(added)
+        self._sent.pop((self.sequence - self.history) & 0xFFFF, None)
+
+        client_time, received = self._echo
+        # Held back for the time the input waited here, so the client measures the network round trip
+        echo = (client_time + int((time.perf_counter() - received) * 1000)) & 0xFFFFFFFF
+        parts = [
+            HEADER.pack(MAGIC, VERSION, STATE, self.sequence),
+            STATE_BODY.pack(self._acked or 0, echo, _milliseconds(), self.last_shot, flags,
+                            WINNERS.index(game.winner), max(0, game.player1_health), max(0, game.player2_health),
+                            len(removed), len(added)),
+            pack_player(game.players[0]),
+            struct.pack(f'<{len(removed)}H', *removed),
+        ]
+        positions, velocities = fireballs.positions, fireballs.velocities
+        for serial in added:
+            index = current[serial]
+            parts.append(FIREBALL.pack(serial, int(fireballs.owners[index]), self._shot_ids.get(serial, 0),
+                                       _fixed(positions[index, 0], POSITION_SCALE),
+                                       _fixed(positions[index, 1], POSITION_SCALE),
+                                       _fixed(velocities[index, 0], VELOCITY_SCALE),
+                                       _fixed(velocities[index, 1], VELOCITY_SCALE)))
+        self.link.send(b''.join(parts), self.peer)
+        self.stats['states'] += 1
+
+    def close(self):
+        if self.peer is not None:
+            self.link.send(HEADER.pack(MAGIC, VERSION, BYE, 0), self.peer)
+        self.link.close()
+
+    def describe(self):
+        stats, link = self.stats, self.link.stats
+        rtt = f"{self.rtt * 1000:.0f} ms (jitter {self.jitter * 1000:.0f} ms)" if self.rtt is not None else "-"
+        return (f"{link['sent']} packets sent ({link['bytes_sent'] / max(1, link['sent']):.0f} bytes on average), "
+                f"{stats['inputs']} inputs received, {stats['inputs_lost']} lost, {stats['inputs_late']} late; "
+                f"round trip {rtt}; shots of player 2: {stats['shots_accepted']} accepted, "
+                f"{stats['shots_rejected']} rejected")
+
+
+class NetClient:
+    """
+    The remote end of a networked two-player game: plays player 2 with its own camera and pose model.
+
+    Every frame it sends its landmarks, its last key and its unacknowledged shots to the host and
+    applies the newest state the host sent back. Its own shots are predicted: the fireball appears
+    at once and is matched to the host's when that arrives (or removed if the host rejected the
+    shot); the host spawns it as far along as the prediction, so both stay in step. The host's
+    fireballs are advanced by half the round trip when they arrive, and then move locally like any
+    other; hits, health and the game over are only ever decided by the host.
+    """
+    authoritative = False
+    player_index = 1
+
+    def __init__(self, link, host, port=NET_PORT, timeout=NET_TIMEOUT, connect_timeout=NET_CONNECT_TIMEOUT,
+                 history=NET_HISTORY, max_shots=NET_MAX_SHOTS):
+        self.link = link
+        self.host = host
+        self.port = port
+        self.address = None
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.history = history
+        self.max_shots = max_shots
+        self.sequence = 0
+        self.rtt = None
+        self.last_heard = 0.0
+        self.stats = {'states': 0, 'states_lost': 0, 'states_late': 0, 'states_skipped': 0, 'no_baseline': 0,
+                      'shots': 0, 'shots_confirmed': 0, 'shots_rejected': 0, 'confirm_time': 0.0}
+        self._state_sequence = None
+        self._acked = None      # newest state whose fireballs were applied, the baseline for the next delta
+        self._received = {}     # state sequence -> host fireball serials known after applying it
+        self._fireballs = {}    # host serial -> (index, serial) of the local fireball
+        self._predicted = {}    # shot id -> (index, serial, time) of a predicted fireball
+        self._shots = []        # (shot id, x, y, target x, target y, time) not yet acknowledged by the host
+        self._next_shot = 1
+        self._previous_frame = None
+        self._key_serial = 0
+        self._key = NO_KEY
+        self._host_echo = None  # newest host time and when it arrived, echoed so the host measures the round trip
+
+    def connect(self, arena=None):
+        """Joins the host; returns its arena (width, height, seed), which this game has to use."""
+        try:
+            self.address = (socket.gethostbyname(self.host), self.port)
+        except OSError as error:
+            raise RuntimeError(f"Cannot resolve host {self.host}: {error}")
+        hello = HEADER.pack(MAGIC, VERSION, HELLO, 0)
+        deadline = time.perf_counter() + self.connect_timeout
+        next_hello = 0.0
+        while time.perf_counter() < deadline:
+            if time.perf_counter() >= next_hello:
+                self.link.send(hello, self.address)
+                next_hello = time.perf_counter() + 0.25
+            for data, address in self.link.receive():
+                parsed = _parse(data)
+                if address == self.address and parsed is not None and parsed[0] == WELCOME:
+                    self.last_heard = time.perf_counter()
+                    print(f"Net: joined {self.host}:{self.port} as player 2")
+                    return WELCOME_BODY.unpack_from(data, HEADER.size)
+            time.sleep(0.005)
+        raise RuntimeError(f"No answer from a game host at {self.host}:{self.port}.")
+
+    @property
+    def connected(self):
+        return time.perf_counter() - self.last_heard <= self.timeout
+
+    def status(self):
+        return None if self.connected else "Connection to host lost..."
+
+    def send_key(self, key):
+        """Asks the host to apply a key that changes the shared game state (pause, restart)."""
+        self._key_serial = (self._key_serial + 1) & 0xFF
+        self._key = key
+
+    def predict_shot(self, fireball, target_x, target_y):
+        """Keeps the fireball the local player just fired as a prediction and asks the host for the shot."""
+        shot_id = self._next_shot
+        self._next_shot = (self._next_shot + 1) & 0xFFFF or 1
+        system = fireball.system
+        self._predicted[shot_id] = (fireball.index, int(system.serials[fireball.index]), time.perf_counter())
+        self._shots.append((shot_id, _fixed(fireball.x, 1), _fixed(fireball.y, 1),
+                            _fixed(target_x, 1), _fixed(target_y, 1), time.perf_counter()))
+        self.stats['shots'] += 1
+
+    def send(self, game):
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        shots = self._shots[-self.max_shots:]
+        now = time.perf_counter()
+        # The host gets a shot half a round trip after it leaves, on top of the time it has waited here
+        one_way = (self.rtt or 0.0) / 2
+        flags, echo = (HAS_ACK if self._acked is not None else 0), 0
+        if self._host_echo is not None:
+            host_time, received = self._host_echo
+            # Held back for the time the state waited here, like the host does with the client's time
+            flags |= HAS_ECHO
+            echo = (host_time + int((now - received) * 1000)) & 0xFFFFFFFF
+        parts = [
+            HEADER.pack(MAGIC, VERSION, INPUT, self.sequence),
+            INPUT_BODY.pack(flags, self._acked or 0, _milliseconds(), echo, self._key_serial, self._key, len(shots)),
+            pack_player(game.players[1]),
+        ]
+        parts += [SHOT.pack(*shot[:5], min(0xFFFF, int((now - shot[5] + one_way) * 1000))) for shot in shots]
+        self.link.send(b''.join(parts), self.address)
+
+    def receive(self, game):
+        """Applies the newest state that arrived; older (reordered) ones are skipped."""
+        previous_frame, self._previous_frame = self._previous_frame, game.frame_timestamp
+        states = []
+        for data, address in self.link.receive():
+            parsed = _parse(data)
+            if address != self.address or parsed is None:
+                continue
+            kind, sequence = parsed
+            if kind == BYE:
+                print("Net: the host left")
+                self.last_heard = 0.0
+            elif kind == STATE and len(data) >= HEADER.size + STATE_BODY.size + PLAYER.size:
+                if self._state_sequence is None or newer(sequence, self._state_sequence):
+                    states.append((sequence, data))
+                else:
+                    self.stats['states_late'] += 1
+        if not states:
+            if not self.connected and game.players[0].landmarks is not None:
+                game.players[0].reset()
+            return
+
+        # Every state holds all the host knows, so only the newest of a batch needs applying
+        sequence, data = states[0]
+        for state in states[1:]:
+            if newer(state[0], sequence):
+                sequence, data = state
+        if self._state_sequence is not None:
+            self.stats['states_lost'] += ((sequence - self._state_sequence) & 0xFFFF) - len(states)
+        self.stats['states_skipped'] += len(states) - 1
+        self._state_sequence = sequence
+        self.last_heard = time.perf_counter()
+        self.stats['states'] += 1
+        self._apply_state(game, sequence, data, game.frame_timestamp - (previous_frame or game.frame_timestamp))
+
+    def _apply_state(self, game, sequence, data, frame_time):
+        (baseline_sequence, echo, host_time, last_shot, flags, winner, health1, health2,
+         removed_count, added_count) = STATE_BODY.unpack_from(data, HEADER.size)
+        if len(data) < HEADER.size + STATE_BODY.size + PLAYER.size + 2 * removed_count + FIREBALL.size * added_count:
+            return
+        rtt = ((_milliseconds() - echo) & 0xFFFFFFFF) / 1000
+        self.rtt = rtt if self.rtt is None else 0.9 * self.rtt + 0.1 * rtt
+        self._host_echo = (host_time, time.perf_counter())
+        offset = HEADER.size + STATE_BODY.size
+        unpack_player(data, offset, game.players[0])
+        offset += PLAYER.size
+        removed = set(struct.unpack_from(f'<{removed_count}H', data, offset))
+        offset += 2 * removed_count
+        added = [FIREBALL.unpack_from(data, offset + i * FIREBALL.size) for i in range(added_count)]
+
+        game_over = bool(flags & GAME_OVER)
+        if game.game_over_state and not game_over:
+            # The host restarted the round
+            game.reset_game()
+            self._fireballs.clear()
+            self._predicted.clear()
+        elif game_over and not game.game_over_state:
+            game.game_over_state = True
+            game.winner = WINNERS[winner]
+            game.play_sound('win')
+        if bool(flags & PAUSED) != game.paused:
+            game.set_paused(not game.paused)
+        if health1 < game.player1_health or health2 < game.player2_health:
+            game.play_sound('hit')
+        game.player1_health, game.player2_health = health1, health2
+
+        # Shots the host handled are no longer sent
+        self._shots = [shot for shot in self._shots if newer(shot[0], last_shot)]
+        baseline = set() if flags & FULL else self._received.get(baseline_sequence)
+        if baseline is None:
+            # The state the delta is based on was never applied; the host moves on once it sees the acks
+            self.stats['no_baseline'] += 1
+            return
+        known = (baseline - removed) | {entry[0] for entry in added}
+        self._received[sequence] = known
+        self._received.pop((sequence - self.history) & 0xFFFF, None)
+        self._acked = sequence
+        self._apply_fireballs(game, known, added, frame_time)
+
+        # Predicted shots the host handled without spawning a fireball were rejected
+        for shot_id in [shot_id for shot_id in self._predicted if not newer(shot_id, last_shot)]:
+            self._remove(game.fireballs, self._predicted.pop(shot_id)[:2])
+            self.stats['shots_rejected'] += 1
+
+    def _apply_fireballs(self, game, known, added, frame_time):
+        fireballs = game.fireballs
+        for serial in [serial for serial in self._fireballs if serial not in known]:
+            self._remove(fireballs, self._fireballs.pop(serial))
+
+        # The host moved a fireball there half a round trip ago, but the simulation of this frame still
+        # moves it over the time since the previous frame
+        ticks = ((self.rtt or 0.0) / 2 - frame_time) * game.clock.tick_rate
+        for serial, owner, shot_id, x, y, dx, dy in added:
+            if serial in self._fireballs:
+                continue
+            predicted = self._predicted.pop(shot_id, None) if shot_id else None
+            if predicted is not None:
+                # The host confirmed a predicted shot, spawned where the local fireball already was: keep it
+                self._fireballs[serial] = predicted[:2]
+                self.stats['shots_confirmed'] += 1
+                self.stats['confirm_time'] += time.perf_counter() - predicted[2]
+                continue
+            x, y = x / POSITION_SCALE, y / POSITION_SCALE
+            dx, dy = dx / VELOCITY_SCALE, dy / VELOCITY_SCALE
+            fireball = fireballs.spawn(x, y, x + dx, y + dy, OWNERS[owner])
+            index = fireball.index
+            fireballs.advance(index, ticks)
+            self._fireballs[serial] = (index, int(fireballs.serials[index]))
+            if owner == OWNERS.index('player1'):
+                game.play_sound('fireball')
+
+    @staticmethod
+    def _remove(fireballs, local):
+        index, serial = local
+        # The slot may have been culled locally and reused since
+        if fireballs.alive[index] and fireballs.serials[index] == serial:
+            fireballs.remove_indices([index])
+
+    def close(self):
+        if self.address is not None:
+            self.link.send(HEADER.pack(MAGIC, VERSION, BYE, 0), self.address)
+        self.link.close()
+
+    def describe(self):
+        stats, link = self.stats, self.link.stats
+        confirmed = stats['shots_confirmed']
+        rtt = f"{self.rtt * 1000:.0f} ms" if self.rtt is not None else "-"
+        confirm = f" after {stats['confirm_time'] / confirmed * 1000:.0f} ms" if confirmed else ""
+        return (f"{link['sent']} packets sent ({link['bytes_sent'] / max(1, link['sent']):.0f} bytes on average), "
+                f"{stats['states']} states applied, {stats['states_lost']} lost, {stats['states_late']} late; "
+                f"round trip {rtt}; {stats['shots']} shots predicted, {confirmed} confirmed{confirm}, "
+                f"{stats['shots_rejected']} rejected")
+
+
+def open_netplay(host_port=None, connect=None, latency=0.0, jitter=0.0, loss=0.0):
+    """
+    A NetHost listening on host_port, a NetClient for connect ('host' or 'host:port'), or None when
+    neither is given. latency and jitter (seconds) and loss (fraction) simulate a network.
+    """
+    if host_port is None and not connect:
+        return None
+    try:
+        if host_port is not None:
+            return NetHost(LossyLink(host_port, latency, jitter, loss))
+        host, _, port = connect.partition(':')
+        return NetClient(LossyLink(0, latency, jitter, loss), host, int(port) if port else NET_PORT)
+    except OSError as error:
+        raise RuntimeError(f"Cannot open a UDP socket: {error}")
@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+
+from .constants import CAMERA_ZOOM
+
+
+def _reuse(buffer, shape):
+    """Returns buffer if it already has the shape, otherwise a new uint8 array of that shape."""
+    if buffer is None or buffer.shape != shape:
+        return np.empty(shape, np.uint8)
+    return buffer
+
+
+class FramePreprocessor:
+    """
+    Turns each captured frame into the mirrored (and zoomed) display frame and the RGB inference
+    images of the players, in as few passes as possible and into buffers that are allocated once:
+
+        zoom 1.0   flip(frame)                        -> display       1 pass
+        zoom > 1   flip(centre crop) -> resize        -> display       2 passes, the flip on the smaller crop
+        inference  resize(display region) -> cvtColor -> RGB buffer    the colour conversion on the small image
+
+    Resizes that would not change the size are skipped. In steady state no new frames are allocated.
+    Display frames come from a small pool as well: without a display they are reused for the next
+    frame, with one a frame it still holds (queued or being shown) is never overwritten.
+    """
+    def __init__(self, zoom=CAMERA_ZOOM, inference_buffers=3, display_buffers=3):
+        self.zoom = zoom
+        self.inference_buffers = inference_buffers
+        self.display_buffers = display_buffers
+        self._displays = []
+        self._arenas = []
+        self._crop = None
+        self._small = {}
+        self._rgb = {}
+
+    def display_frame(self, frame, display=None):
+        h, w = frame.shape[:2]
+        display = self._free_buffer(self._displays, frame.shape, display, self.display_buffers)
+        if self.zoom <= 1.0:
+            return cv2.flip(frame, 1, dst=display)
+
+        new_w, new_h = int(w / self.zoom), int(h / self.zoom)
+        x, y = (w - new_w) // 2, (h - new_h) // 2
+        crop = frame[y:y + new_h, x:x + new_w]
+        # Mirroring the crop and then scaling it up equals scaling up and mirroring, with fewer pixels to flip
+        self._crop = mirrored = _reuse(self._crop, crop.shape)
+        cv2.flip(crop, 1, dst=mirrored)
+        return cv2.resize(mirrored, (w, h), dst=display, interpolation=cv2.INTER_LINEAR)
+
+    def arena_frame(self, frame, width, height, offset_x, region_width, display=None):
+        """
+        The display frame of a networked game: a display frame (the local player's whole camera view)
+        scaled into the local player's part of the width x height arena; the remote player's part is black.
+        """
+        arena = self._free_buffer(self._arenas, (height, width, 3), display, self.display_buffers)
+        arena[:, :offset_x] = 0
+        arena[:, offset_x + region_width:] = 0
+        cv2.resize(frame, (region_width, height), dst=arena[:, offset_x:offset_x + region_width],
+                   interpolation=cv2.INTER_AREA)
+        return arena
+
+    def inference_frame(self, region, width, worker=None, key=None):
+        """
+        The RGB image of a display frame region, downscaled to width, for pose inference. The result
+        is handed to the worker thread, so it comes from a small pool of buffers and a buffer that
+        worker is still pending on or processing is never overwritten.
+        """
+        h, w = region.shape[:2]
+        if width and width < w:
+            size = (width, max(1, round(h * width / w)))
+            small = _reuse(self._small.get(key), (size[1], size[0], 3))
+            self._small[key] = small
+            region = cv2.resize(region, size, dst=small, interpolation=cv2.INTER_AREA)
+
+        rgb = self._free_buffer(self._rgb.setdefault(key, []), region.shape, worker, self.inference_buffers)
+        return cv2.cvtColor(region, cv2.COLOR_BGR2RGB, dst=rgb)
+
+    @staticmethod
+    def _free_buffer(pool, shape, owner, size):
+        """A buffer of the pool that owner (a PoseWorker or Display) does not hold, reshaped if needed."""
+        for i, buffer in enumerate(pool):
+            if owner is None or not owner.holds(buffer):
+                pool[i] = buffer = _reuse(buffer, shape)
+                return buffer
+        buffer = np.empty(shape, np.uint8)
+        if len(pool) < size:
+            pool.append(buffer)
+        return buffer
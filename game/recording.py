@@ -0,0 +1,111 @@
+import os
+import struct
+
+import numpy as np
+
+# File layout: a fixed 32-byte header followed by one fixed-size record per camera frame, so the
+# frames can be memory-mapped as a NumPy structured array and a session cut short is still readable.
+# Landmarks are stored as float64, the type the live game computes with, so a replay sees exactly the
+# input the session saw; version 1 stored float32 and is still read.
+MAGIC = b'FBREC'
+VERSION = 2
+LANDMARK_TYPES = {1: '<f4', 2: '<f8'}
+HEADER = struct.Struct('<5sBBBHH8sQ4x')  # magic, version, players, landmarks, width, height, mode, seed
+LANDMARK_COUNT = 33
+
+# Bits of the per-player 'flags' field
+DETECTED = 1
+FRESH = 2
+
+
+def frame_dtype(player_count, landmark_count=LANDMARK_COUNT, version=VERSION):
+    """Record of one frame: the key pressed and what pose tracking handed to the gesture engine."""
+    landmark_type = LANDMARK_TYPES[version]
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('key', 'u1'),
+        ('flags', 'u1', (player_count,)),
+        ('fresh_timestamp', '<f8', (player_count,)),
+        ('landmarks', landmark_type, (player_count, landmark_count, 4)),
+        ('fresh_landmarks', landmark_type, (player_count, landmark_count, 4)),
+    ])
+
+
+class SessionRecorder:
+    """
+    Writes the input of a game session frame by frame: timestamps, key presses and the (predicted
+    and freshly inferred) landmarks of each player. Replaying these through the game reproduces
+    everything downstream of pose tracking without a camera or pose model.
+    """
+    def __init__(self, path, game_mode, frame_width, frame_height, seed, player_count):
+        self.path = path
+        self.frames_written = 0
+        self._record = np.zeros(1, frame_dtype(player_count))
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, player_count, LANDMARK_COUNT, frame_width, frame_height,
+                                     game_mode.encode('ascii'), seed))
+
+    def write(self, timestamp, key, players):
+        record = self._record[0]
+        record['timestamp'] = timestamp
+        record['key'] = key
+        for i, player in enumerate(players):
+            flags = 0
+            if player.landmarks is not None:
+                flags |= DETECTED
+                record['landmarks'][i] = player.landmarks
+            if player.fresh_landmarks is not None:
+                flags |= FRESH
+                record['fresh_landmarks'][i] = player.fresh_landmarks
+                record['fresh_timestamp'][i] = player.fresh_timestamp
+            record['flags'][i] = flags
+        self._file.write(self._record.tobytes())
+        self.frames_written += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            print(f"Recorded {self.frames_written} frames to {self.path}")
+
+
+class SessionRecording:
+    """A recorded session, memory-mapped read-only. frames is a structured array (see frame_dtype)."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a session recording")
+        magic, version, player_count, landmark_count, width, height, mode, seed = HEADER.unpack(header)
+        if magic != MAGIC or version not in LANDMARK_TYPES:
+            raise ValueError(f"{path} is not a session recording of a supported version")
+
+        self.player_count = player_count
+        self.frame_width = width
+        self.frame_height = height
+        self.game_mode = mode.rstrip(b'\0').decode('ascii')
+        self.seed = seed
+        dtype = frame_dtype(player_count, landmark_count, version)
+        # A partly written last record (e.g. after a crash) is ignored
+        count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        self.frames = np.memmap(path, dtype, mode='r', offset=HEADER.size, shape=(count,)) if count else \
+            np.zeros(0, dtype)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def restore(self, index, players):
+        """Puts the tracking state of frame index back onto the players. Returns (timestamp, key)."""
+        record = self.frames[index]
+        for i, player in enumerate(players[:self.player_count]):
+            flags = int(record['flags'][i])
+            if not flags & DETECTED:
+                if player.landmarks is not None:
+                    player.reset()
+                continue
+            player.landmarks = record['landmarks'][i].astype(np.float64)
+            player.fresh_landmarks = None
+            if flags & FRESH:
+                player.fresh_landmarks = record['fresh_landmarks'][i].astype(np.float64)
+                player.fresh_timestamp = float(record['fresh_timestamp'][i])
+        return float(record['timestamp']), int(record['key'])
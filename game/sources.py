@@ -0,0 +1,182 @@
+import abc
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .capture import open_camera
+from .constants import CAMERA_INDEX, CAMERA_FPS
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+class FrameSource(abc.ABC):
+    """
+    Something the game can take its frames from. Mirrors the cv2.VideoCapture methods the capture
+    layer uses (isOpened, read, release).
+
+    A paced source hands out frames no faster than its frame rate, like a camera does; an unpaced one
+    returns every frame as soon as it is read, for measuring throughput.
+    """
+    def __init__(self, fps, paced=True):
+        self.fps = fps
+        self.paced = paced
+        self._next_time = None
+
+    def isOpened(self):
+        return True
+
+    @abc.abstractmethod
+    def read(self):
+        """Returns (success, frame) like cv2.VideoCapture.read()."""
+
+    def release(self):
+        pass
+
+    def _pace(self):
+        if not self.paced or not self.fps:
+            return
+        now = time.perf_counter()
+        if self._next_time is not None and self._next_time > now:
+            time.sleep(self._next_time - now)
+            now = self._next_time
+        # Scheduled from the actual frame time, so a slow read is not made up for with a burst
+        self._next_time = now + 1.0 / self.fps
+
+
+class CameraSource(FrameSource):
+    """A live camera, opened with the low-latency settings of open_camera(). Always paced by the device."""
+    def __init__(self, index=CAMERA_INDEX):
+        super().__init__(CAMERA_FPS, paced=True)
+        self.cap = open_camera(index)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """A video file, e.g. a recorded clip of a player, optionally looped."""
+    def __init__(self, path, paced=True, loop=True):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS) or 30.0, paced)
+        self.path = path
+        self.loop = loop
+        self._frames_read = 0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        success, frame = self.cap.read()
+        if not success and self.loop and self._frames_read > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.cap.read()
+        if not success:
+            # End of a non-looping clip (or an unreadable file): report the source as closed
+            self.cap.release()
+            return False, None
+        self._frames_read += 1
+        self._pace()
+        return True, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """The images of a directory in file name order, optionally looped."""
+    def __init__(self, directory, fps=30.0, paced=True, loop=True):
+        super().__init__(fps, paced)
+        self.directory = directory
+        self.loop = loop
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        self._index = 0
+
+    def isOpened(self):
+        return self._index < len(self.paths)
+
+    def read(self):
+        # Unreadable images are skipped, but at most one full pass is tried per call
+        for _ in range(len(self.paths)):
+            if self._index >= len(self.paths):
+                break
+            path = self.paths[self._index]
+            self._index += 1
+            if self.loop and self._index == len(self.paths):
+                self._index = 0
+            frame = cv2.imread(path)
+            if frame is not None:
+                self._pace()
+                return True, frame
+            print(f"Warning: Could not read image {path}")
+        return False, None
+
+    def release(self):
+        self._index = len(self.paths)
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames of a given size: a fixed gradient background with a moving disc, so every frame
+    differs. No pose will be found in them, but every other stage of the pipeline runs normally.
+    frames=0 generates frames forever.
+    """
+    def __init__(self, width=1280, height=720, fps=30.0, paced=True, frames=0):
+        super().__init__(fps, paced)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self._count = 0
+        ramp_x = np.linspace(0, 255, width, dtype=np.float32)
+        ramp_y = np.linspace(0, 255, height, dtype=np.float32)
+        self._background = np.empty((height, width, 3), np.uint8)
+        self._background[..., 0] = ramp_x[None, :]
+        self._background[..., 1] = ramp_y[:, None]
+        self._background[..., 2] = 96
+
+    def isOpened(self):
+        return not self.frames or self._count < self.frames
+
+    def read(self):
+        if not self.isOpened():
+            return False, None
+        # A new array per frame: the capture layer may still hold on to the previous one
+        frame = self._background.copy()
+        t = self._count / (self.fps or 30.0)
+        center = (int(self.width * (0.5 + 0.35 * np.sin(t))), int(self.height * (0.5 + 0.35 * np.cos(1.3 * t))))
+        cv2.circle(frame, center, max(8, self.height // 12), (255, 255, 255), -1)
+        self._count += 1
+        self._pace()
+        return True, frame
+
+
+def open_source(spec, paced=True, loop=True):
+    """
+    Opens a frame source from a command line spec:
+        camera, camera:N         camera (index N)
+        synthetic, synthetic:WxH generated frames (default 1280x720)
+        <directory>              the images in a directory
+        <file>                   a video file
+    """
+    kind, _, argument = spec.partition(':')
+    try:
+        if kind == 'camera':
+            return CameraSource(int(argument) if argument else CAMERA_INDEX)
+        if kind == 'synthetic':
+            width, height = (int(value) for value in argument.split('x')) if argument else (1280, 720)
+            if width <= 0 or height <= 0:
+                raise ValueError
+            return SyntheticSource(width, height, paced=paced)
+    except ValueError:
+        raise RuntimeError(f"Invalid source {spec} (expected camera:N or synthetic:WxH).")
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec, paced=paced, loop=loop)
+    return VideoFileSource(spec, paced=paced, loop=loop)
@@ -0,0 +1,110 @@
+import math
+
+import cv2
+import numpy as np
+
+from .constants import FIREBALL_RADIUS, FIREBALL_IMAGE_RED, FIREBALL_IMAGE_BLUE, FIREBALL_ROTATION_STEPS
+
+OWNER_IMAGES = {
+    'player1': FIREBALL_IMAGE_RED,
+    'player2': FIREBALL_IMAGE_BLUE,
+    'ai': FIREBALL_IMAGE_BLUE,
+}
+
+
+class Sprite:
+    """A decoded, resized BGRA sprite with its blending planes precomputed."""
+    def __init__(self, image):
+        self.image = image
+        self.height, self.width = image.shape[:2]
+        self.bgr = np.ascontiguousarray(image[:, :, :3])
+        self.alpha = np.ascontiguousarray(image[:, :, 3])
+        self.inv_alpha = 255 - self.alpha
+        self.inv_alpha3 = np.repeat(self.inv_alpha[:, :, None], 3, axis=2)
+        # Colour already scaled by alpha, so blending is just premultiplied + dst * inv_alpha
+        self.premultiplied = ((self.bgr.astype(np.uint16) * self.alpha[:, :, None] + 127) // 255).astype(np.uint8)
+
+
+class SpriteCache:
+    """
+    Process-wide cache of fireball sprites.
+    Each image is read and resized once; fireballs only hold a reference to the cached Sprite.
+    """
+    def __init__(self, size=FIREBALL_RADIUS * 2, rotation_steps=FIREBALL_ROTATION_STEPS):
+        self.size = size
+        self.rotation_steps = rotation_steps
+        self.hits = 0
+        self.misses = 0
+        self._sprites = {}
+        self._rotated = {}
+
+    def preload(self, owners=None):
+        """Loads (and pre-rotates) the sprite of every owner up front."""
+        for owner in owners or OWNER_IMAGES:
+            sprite = self._load(owner)
+            if sprite is not None:
+                for step in range(self.rotation_steps):
+                    self._rotate(owner, sprite, step)
+
+    def get(self, owner, angle=None):
+        """
+        Returns the Sprite for the owner, or None if its image could not be loaded.
+        With rotation enabled and an angle (radians, flight direction) given, the closest
+        pre-rotated variant is returned instead.
+        """
+        if owner in self._sprites:
+            self.hits += 1
+            sprite = self._sprites[owner]
+        else:
+            self.misses += 1
+            sprite = self._load(owner)
+
+        if sprite is None or angle is None or self.rotation_steps <= 0:
+            return sprite
+
+        step = int(round(angle / (2 * math.pi) * self.rotation_steps)) % self.rotation_steps
+        rotated = self._rotated.get((owner, step))
+        if rotated is None:
+            rotated = self._rotate(owner, sprite, step)
+        return rotated
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'sprites': len(self._sprites),
+            'rotated': len(self._rotated),
+        }
+
+    def clear(self):
+        self._sprites.clear()
+        self._rotated.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, owner):
+        path = OWNER_IMAGES.get(owner)
+        image = cv2.imread(path, cv2.IMREAD_UNCHANGED) if path else None
+        if image is None or image.ndim != 3 or image.shape[2] != 4:
+            print(f"Error: Could not load fireball image for {owner}")
+            sprite = None
+        else:
+            sprite = Sprite(cv2.resize(image, (self.size, self.size)))
+        self._sprites[owner] = sprite
+        return sprite
+
+    def _rotate(self, owner, sprite, step):
+        # The flame tips point up in the source image; turn them to trail behind the flight direction
+        flight_deg = step * 360.0 / self.rotation_steps
+        center = (sprite.width / 2, sprite.height / 2)
+        matrix = cv2.getRotationMatrix2D(center, 90 - flight_deg, 1.0)
+        image = cv2.warpAffine(sprite.image, matrix, (sprite.width, sprite.height),
+                               flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
+        rotated = Sprite(image)
+        self._rotated[(owner, step)] = rotated
+        return rotated
+
+
+sprite_cache = SpriteCache()
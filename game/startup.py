@@ -0,0 +1,51 @@
+import concurrent.futures
+import time
+
+
+class Startup:
+    """
+    Runs the independent parts of game startup (opening the frame source, importing MediaPipe,
+    building Pose models, loading sprites and sounds) in parallel on background threads, and records
+    when each task and each milestone (menu shown, first playable frame, ...) finished, in seconds
+    since the game was started.
+    """
+    def __init__(self, workers=4):
+        self.started = time.perf_counter()
+        self.tasks = {}
+        self.milestones = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='startup')
+
+    def submit(self, name, function, *args):
+        """Runs function(*args) in the background; returns a Future of its result."""
+        def task():
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.tasks[name] = (start - self.started, time.perf_counter() - self.started)
+        return self._executor.submit(task)
+
+    def mark(self, milestone):
+        """Records the first time a milestone is reached."""
+        self.milestones.setdefault(milestone, time.perf_counter() - self.started)
+
+    def report(self):
+        print("Startup (seconds since start):")
+        for name, (start, end) in sorted(self.tasks.items(), key=lambda item: item[1]):
+            print(f"  {name:<22} {start:6.2f} - {end:6.2f}  ({end - start:.2f} s)")
+        for name, at in sorted(self.milestones.items(), key=lambda item: item[1]):
+            print(f"  {name:<22} {at:6.2f}")
+        menu = self.milestones.get('menu shown')
+        chosen = self.milestones.get('mode chosen')
+        playable = self.milestones.get('first playable frame')
+        if playable is None:
+            return
+        if menu is None or chosen is None:
+            print(f"Time to first playable frame: {playable:.2f} s")
+        else:
+            # The time spent in the menu is the player's, not startup's
+            print(f"Time to menu: {menu:.2f} s, time to first playable frame: {playable:.2f} s "
+                  f"({playable - (chosen - menu):.2f} s without the time in the menu)")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,187 @@
+import bisect
+import json
+import math
+import time
+
+import cv2
+
+from .constants import TELEMETRY_WINDOW, TELEMETRY_INTERVAL, TELEMETRY_REFRESH
+
+# Histogram bins: 16 per decade from 10 µs to 10 s, i.e. about 15% wide
+_EDGES = [10 ** (exponent / 16) for exponent in range(-5 * 16, 1 * 16 + 1)]
+
+# Per-frame values that are not stages of the loop
+FRAME = 'frame'
+LATENCY = 'latency'
+INTERVAL = 'interval'
+WAIT = 'wait'
+_TOTALS = (FRAME, LATENCY, INTERVAL, WAIT)
+
+
+class RollingHistogram:
+    """
+    Histogram of the last window durations (seconds) in fixed log-spaced bins.
+    Adding a sample and dropping the oldest one are O(1), so it can be fed every frame.
+    """
+    def __init__(self, window=TELEMETRY_WINDOW):
+        self.window = window
+        self.counts = [0] * (len(_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._bins = [0] * window
+        self._values = [0.0] * window
+        self._head = 0
+
+    def add(self, value):
+        index = bisect.bisect_right(_EDGES, value)
+        head = self._head
+        if self.count == self.window:
+            self.counts[self._bins[head]] -= 1
+            self.total -= self._values[head]
+        else:
+            self.count += 1
+        self.counts[index] += 1
+        self.total += value
+        self._bins[head] = index
+        self._values[head] = value
+        self._head = (head + 1) % self.window
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0..100): the geometric centre of the bin it falls into."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                break
+        if index == 0:
+            return _EDGES[0]
+        if index == len(_EDGES):
+            return _EDGES[-1]
+        return math.sqrt(_EDGES[index - 1] * _EDGES[index])
+
+    def summary(self):
+        return {'p50_ms': self.percentile(50) * 1000, 'p95_ms': self.percentile(95) * 1000,
+                'p99_ms': self.percentile(99) * 1000, 'mean_ms': self.mean() * 1000}
+
+
+class Telemetry:
+    """
+    Frame-time instrumentation of the game loop.
+
+    begin_frame() starts a frame with its capture timestamp, lap(stage) charges the time since the
+    previous lap to a stage, and end_frame() records the frame time and the capture-to-display
+    latency. All durations go into rolling histograms, which can be shown as an on-screen overlay and
+    are appended to a JSON Lines file every interval seconds. When disabled, every hook returns at once.
+    """
+    def __init__(self, enabled=False, log_path=None, window=TELEMETRY_WINDOW, interval=TELEMETRY_INTERVAL,
+                 context=None):
+        self.enabled = enabled or bool(log_path)
+        self.show_overlay = self.enabled
+        self.window = window
+        self.interval = interval
+        # Called at each log write for extra fields (game mode, quality level, dropped frames, ...)
+        self.context = context
+        self.histograms = {}
+        self.frames = 0
+        self._log = open(log_path, 'a') if log_path else None
+        self._next_log = time.perf_counter() + interval
+        self._capture_timestamp = 0.0
+        self._frame_start = None
+        self._last_lap = 0.0
+        self._last_end = None
+        self._overlay_lines = []
+        self._next_refresh = 0.0
+
+    def begin_frame(self, capture_timestamp):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_end is not None:
+            self.record(WAIT, now - self._last_end)
+        self._capture_timestamp = capture_timestamp
+        self._frame_start = self._last_lap = now
+
+    def lap(self, stage):
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter()
+        self.record(stage, now - self._last_lap)
+        self._last_lap = now
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter()
+        self.record(FRAME, now - self._frame_start)
+        self.record(LATENCY, now - self._capture_timestamp)
+        if self._last_end is not None:
+            self.record(INTERVAL, now - self._last_end)
+        self._last_end = now
+        self._frame_start = None
+        self.frames += 1
+        if self._log is not None and now >= self._next_log:
+            self._next_log = now + self.interval
+            self.write_log()
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RollingHistogram(self.window)
+        histogram.add(seconds)
+
+    def fps(self):
+        interval = self.histograms.get(INTERVAL)
+        mean = interval.mean() if interval else 0.0
+        return 1.0 / mean if mean > 0 else 0.0
+
+    def summary(self):
+        data = {'time': time.time(), 'frames': self.frames, 'fps': self.fps()}
+        data.update({name: histogram.summary() for name, histogram in self.histograms.items()})
+        if self.context is not None:
+            data.update(self.context())
+        return data
+
+    def write_log(self):
+        self._log.write(json.dumps(self.summary()) + '\n')
+        self._log.flush()
+
+    def draw(self, frame):
+        """Draws the FPS/latency overlay at the top centre of the frame (text refreshed a few times a second)."""
+        if not (self.enabled and self.show_overlay):
+            return
+        now = time.perf_counter()
+        if now >= self._next_refresh:
+            self._next_refresh = now + TELEMETRY_REFRESH
+            self._overlay_lines = self._overlay_text()
+
+        x = frame.shape[1] // 2 - 170
+        height = 22 * len(self._overlay_lines) + 10
+        cv2.rectangle(frame, (x - 10, 5), (x + 340, 5 + height), (0, 0, 0), -1)
+        for i, line in enumerate(self._overlay_lines):
+            cv2.putText(frame, line, (x, 25 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    def _overlay_text(self):
+        lines = [f"FPS: {self.fps():.1f}"]
+        for name in (LATENCY, FRAME):
+            histogram = self.histograms.get(name)
+            if histogram is not None:
+                lines.append(f"{name.capitalize()}: p50 {histogram.percentile(50) * 1000:.1f} / "
+                             f"p95 {histogram.percentile(95) * 1000:.1f} ms")
+        for name, histogram in self.histograms.items():
+            if name not in _TOTALS:
+                lines.append(f"  {name}: {histogram.percentile(50) * 1000:.2f} / "
+                             f"{histogram.percentile(95) * 1000:.2f} ms")
+        return lines
+
+    def close(self):
+        if self._log is not None:
+            if self.frames:
+                self.write_log()
+            self._log.close()
+            self._log = None
@@ -0,0 +1,133 @@
+import collections
+import math
+
+import numpy as np
+
+from .constants import (
+    TRACKING_MIN_CUTOFF, TRACKING_BETA, TRACKING_D_CUTOFF, TRACKING_MAX_PREDICTION,
+    TRACKING_MAX_SKIP, TRACKING_STILL_SPEED
+)
+
+Landmark = collections.namedtuple('Landmark', ['x', 'y', 'z', 'visibility'])
+
+
+class TrackedLandmarks:
+    """Filtered or predicted landmarks with the same .landmark[i].x/.y/.z access as a MediaPipe result."""
+    def __init__(self, points):
+        self.points = points
+        self._landmark = None
+
+    @property
+    def landmark(self):
+        # Built on first access only; the game itself works on the points array
+        if self._landmark is None:
+            self._landmark = [Landmark(*row) for row in self.points.tolist()]
+        return self._landmark
+
+
+def _smoothing_factor(dt, cutoff):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al.) applied element-wise to an array of values.
+    Slow movements are smoothed strongly to remove jitter; the cutoff rises with speed so fast
+    movements are followed with little lag.
+    """
+    def __init__(self, min_cutoff=TRACKING_MIN_CUTOFF, beta=TRACKING_BETA, d_cutoff=TRACKING_D_CUTOFF):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+    def __call__(self, value, timestamp):
+        if self.value is None or timestamp <= self.timestamp:
+            self.value = np.array(value, dtype=np.float64)
+            self.derivative = np.zeros_like(self.value)
+            self.timestamp = timestamp
+            return self.value
+
+        dt = timestamp - self.timestamp
+        raw_derivative = (value - self.value) / dt
+        self.derivative += (raw_derivative - self.derivative) * _smoothing_factor(dt, self.d_cutoff)
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        tau = 1.0 / (2 * math.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        self.value = self.value + alpha * (value - self.value)
+        self.timestamp = timestamp
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+
+class LandmarkTracker:
+    """
+    Filters the pose landmarks of one player and predicts them between inferences.
+
+    update() takes each new inference result; predict() extrapolates the filtered landmarks to any
+    later timestamp with their current velocity, so hearts and aim can move every frame while pose
+    inference only runs every few frames. suggested_interval() tells how many frames may be skipped:
+    more while the player is still, none while they move fast.
+    """
+    def __init__(self, max_prediction=TRACKING_MAX_PREDICTION, max_skip=TRACKING_MAX_SKIP,
+                 still_speed=TRACKING_STILL_SPEED):
+        self.filter = OneEuroFilter()
+        self.max_prediction = max_prediction
+        self.max_skip = max_skip
+        self.still_speed = still_speed
+        self.points = None
+        self.velocity = None
+        self.timestamp = None
+
+    @property
+    def active(self):
+        return self.points is not None
+
+    def update(self, pose_landmarks, timestamp):
+        """Feeds a MediaPipe landmark list captured at timestamp and returns the filtered landmarks."""
+        raw = np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark])
+        previous, previous_timestamp = self.points, self.timestamp
+        points = raw.copy()
+        points[:, :3] = self.filter(raw[:, :3], timestamp)
+
+        if previous is None or timestamp <= previous_timestamp:
+            self.velocity = np.zeros((len(points), 3))
+        else:
+            self.velocity = (points[:, :3] - previous[:, :3]) / (timestamp - previous_timestamp)
+        self.points = points
+        self.timestamp = timestamp
+        return TrackedLandmarks(points)
+
+    def predict(self, timestamp):
+        """Returns the landmarks extrapolated to timestamp (at most max_prediction seconds ahead)."""
+        if self.points is None:
+            return None
+        ahead = min(max(0.0, timestamp - self.timestamp), self.max_prediction)
+        points = self.points.copy()
+        points[:, :3] += self.velocity * ahead
+        return TrackedLandmarks(points)
+
+    def suggested_interval(self):
+        """Number of frames per inference that keeps up with the current movement speed."""
+        if self.velocity is None or self.max_skip <= 1:
+            return 1
+        # Only visible landmarks count; occluded ones jitter without meaning anything
+        visible = self.points[:, 3] > 0.5
+        speed = float(np.abs(self.velocity[visible]).max()) if visible.any() else 0.0
+        if speed <= 0:
+            return self.max_skip
+        return int(min(self.max_skip, max(1, self.still_speed / speed)))
+
+    def reset(self):
+        self.filter.reset()
+        self.points = None
+        self.velocity = None
+        self.timestamp = None
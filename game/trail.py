@@ -0,0 +1,33 @@
+import cv2
+import numpy as np
+
+from .compositor import clip_rect
+
+
+class TrailRenderer:
+    """
+    Draws fading circle trails by blending only the bounding box of each circle,
+    instead of copying and blending the whole frame for every trail point.
+    """
+    def __init__(self):
+        self._scratch = None
+
+    def draw(self, frame, points, radius, color):
+        """Draws a circle at each point, fading in from the oldest (first) to the newest (last)."""
+        count = len(points)
+        size = 2 * radius + 1
+        if self._scratch is None or self._scratch.shape[0] < size:
+            self._scratch = np.empty((size, size, 3), np.uint8)
+
+        for i in range(count):
+            x, y = int(points[i][0]), int(points[i][1])
+            clipped = clip_rect(frame.shape, x - radius, y - radius, size, size)
+            if clipped is None:
+                continue
+            (fy, fx), _ = clipped
+            roi = frame[fy, fx]
+            overlay = self._scratch[:roi.shape[0], :roi.shape[1]]
+            overlay[...] = roi
+            cv2.circle(overlay, (x - fx.start, y - fy.start), radius, color, -1)
+            alpha = (i + 1) / count
+            cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0, roi)
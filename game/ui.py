@@ -0,0 +1,213 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .compositor import clip_rect
+from .constants import OVERLAY_TEXT_CACHE_SIZE
+
+
+def render_text(text, font, scale, color, thickness):
+    """
+    Renders text once into a tight BGRA image. Returns (image, (dx, dy)): the offset of the image's
+    top-left corner from the putText origin, so it lands exactly where putText would draw it.
+    """
+    (width, height), baseline = cv2.getTextSize(text, font, scale, thickness)
+    pad = thickness
+    image = np.zeros((height + baseline + 2 * pad, width + 2 * pad, 4), np.uint8)
+    cv2.putText(image, text, (pad, pad + height), font, scale, (*color, 255), thickness)
+    return image, (-pad, -pad - height)
+
+
+def tint_region(region, color, alpha, scratch=None):
+    """
+    Blends a solid colour over a frame region in place (region = region * (1 - alpha) + color * alpha)
+    without copying the frame. scratch is an optional cached solid-colour array of the region's size.
+    """
+    if scratch is None or scratch.shape != region.shape:
+        scratch = np.empty(region.shape, np.uint8)
+        scratch[...] = color
+    cv2.addWeighted(region, 1 - alpha, scratch, alpha, 0, dst=region)
+    return scratch
+
+
+def dim_region(region, alpha):
+    """
+    Darkens a frame region in place as if black were blended over it with opacity alpha: a single
+    saturating scale of the pixels, without an overlay copy.
+    """
+    cv2.convertScaleAbs(region, dst=region, alpha=1 - alpha)
+
+
+class Texture:
+    """A premultiplied BGRA image placed on frames of frame_shape, with the planes for an in-place blend."""
+    def __init__(self, image, x, y, frame_shape):
+        self.slices = None
+        clipped = clip_rect(frame_shape, x, y, image.shape[1], image.shape[0])
+        if clipped is None:
+            return
+        self.slices, (sy, sx) = clipped
+        image = image[sy, sx]
+        self.premultiplied = np.ascontiguousarray(image[:, :, :3])
+        self.inv_alpha3 = np.repeat(255 - image[:, :, 3:4], 3, axis=2)
+
+    def blend(self, frame):
+        if self.slices is None:
+            return
+        # dst = premultiplied + dst * (255 - alpha) / 255, in two SIMD passes over the texture area
+        region = frame[self.slices]
+        cv2.multiply(region, self.inv_alpha3, dst=region, scale=1 / 255)
+        cv2.add(region, self.premultiplied, dst=region)
+
+
+class OverlayText:
+    """
+    The centred title and subtitle of the full-screen overlays (pause, game over, exit confirmation),
+    rendered once per content and frame size into a Texture. At most max_blocks are kept.
+    """
+    def __init__(self, max_blocks=OVERLAY_TEXT_CACHE_SIZE):
+        self.max_blocks = max_blocks
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+
+    def get(self, frame_shape, main_text, sub_text, main_font, main_scale, main_thickness, main_color,
+            sub_font, sub_scale, sub_thickness, sub_color, spacing):
+        key = (frame_shape[:2], main_text, sub_text, main_font, main_scale, main_thickness, main_color,
+               sub_font, sub_scale, sub_thickness, sub_color, spacing)
+        block = self._blocks.get(key)
+        if block is not None:
+            self.hits += 1
+            self._blocks.move_to_end(key)
+            return block
+
+        self.misses += 1
+        height, width = frame_shape[:2]
+        canvas = np.zeros((height, width, 4), np.uint8)
+        main_text_size = cv2.getTextSize(main_text, main_font, main_scale, main_thickness)[0]
+        main_text_x = (width - main_text_size[0]) // 2
+        main_text_y = (height - main_text_size[1]) // 2
+        if sub_text:
+            main_text_y -= spacing // 2
+        cv2.putText(canvas, main_text, (main_text_x, main_text_y), main_font, main_scale, (*main_color, 255),
+                    main_thickness)
+        if sub_text:
+            sub_text_size = cv2.getTextSize(sub_text, sub_font, sub_scale, sub_thickness)[0]
+            sub_text_x = (width - sub_text_size[0]) // 2
+            sub_text_y = main_text_y + main_text_size[1] + spacing
+            cv2.putText(canvas, sub_text, (sub_text_x, sub_text_y), sub_font, sub_scale, (*sub_color, 255),
+                        sub_thickness)
+
+        # Keep only the bounding box of the text
+        x, y, w, h = cv2.boundingRect(canvas[:, :, 3])
+        block = self._blocks[key] = Texture(canvas[y:y + h, x:x + w], x, y, frame_shape)
+        if len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+
+class _Panel:
+    __slots__ = ('key', 'image', 'position', 'visible')
+
+    def __init__(self, key, image, position, visible):
+        self.key = key
+        self.image = image
+        self.position = position
+        self.visible = visible
+
+
+class UILayer:
+    """
+    The game UI as layers over the camera frame.
+
+    Static elements (area borders, fixed labels) are drawn once onto the static BGRA canvas. Panels
+    (health texts, notices) are small BGRA images that are only re-rendered when their content key
+    changes. Whenever something changed, all visible layers are flattened into a sparse list of the
+    pixels they cover; compositing is then a single indexed copy onto the frame, so its cost depends
+    on how many pixels the UI covers, not on the frame size or the number of elements.
+
+    Layers are drawn on transparent black with an opaque alpha, so anti-aliased edges come out
+    premultiplied; those translucent pixels are blended, opaque ones copied.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.static = np.zeros((height, width, 4), np.uint8)
+        self.rebuilds = 0
+        self._panels = {}
+        self._tints = {}
+        self._dirty = True
+        self._opaque = (np.zeros(0, np.intp), np.zeros((0, 3), np.uint8))
+        self._translucent = (np.zeros(0, np.intp), np.zeros((0, 3), np.uint16), np.zeros((0, 1), np.uint16))
+
+    def invalidate(self):
+        """Call after drawing on the static canvas."""
+        self._dirty = True
+
+    def set_text(self, name, text, origin, font, scale, color, thickness, visible=True):
+        """A text panel, drawn like cv2.putText(frame, text, origin, ...), re-rendered only when it changes."""
+        key = (text, font, scale, color, thickness)
+        panel = self._panels.get(name)
+        if panel is not None and panel.key == key:
+            if panel.visible != visible:
+                panel.visible = visible
+                self._dirty = True
+            return
+        image, (dx, dy) = render_text(text, font, scale, color, thickness)
+        self._panels[name] = _Panel(key, image, (origin[0] + dx, origin[1] + dy), visible)
+        self._dirty = True
+
+    def set_visible(self, name, visible):
+        panel = self._panels.get(name)
+        if panel is not None and panel.visible != visible:
+            panel.visible = visible
+            self._dirty = True
+
+    def tint(self, frame, top_left, bottom_right, color, alpha):
+        """Tints a rectangle of the frame in place; the solid-colour operand is cached per size and colour."""
+        (x1, y1), (x2, y2) = top_left, bottom_right
+        region = frame[y1:y2, x1:x2]
+        key = (region.shape, color)
+        self._tints[key] = tint_region(region, color, alpha, self._tints.get(key))
+
+    def composite(self, frame):
+        if self._dirty:
+            self._flatten()
+        flat = frame.reshape(-1, 3)
+        indices, colors = self._opaque
+        flat[indices] = colors
+        indices, premultiplied, inv_alpha = self._translucent
+        if len(indices):
+            blended = flat[indices] * inv_alpha
+            blended += 127
+            blended //= 255
+            flat[indices] = blended + premultiplied
+        if not np.shares_memory(flat, frame):
+            # reshape had to copy (non-contiguous frame): write the result back
+            frame[...] = flat.reshape(frame.shape)
+
+    def _flatten(self):
+        merged = self.static.copy()
+        for panel in self._panels.values():
+            if not panel.visible:
+                continue
+            x, y = panel.position
+            h, w = panel.image.shape[:2]
+            x1, y1, x2, y2 = max(0, x), max(0, y), min(self.width, x + w), min(self.height, y + h)
+            if x1 >= x2 or y1 >= y2:
+                continue
+            image = panel.image[y1 - y:y2 - y, x1 - x:x2 - x]
+            # Premultiplied "over": panels are drawn over the static layer
+            below = merged[y1:y2, x1:x2]
+            inv_alpha = 255 - image[..., 3:4].astype(np.uint16)
+            below[...] = image + (below * inv_alpha + 127) // 255
+
+        flat = merged.reshape(-1, 4)
+        alpha = flat[:, 3]
+        opaque = np.flatnonzero(alpha == 255)
+        translucent = np.flatnonzero((alpha > 0) & (alpha < 255))
+        self._opaque = (opaque, flat[opaque, :3].copy())
+        self._translucent = (translucent, flat[translucent, :3].astype(np.uint16),
+                             255 - flat[translucent, 3:4].astype(np.uint16))
+        self._dirty = False
+        self.rebuilds += 1
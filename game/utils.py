@@ -1,20 +1,11 @@
 import math
 import cv2
-import numpy as np
+
+from .layout import layout_cache
 
 def draw_heart(frame, center, size, color):
-    """Draws a heart shape on the frame."""
-    x, y = center
-    points = []
-    for i in range(0, 628, 5):
-        t = i / 100.0
-        px = x + size * (16 * math.sin(t) ** 3)
-        py = y - size * (13 * math.cos(t) - 5 * math.cos(2 * t) - 2 * math.cos(3 * t) - math.cos(4 * t))
-        points.append((int(px), int(py)))
-    
-    pts = np.array(points, np.int32)
-    pts = pts.reshape((-1, 1, 2))
-    cv2.fillPoly(frame, [pts], color)
+    """Draws a heart shape on the frame (the polygon is computed once per size)."""
+    cv2.fillPoly(frame, [layout_cache.heart(center, size)], color)
 
 def get_angle(p1, p2, p3):
     angle = math.degrees(math.atan2(p3.y - p2.y, p3.x - p2.x) -
@@ -44,14 +35,8 @@ def draw_centered_text(frame, text, center, size):
     font_thickness = 2
     font = cv2.FONT_HERSHEY_SIMPLEX
 
-    # Find an optimal font scale
-    font_scale = 1.0
-    (text_width, text_height), baseline = cv2.getTextSize(text, font, font_scale, font_thickness)
-
-    # Reduce font scale until text fits within the shape
-    while text_width > size * 1.8: # Use 1.8 for padding
-        font_scale *= 0.9
-        (text_width, text_height), baseline = cv2.getTextSize(text, font, font_scale, font_thickness)
+    # Font scale that fits, found once per text and size
+    font_scale, text_width, text_height = layout_cache.fit_text(text, font, size, font_thickness)
 
     # Calculate position to center the text
     text_x = int(center[0] - text_width / 2)
@@ -80,3 +65,15 @@ def zoom_frame(frame, zoom_factor):
     zoomed_frame = cv2.resize(cropped_frame, (w, h), interpolation=cv2.INTER_LINEAR)
 
     return zoomed_frame
+
+def resize_for_inference(frame, width):
+    """
+    Downscales a frame to the given width, keeping the aspect ratio, for pose inference.
+    MediaPipe returns landmarks normalized to the input image, so they map back onto the
+    full-resolution display frame by multiplying with its size, exactly as before.
+    """
+    h, w = frame.shape[:2]
+    if not width or width >= w:
+        return frame
+    height = max(1, round(h * width / w))
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
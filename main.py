@@ -1,5 +1,63 @@
+import argparse
+import sys
+
+from game.constants import NET_PORT
 from game.game import Game
+from game.netplay import open_netplay
+from game.recording import SessionRecording
+from game.sources import open_source
+from game.telemetry import Telemetry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fireball Game")
+    parser.add_argument('--source', default='camera',
+                        help="camera[:N], synthetic[:WxH], a video file or a directory of images (default: camera)")
+    parser.add_argument('--unpaced', action='store_true',
+                        help="read file and synthetic frames as fast as possible instead of in real time")
+    parser.add_argument('--no-loop', action='store_true', help="stop at the end of a video file or image directory")
+    parser.add_argument('--no-window', action='store_true', help="run without a window (no menu, no keyboard, no sound)")
+    parser.add_argument('--mode', choices=('single', 'two'), help="game mode; skips the mode menu")
+    parser.add_argument('--frames', type=int, default=0, help="stop after this many frames (default: no limit)")
+    parser.add_argument('--stats', action='store_true',
+                        help="time the game loop stages and show an FPS/latency overlay (toggle with 'f')")
+    parser.add_argument('--stats-log', metavar='PATH', help="append the timing statistics to PATH as JSON lines")
+    parser.add_argument('--record', metavar='PATH', help="record the session (landmarks and keys) to PATH")
+    parser.add_argument('--host', metavar='PORT', type=int, nargs='?', const=NET_PORT,
+                        help=f"host a networked two-player game on UDP PORT (default: {NET_PORT}) as player 1")
+    parser.add_argument('--connect', metavar='HOST[:PORT]', help="join a networked two-player game as player 2")
+    parser.add_argument('--net-latency', type=float, default=0.0, metavar='MS',
+                        help="simulate this much network latency in each direction, e.g. to test over loopback")
+    parser.add_argument('--net-jitter', type=float, default=0.0, metavar='MS',
+                        help="simulate up to this much extra latency")
+    parser.add_argument('--net-loss', type=float, default=0.0, metavar='PERCENT', help="simulate this much packet loss")
+    parser.add_argument('--replay', metavar='PATH',
+                        help="replay a recorded session without camera, pose model or window and print its outcome")
+    args = parser.parse_args()
+
+    if args.replay:
+        recording = SessionRecording(args.replay)
+        game = Game.headless(recording.frame_width, recording.frame_height, recording.game_mode, recording.seed)
+        outcome = game.replay(recording)
+        print(f"Replayed {outcome['frames']} frames ({outcome['duration']:.1f} s) in {outcome['elapsed']:.2f} s, "
+              f"{outcome['speedup']:.0f}x real time")
+        print(f"Fireballs: {outcome['fireballs']}, health P1/P2/AI: {outcome['player1_health']}/"
+              f"{outcome['player2_health']}/{outcome['ai_health']}, winner: {outcome['winner'] or '-'}")
+        print(f"Digest: {outcome['digest']}")
+        return 0
+
+    try:
+        net = open_netplay(args.host, args.connect, args.net_latency / 1000, args.net_jitter / 1000, args.net_loss / 100)
+        # Opened on a startup thread, while MediaPipe, sprites and sounds load alongside
+        game = Game(lambda: open_source(args.source, paced=not args.unpaced, loop=not args.no_loop),
+                    game_mode=args.mode, show_window=not args.no_window, record_path=args.record,
+                    telemetry=Telemetry(args.stats, args.stats_log), net=net)
+    except RuntimeError as error:
+        print(f"Error: {error}")
+        return 1
+    game.run(max_frames=args.frames)
+    return 0
+
 
 if __name__ == '__main__':
-    game = Game()
-    game.run()
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import tracemalloc
+
+import pytest
+
+from game.preprocess import FramePreprocessor
+from game.sources import SyntheticSource
+
+WIDTH, HEIGHT = 1280, 720
+INFERENCE_WIDTH = 320
+# Far below the smallest image buffer (a 320x180 RGB inference image is 172800 bytes), but enough
+# for the few small Python objects a call creates
+MAX_ALLOCATION = 4096
+
+
+@pytest.fixture(scope='module')
+def frames():
+    source = SyntheticSource(WIDTH, HEIGHT, paced=False)
+    return [source.read()[1] for _ in range(10)]
+
+
+def preprocess(preprocessor, frame, regions):
+    display = preprocessor.display_frame(frame)
+    return [preprocessor.inference_frame(display[:, start:stop], INFERENCE_WIDTH, key=i)
+            for i, (start, stop) in enumerate(regions)]
+
+
+@pytest.mark.parametrize('zoom', [1.0, 1.25])
+@pytest.mark.parametrize('regions', [[(0, WIDTH)], [(0, WIDTH // 2), (WIDTH // 2, WIDTH)]])
+def test_steady_state_does_not_allocate_frames(frames, zoom, regions):
+    preprocessor = FramePreprocessor(zoom)
+    # The first frames fill the buffer pools
+    for frame in frames[:3]:
+        preprocess(preprocessor, frame, regions)
+
+    tracemalloc.start()
+    try:
+        largest = 0
+        for frame in frames:
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            preprocess(preprocessor, frame, regions)
+            largest = max(largest, tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    assert largest < MAX_ALLOCATION
+
+
+def test_buffers_are_reused(frames):
+    preprocessor = FramePreprocessor(1.25, inference_buffers=1, display_buffers=1)
+    display = preprocessor.display_frame(frames[0])
+    rgb = preprocessor.inference_frame(display, INFERENCE_WIDTH)
+    assert preprocessor.display_frame(frames[1]) is display
+    assert preprocessor.inference_frame(display, INFERENCE_WIDTH) is rgb
+    assert rgb.shape == (HEIGHT * INFERENCE_WIDTH // WIDTH, INFERENCE_WIDTH, 3)